@@ -1,16 +1,29 @@
 import json
-import os
+import queue
+import threading
 import time
 from datetime import datetime
 import inspect
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pytest
 
 from core_agentic import agentic_base
 from core_agentic import run_configs
-
-task = None
-taskCount = 0
+from core_agentic.browser_pool import BrowserPool
+from core_agentic.call_dispatcher import dispatch_function_call, qualified_function_call
+from core_agentic.failure_fast_path import FailureFastPath
+from core_agentic.learning_store import LearningStore
+from core_agentic.plan_store import PlanStore
+from core_agentic.plan_validator import PlanValidator
+from core_agentic.speculative_orchestrator import SpeculativeOrchestration
+from core_agentic.streaming_plan import StreamingFunctionPlan
+from src.main.utilities.llm.llm_async import gatherLLM
+from src.main.utilities.llm.llm_response_models import OrchestratorDecision, FunctionPlan, FailureAnalysis, LearnerVerdict, \
+    OrchestratedFunctionPlan
 
 current_test_method = ""
 codeToExecute = []
@@ -21,20 +34,181 @@ def beforeExecution():
     run_configs.start_time = time.time()
     print(f"Start time: {datetime.now()}")
     agentic_base.initialSetup()
-    if not run_configs.dryRun and agentic_base.page:
-        print(f"🌐 Navigating to: {run_configs.url}")
-        agentic_base.page.goto(run_configs.url)
+
+class AgentStep(Enum):
+    REPLAY = "plan_replay"
+    ORCHESTRATE = "orchestrator"
+    ORCHESTRATE_AND_PLAN = "orchestrate_and_plan"
+    PLAN = "function_planner"
+    EXECUTE = "function_executor"
+    LEARN = "learner"
+    ANALYZE_FAILURE = "failure_analyzer"
+    DONE = "done"
+
+@dataclass
+class AgentState:
+    """
+    State carried between the steps of the agentic loop. Each step reads what it needs, records its output
+    and returns the next step, so nothing from earlier steps stays alive on the call stack.
+    """
+    step: AgentStep = AgentStep.ORCHESTRATE
+    userTask: str = ""
+    functionList: Any = None
+    exception: str = ""
+    stepCount: int = 0
+    originalTask: str = ""
+    planKey: str = ""  # PlanStore key of the user task, empty when plans are neither recorded nor replayed
+    speculation: Any = None  # SpeculativeOrchestration started by the executor for the next orchestrator step
+    planRejections: int = 0  # Consecutive plans sent back to the planner by the PlanValidator
+    planFeedback: List[str] = field(default_factory=list)
+    unexecutedCalls: List[str] = field(default_factory=list)  # Failed function call and the rest of its plan
+    fastPathAttempts: Dict[str, int] = field(default_factory=dict)  # FailureFastPath recoveries per rule and subtask
+
+# Called as listener(state, step, nextStep, duration) after every transition, e.g. for checkpointing
+transitionListeners: List[Callable[[AgentState, AgentStep, AgentStep, float], None]] = []
+
+ORCHESTRATOR_GUIDELINES = (
+    "⚠️ Decision-Making Guidelines:\n"
+    "0. **Task Priority Rule**: When analyzing pending subtasks, prioritize based on the order they appear in the user's original task description. Select the agent that can handle the FIRST mentioned action/requirement. Only if no agent can handle the first requirement, then consider the next requirements in sequence. Make sure to justify in the reasoning if you are skipping the first requirement with why no available agents are suitable\n"
+    "1. If a subtask is not explicitly listed in the pending list, assume **it is not required—even if it's typically part of the process.**\n"
+    "2. If no available Agent can fulfill the pending subtask, return `TERMINATE` as the Agent name.\n"
+    "3. Avoid redoing subtasks that are already completed or available by default.\n"
+    "4. If the pending task list is empty, or all subtasks are completed, return `COMPLETE`.\n"
+    "5. When multiple agents are available to handle different parts of pending tasks which are explicitly mentioned, **prioritize tasks logically based on their interdependencies and decide which is the best possible agent to be chosen first**\n"
+    "6. Remember, there is no such thing as immediate action requested by user. The user is requesting a task to be accomplished, and the orchestrator is responsible for selecting the best agent to start working on it. The user is not requesting an immediate action, but rather a task to be accomplished.\n"
+    "7. If all required values for a logical comparison or verification (integer or string) are already captured, you must select any one agent from the available list of agents to perform the assertion. You are strictly prohibited from returning TERMINATE.\n"
+    "8. If the task involves a pure browser action like refresh page or if there is an verification to be performed on page level (example: verify is X page is loaded, etc), choose any Agent from the available list of agent, even without no strong reason, never TERMINATE in this case\n\n"
+)
+
+PLANNER_RESPONSE_FORMAT = """\
+    ```json
+    {
+      "FunctionCalls": [
+        {
+          "functionCall": "string, exact Python function call using correct object prefix and only positional arguments",
+          "subTask": "string, short description of the subtask accomplished by this function call. Description cannot be vague. It has to be precise. It must also mention any data values and variables used in the subtask"
+        }
+      ],
+      "Reasoning": "string, Explain in depth why you chose these functions from all available LocatorFunctions. Also if any assertion is being performed, explain why exactly and explain if you have strictly followed Rule 6, 7, 8, 9, 10, 11. If you did not choose any function from the provided set of functions explain why in depth",
+      "PendingTasks": "string, your job is to remove only those subtasks which will be achieved by all these function calls from the `Task to accomplish` and return everything else which still needs to be done. You must subtract ONLY the exact, literal phrase corresponding to the action(s) completed in the FunctionCalls array. 14.2 You are forbidden from removing subsequent parts of the same sentence or instruction, as you cannot assume they were also completed by the same action. Return the result as a single string. If all parts of the main task are already completed, return \\"None\\" (as a string, not null). Do not repeat or rephrase the completed steps. Do not modify wording unnecessarily. Only subtract exact or overlapping instructions. Ensure the final output is concise and preserves valid natural language."
+    }"""
+
+COMBINED_RESPONSE_FORMAT = PLANNER_RESPONSE_FORMAT.replace('    {\n      "FunctionCalls"', '''    {
+      "Agent": "string, name of the selected Agent or one of the special values: TERMINATE, COMPLETE",
+      "AgentReasoning": "string, in depth explanation for why this Agent was chosen out of all other available agents. Also specify if multiple agents were found suitable why was this preferred",
+      "FunctionCalls"''', 1)
 
 def orchestrator(userTask:str = ""):
-    internal_orchestrator(userTask)
+    state = AgentState(step=orchestrationStep(), userTask=userTask, originalTask=userTask)
+    if not run_configs.dryRun and (run_configs.plan_store_record or run_configs.plan_store_replay):
+        state.planKey = PlanStore.planKey(userTask)
+        storedPlan = PlanStore.lookup(state.planKey) if run_configs.plan_store_replay else None
+        if storedPlan:
+            state.step = AgentStep.REPLAY
+            state.functionList = storedPlan
+    runAgentLoop(state)
+
+def runConcurrentSessions(userTasks: List[str], maxWorkers: int = None) -> List[Optional[BaseException]]:
+    """
+    Runs each task as its own session (browser context, helper, POR and run state, see run_configs.RunContext)
+    on `maxWorkers` worker threads. Every worker reuses its own pooled browser (see BrowserPool) for the tasks it
+    picks up. Returns None for every task that passed and the exception (e.g. the pytest failure) for every task
+    that did not, in the order of `userTasks`. The process-wide statistics are printed, and the vision memo is
+    cleared, once all sessions finished.
+    """
+    results: List[Optional[BaseException]] = [None] * len(userTasks)
+    pending = queue.Queue()
+    for index, userTask in enumerate(userTasks):
+        pending.put((index, userTask))
+
+    def runSession(index: int, userTask: str) -> Optional[BaseException]:
+        with run_configs.session():
+            run_configs.testName = f"session_{index}"
+            try:
+                beforeExecution()
+                orchestrator(userTask)
+                return None
+            except BaseException as e:
+                print(f"❌ Session failed for task: {userTask}\n{e}")
+                run_configs.testFailed = True
+                return e
+            finally:
+                agentic_base.afterExecutionCleanup(sharedStats=False)
+
+    def worker():
+        try:
+            while True:
+                try:
+                    index, userTask = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results[index] = runSession(index, userTask)
+        finally:
+            BrowserPool.shutdown()
+
+    workers = [threading.Thread(target=worker, name=f"agentic-session-{i}")
+               for i in range(min(maxWorkers or len(userTasks), len(userTasks)))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    agentic_base.printSharedStats()
+    return results
+
+def orchestrationStep() -> AgentStep:
+    return AgentStep.ORCHESTRATE_AND_PLAN if run_configs.combined_orchestration else AgentStep.ORCHESTRATE
+
+def runAgentLoop(state: AgentState):
+    steps = {
+        AgentStep.REPLAY: planReplay,
+        AgentStep.ORCHESTRATE: internal_orchestrator,
+        AgentStep.ORCHESTRATE_AND_PLAN: orchestrateAndPlan,
+        AgentStep.PLAN: functionPlanner,
+        AgentStep.EXECUTE: functionExecutor,
+        AgentStep.LEARN: learnerAgent,
+        AgentStep.ANALYZE_FAILURE: failureAnalyzer,
+    }
+    while state.step != AgentStep.DONE:
+        if state.stepCount >= run_configs.max_agent_steps:
+            pytest.fail(f"Agentic loop exceeded {run_configs.max_agent_steps} steps. Terminating execution")
+        step = state.step
+        startTime = time.time()
+        nextStep = steps[step](state)
+        duration = time.time() - startTime
+        run_configs.agentStepTimes.setdefault(step.value, []).append(duration)
+        state.step = nextStep
+        state.stepCount += 1
+        for listener in transitionListeners:
+            listener(state, step, nextStep, duration)
+
+def planReplay(state: AgentState) -> AgentStep:
+    print("-----------------PLAN REPLAY-----------------")
+    steps, state.functionList = state.functionList, None
+    run_configs.task = state.userTask
+    print(f"Replaying {len(steps)} stored function calls for this task")
+    run_configs.pendingTask.extend(step["subTask"] for step in steps)
+    batch = agentic_base.helper.batchedVisualAssertions() if run_configs.batch_visual_assertions else nullcontext()
+    executedBefore = len(run_configs.planSteps)
+    with batch:
+        exception = executeFunctions(PlanStore.replaySteps(steps, agentic_base.refChangeCheck))
+    agentic_base.refChangeCheck()
+    if exception == "" and len(run_configs.planSteps) - executedBefore < len(steps):
+        exception = "Stored plan stopped at a page change the application did not make"
+    if exception == "":
+        print("Agents have successfully completed the given task from the stored plan")
+        return AgentStep.DONE
+    print("Failed: " + str(run_configs.failedSubTask))
+    if "assertion" in exception.lower():
+        # The application misbehaved, not the plan
+        state.exception = exception
+        return AgentStep.ANALYZE_FAILURE
+    print("Stored plan diverged from the application, handing the remaining task over to the orchestrator")
+    PlanStore.recordFallback()
+    run_configs.pendingTask.clear()
+    run_configs.failedSubTask = "None"
+    return orchestrationStep()
 
-def internal_orchestrator(userTask:str = ""):
-    global task, taskCount
-    task = userTask
-    run_configs.pendingTask.append(task)
-    print("-----------------ORCHESTRATOR-----------------")
-    print("Current Pending Tasks: " + str(run_configs.pendingTask))
-    print("Current Completed Tasks: " + str(run_configs.completedSubtasks))
+def orchestratorPrompts(agentsCatalog: str, completedSubtasks: list, pendingTask: list) -> Tuple[str, str]:
     systemPrompt = (
         "You are an intelligent orchestrator responsible for selecting the next best Agent from a provided list. "
         "Each Agent has a description of its capabilities. You must choose the best Agent to start working on the pending subtask (which is part of a larger task the user wants to accomplish). "
@@ -52,40 +226,145 @@ def internal_orchestrator(userTask:str = ""):
         ```
         """
 
-        "⚠️ Decision-Making Guidelines:\n"
-        "0. **Task Priority Rule**: When analyzing pending subtasks, prioritize based on the order they appear in the user's original task description. Select the agent that can handle the FIRST mentioned action/requirement. Only if no agent can handle the first requirement, then consider the next requirements in sequence. Make sure to justify in the reasoning if you are skipping the first requirement with why no available agents are suitable\n"
-        "1. If a subtask is not explicitly listed in the pending list, assume **it is not required—even if it's typically part of the process.**\n"
-        "2. If no available Agent can fulfill the pending subtask, return `TERMINATE` as the Agent name.\n"
-        "3. Avoid redoing subtasks that are already completed or available by default.\n"
-        "4. If the pending task list is empty, or all subtasks are completed, return `COMPLETE`.\n"
-        "5. When multiple agents are available to handle different parts of pending tasks which are explicitly mentioned, **prioritize tasks logically based on their interdependencies and decide which is the best possible agent to be chosen first**\n"
-        "6. Remember, there is no such thing as immediate action requested by user. The user is requesting a task to be accomplished, and the orchestrator is responsible for selecting the best agent to start working on it. The user is not requesting an immediate action, but rather a task to be accomplished.\n"
-        "7. If all required values for a logical comparison or verification (integer or string) are already captured, you must select any one agent from the available list of agents to perform the assertion. You are strictly prohibited from returning TERMINATE.\n"
-        "8. If the task involves a pure browser action like refresh page or if there is an verification to be performed on page level (example: verify is X page is loaded, etc), choose any Agent from the available list of agent, even without no strong reason, never TERMINATE in this case\n\n"
+        f"{ORCHESTRATOR_GUIDELINES}"
         )
 
     userPrompt = (
         "Agents (CSV format):\n"
-        f"{agentic_base.getAgentsBasedOnRef()}\n\n"
+        f"{agentsCatalog}\n\n"
         "✅ Subtasks already completed:\n"
-        f"{run_configs.completedSubtasks}\n\n"
+        f"{completedSubtasks}\n\n"
         "🕒 Pending subtasks:\n"
-        f"{run_configs.pendingTask}\n"
+        f"{pendingTask}\n"
     )
-    response = agentic_base.helper.setupLLM(provider = run_configs.llm_provider, systemPrompt=systemPrompt, userPrompt=userPrompt)
-    json_response = agentic_base.helper.extract_json_block(response)
-    run_configs.agent = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/Agent")
-    reasoning = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/Reasoning")
+    return systemPrompt, userPrompt
+
+def startSpeculativeOrchestration(state: AgentState):
+    """
+    Starts the next orchestrator call in the background, assuming every planned call succeeds: the planned
+    subtasks become completed and the planner's PendingTasks (last pending entry) is what remains.
+    """
+    if not run_configs.speculative_orchestration or run_configs.combined_orchestration or run_configs.dryRun:
+        return
+    completedSubtasks = run_configs.completedSubtasks + run_configs.pendingTask[:-1]
+    pendingTask = run_configs.pendingTask[-1:] + [state.userTask]
+    systemPrompt, userPrompt = orchestratorPrompts(agentic_base.getAgentsBasedOnRef(), completedSubtasks, pendingTask)
+    state.speculation = SpeculativeOrchestration(
+        systemPrompt, userPrompt,
+        lambda: agentic_base.helper.setupLLM(provider=run_configs.llm_provider, systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                             callSite=run_configs.LLM_CallSite.ORCHESTRATOR))
+
+def internal_orchestrator(state: AgentState) -> AgentStep:
+    userTask = state.userTask
+    state.userTask = ""  # Later orchestrations only work on the pending tasks
+    run_configs.task = userTask
+    run_configs.pendingTask.append(userTask)
+    print("-----------------ORCHESTRATOR-----------------")
+    print("Current Pending Tasks: " + str(run_configs.pendingTask))
+    print("Current Completed Tasks: " + str(run_configs.completedSubtasks))
+    systemPrompt, userPrompt = orchestratorPrompts(agentic_base.getAgentsBasedOnRef(), run_configs.completedSubtasks,
+                                                   run_configs.pendingTask)
+    speculation, state.speculation = state.speculation, None
+    response = speculation.commit(systemPrompt, userPrompt) if speculation else None
+    if response is None:
+        response = agentic_base.helper.setupLLM(provider = run_configs.llm_provider, systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                                callSite=run_configs.LLM_CallSite.ORCHESTRATOR)
+    decision = OrchestratorDecision.fromJson(agentic_base.helper.extract_json_block(response))
+    run_configs.agent = decision.agent
+    reasoning = decision.reasoning
     print("Agent selected by Orchestrator: " + run_configs.agent + "\nLLM Reasoning: " + reasoning)
+    return orchestratorOutcome(state)
+
+def orchestratorOutcome(state: AgentState) -> AgentStep:
     if run_configs.agent == "" or run_configs.agent is None or  run_configs.agent.upper().strip() == "TERMINATE":
         pytest.fail("Orchestrator could not find the next suitable agent to accomplish the pending tasks")
     elif run_configs.agent.upper().strip() == "COMPLETE":
         print("Agents have successfully completed the given task")
-    else:
-        functionPlanner()
+        if state.planKey and run_configs.plan_store_record:
+            PlanStore.save(state.planKey, state.originalTask, run_configs.planSteps)
+        return AgentStep.DONE
+    return AgentStep.PLAN
+
+def orchestrateAndPlan(state: AgentState) -> AgentStep:
+    userTask = state.userTask
+    state.userTask = ""  # Later orchestrations only work on the pending tasks
+    run_configs.task = userTask
+    run_configs.pendingTask.append(userTask)
+    print("-----------------ORCHESTRATOR + FUNCTIONS PLANNER-----------------")
+    print("Current Pending Tasks: " + str(run_configs.pendingTask))
+    print("Current Completed Tasks: " + str(run_configs.completedSubtasks))
+    agentsCatalog = agentic_base.getAgentsBasedOnRef()
+    candidates = agentic_base.rankAgentsForTask(agentsCatalog, " ".join(str(pending) for pending in run_configs.pendingTask),
+                                                run_configs.combined_orchestration_top_k)
+    print("Candidate Agents: " + str(candidates))
+    systemPrompt = (
+        "You are an intelligent orchestrator and function planner for a UI automation agent. "
+        "First select the next best Agent from the provided list of Agents following the Agent Selection guidelines, then plan the function calls of the selected Agent following the Function Planning rules.\n"
+        "LocatorFunctions and AgentFunctions are only provided for the Candidate Agents. If the best Agent is not a Candidate Agent, still return it as the Agent, with an empty `FunctionCalls` array. "
+        "When returning TERMINATE or COMPLETE, `FunctionCalls` must be empty as well.\n\n"
+        "### 🧭 Agent Selection:\n"
+        f"{ORCHESTRATOR_GUIDELINES}"
+        "### 🛠️ Function Planning:\n"
+        f"{plannerSystemPrompt(COMBINED_RESPONSE_FORMAT)}"
+    )
+    candidateTools = ""
+    for candidate in candidates:
+        candidateTools += (
+            f"🧩 Candidate Agent: {candidate}\n"
+            "🔍 LocatorFunctions (via `locator` object):\n"
+            f"{agentic_base.getTools('Locator', candidate)}\n\n"
+            "🤖 AgentFunctions (via `agent` object):\n"
+            f"{agentic_base.getTools('Function', candidate)}\n\n"
+        )
+    userPrompt = (
+        "📋 Agents (CSV format):\n"
+        f"{agentsCatalog}\n\n"
 
-def functionPlanner():
-    print("-----------------FUNCTIONS PLANNER-----------------")
+        "📦 HelperFunctions (via `helper` object):\n"
+        f"{agentic_base.getTools('Helper')}\n\n"
+
+        f"{candidateTools}"
+
+        "🎯 Task to accomplish:\n"
+        f"{run_configs.task}\n\n"
+
+        "✅ Completed subtasks:\n"
+        f"{run_configs.completedSubtasks}\n\n"
+
+        "🕒 Pending subtasks:\n"
+        f"{run_configs.pendingTask}\n"
+
+        "📋 Variables in Python Dictionary format:\n"
+        f"{json.dumps(run_configs.variables)}\n\n"
+    )
+    response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                            callSite=run_configs.LLM_CallSite.ORCHESTRATE_AND_PLAN)
+    combined = OrchestratedFunctionPlan.fromJson(agentic_base.helper.extract_json_block(response))
+    run_configs.agent = combined.agent
+    print("Agent selected by Orchestrator: " + run_configs.agent + "\nLLM Reasoning: " + str(combined.agentReasoning))
+    nextStep = orchestratorOutcome(state)
+    if nextStep != AgentStep.PLAN:
+        return nextStep
+    if run_configs.agent not in candidates or not combined.plan.functionCalls:
+        # The tools of the selected agent were not in the prompt, plan them with a separate call
+        print("Selected Agent was not planned for, falling back to the function planner")
+        return AgentStep.PLAN
+    return applyFunctionPlan(state, combined.plan)
+
+def plannerSystemPrompt(responseFormat: str = PLANNER_RESPONSE_FORMAT) -> str:
+    batchedAssertionRule = ""
+    batchedAssertionException = ""
+    batchedAssertionGrouping = ""
+    batchedAssertionCheck = ""
+    batchedAssertionExample = ""
+    if run_configs.batch_visual_assertions:
+        batchedAssertionRule = """
+        6.7 BATCHED ASSERTION EXEMPTION: Multiple `helper.assertionVisual()` calls MAY be grouped in the same `FunctionCalls` array, provided that every function in the array is a `helper.assertionVisual()` call. Each assertion must still verify a single element as per Rule 8.4. Mixing them with any other function remains an IMMEDIATE VIOLATION."""
+        batchedAssertionException = " (or, only for `helper.assertionVisual()`, share it exclusively with other `helper.assertionVisual()` calls as per Rule 6.7)"
+        batchedAssertionGrouping = ", except other `helper.assertionVisual()` calls next to `helper.assertionVisual()` as per Rule 6.7"
+        batchedAssertionCheck = " (unless every function is a `helper.assertionVisual()` call, Rule 6.7)"
+        batchedAssertionExample = """
+        [helper.assertionVisual(), helper.assertionVisual()]"""
 
     systemPrompt = f"""
     You are an intelligent function planner for a UI automation agent. Your task is to generate a correct and executable sequence of function calls using **ONLY** the functions explicitly provided, always making sure the Rules defined are **strictly** followed.
@@ -139,12 +418,12 @@ def functionPlanner():
         - If the function description of a `LocatorFunctions` indicates explicitly that the presence of the field is optional, uncertain, or conditionally non-mandatory, you must wrap the entire function call within a Python `try-except` block. In the `except` block, log the message: `Note: WebElement not found. Execution continued as this is not a mandatory field.` **You are strictly prohibited to use a `try-except` block if this condition is not met.**
 
     6. ASSERTION/TEXT CAPTURE ISOLATION RULE - ABSOLUTE PRIORITY:
-        6.1 MANDATORY ISOLATION: Any Function Plan containing `helper.assertion()`, `helper.assertionVisual()`, or `helper.getText()` MUST execute these functions as the ONLY function in the `FunctionCalls` array.
-        6.2 ZERO TOLERANCE: Absolutely NO other helper function calls are permitted in the same Function Plan with isolated helper functions.
+        6.1 MANDATORY ISOLATION: Any Function Plan containing `helper.assertion()`, `helper.assertionVisual()`, or `helper.getText()` MUST execute these functions as the ONLY function in the `FunctionCalls` array{batchedAssertionException}.
+        6.2 ZERO TOLERANCE: Absolutely NO other helper function calls are permitted in the same Function Plan with isolated helper functions{batchedAssertionGrouping}.
         6.3 ABSOLUTE PRECEDENCE: This rule OVERRIDES ALL other grouping, efficiency, and task completion rules without exception.
-        6.4 VIOLATION CHECK: Before execution, count total functions - if >1 AND includes `helper.assertion()`/`helper.assertionVisual()`/`helper.getText()` = IMMEDIATE VIOLATION.
+        6.4 VIOLATION CHECK: Before execution, count total functions - if >1 AND includes `helper.assertion()`/`helper.assertionVisual()`/`helper.getText()` = IMMEDIATE VIOLATION{batchedAssertionCheck}.
         6.5 CRITICAL EXEMPTION: Isolation applies ONLY to the three specified `helper.` functions. ALL other HelperFunctions, LocatorFunctions, AgentFunctions are COMPLETELY EXEMPT and MUST be grouped for efficiency.
-        6.6 ENFORCEMENT VERIFICATION: Function must be the SOLE function in its FunctionCalls array to qualify as proper isolation.
+        6.6 ENFORCEMENT VERIFICATION: Function must be the SOLE function in its FunctionCalls array{batchedAssertionException} to qualify as proper isolation.{batchedAssertionRule}
 
         VIOLATION EXAMPLES:
         // FORBIDDEN
@@ -154,7 +433,7 @@ def functionPlanner():
         COMPLIANT EXAMPLES:
         // CORRECT
         [helper.assertion()]
-        [helper.click(), agent.selectDate()]
+        [helper.click(), agent.selectDate()]{batchedAssertionExample}
 
     7.  **FUNCTION GROUPING RULE:**
         7.1 **CRITICAL MANDATORY GROUPING**: 
@@ -244,19 +523,13 @@ def functionPlanner():
     ### ✅ Response Format:
     You must return a valid JSON object. All keys must be in double quotes. Do not include any extra keys like 'pulsed', 'effluent', etc, unless explicitly instructed. Your response must be a valid, parsable JSON string and must not include trailing commas or unquoted keys or any meta data.
     Apart from the below-mentioned JSON schema, you must not include any other text, explanation, or formatting. Your entire response must be a single valid JSON object.
-    ```json
-    {{
-      "FunctionCalls": [
-        {{
-          "functionCall": "string, exact Python function call using correct object prefix and only positional arguments",
-          "subTask": "string, short description of the subtask accomplished by this function call. Description cannot be vague. It has to be precise. It must also mention any data values and variables used in the subtask"
-        }}
-      ],
-      "Reasoning": "string, Explain in depth why you chose these functions from all available LocatorFunctions. Also if any assertion is being performed, explain why exactly and explain if you have strictly followed Rule 6, 7, 8, 9, 10, 11. If you did not choose any function from the provided set of functions explain why in depth",
-      "PendingTasks": "string, your job is to remove only those subtasks which will be achieved by all these function calls from the `Task to accomplish` and return everything else which still needs to be done. You must subtract ONLY the exact, literal phrase corresponding to the action(s) completed in the FunctionCalls array. 14.2 You are forbidden from removing subsequent parts of the same sentence or instruction, as you cannot assume they were also completed by the same action. Return the result as a single string. If all parts of the main task are already completed, return \\"None\\" (as a string, not null). Do not repeat or rephrase the completed steps. Do not modify wording unnecessarily. Only subtract exact or overlapping instructions. Ensure the final output is concise and preserves valid natural language."
-    }}
+{responseFormat}
     """
+    return systemPrompt
 
+def functionPlanner(state: AgentState) -> AgentStep:
+    print("-----------------FUNCTIONS PLANNER-----------------")
+    systemPrompt = plannerSystemPrompt()
     userPrompt = (
         "📋 Agent Name and Description in CSV format (Agent under which LocatorFunctions are present):\n"
         f"{agentic_base.findAgentAndDescription(agentic_base.getAgentsBasedOnRef(), run_configs.agent + ',')}\n\n"
@@ -271,7 +544,7 @@ def functionPlanner():
         f"{agentic_base.getTools('Function')}\n\n"
 
         "🎯 Task to accomplish:\n"
-        f"{task}\n\n"
+        f"{run_configs.task}\n\n"
 
         "✅ Completed subtasks:\n"
         f"{run_configs.completedSubtasks}\n\n"
@@ -282,67 +555,124 @@ def functionPlanner():
         "📋 Variables in Python Dictionary format:\n"
         f"{json.dumps(run_configs.variables)}\n\n"
     )
-    response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt)
-    json_response = agentic_base.helper.extract_json_block(response)
-    run_configs.pendingTask.clear()
-    functionList = []
-    count = 0
-    while True:
-        val = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/FunctionCalls/" + str(count) + "/functionCall")
-        if val is None:
-            break
-        else:
-            functionList.append(agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/FunctionCalls/" + str(
-                count) + "/functionCall"))
-            run_configs.pendingTask.append(
-                agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/FunctionCalls/" + str(count) + "/subTask"))
-            count += 1
-    run_configs.pendingTask.append(agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/PendingTasks"))
+    if state.planFeedback:
+        userPrompt += (
+            "⚠️ Your previous Function Plan for this task was rejected before execution. Return a corrected plan that fixes these problems:\n"
+            + "\n".join(state.planFeedback) + "\n\n"
+        )
+    if run_configs.streaming_planner:
+        # Function calls are executed as soon as they are complete in the streamed response
+        run_configs.pendingTask.clear()
+        state.functionList = StreamingFunctionPlan(
+            systemPrompt, userPrompt,
+            rejectInvalidCalls=state.planRejections < run_configs.plan_validation_max_replans)
+        return AgentStep.EXECUTE
+    response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                            callSite=run_configs.LLM_CallSite.FUNCTION_PLANNER)
+    return applyFunctionPlan(state, FunctionPlan.fromJson(agentic_base.helper.extract_json_block(response)))
+
+def applyFunctionPlan(state: AgentState, plan: FunctionPlan) -> AgentStep:
+    functionList = plan.functionList
     print("Function Plan by Agent: " + str(functionList))
-    print("Reasoning by Agent: " + agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/Reasoning"))
+    print("Reasoning by Agent: " + plan.reasoning)
     if not functionList:
         pytest.fail("Agent could not find any suitable functions to execute")
     else:
         if functionList[0] == "TERMINATE":
             pytest.fail("Agent could not find any suitable functions to execute")
-        else:
-            functionExecutor(functionList)
+    if run_configs.plan_validation:
+        functionList, errors = PlanValidator.validatePlan(functionList)
+        if errors and state.planRejections < run_configs.plan_validation_max_replans:
+            # Nothing has run yet, ask for a corrected plan with the pending tasks as they were
+            print("Function Plan rejected before execution:\n" + "\n".join(errors))
+            state.planRejections += 1
+            state.planFeedback = errors
+            PlanValidator.recordReplan()
+            return AgentStep.PLAN
+    state.planRejections = 0
+    state.planFeedback = []
+    run_configs.pendingTask.clear()
+    run_configs.pendingTask.extend(call.subTask for call in plan.functionCalls)
+    run_configs.pendingTask.append(plan.pendingTasks)
+    state.functionList = functionList
+    return AgentStep.EXECUTE
 
-def functionExecutor(functionList):
-    global task
+def functionExecutor(state: AgentState) -> AgentStep:
     print("-----------------FUNCTIONS EXECUTOR-----------------")
+    functionList, state.functionList = state.functionList, None
     exception = ""
-
-    for value in functionList:
-        value = value.replace("getConfig(", "agentic_base.getConfig(")
-        
-        # Replace object references with full paths
-        value = value.replace("variables[", "run_configs.variables[")
-        value = value.replace("helper.", "agentic_base.helper.")
-        value = value.replace("locator.", "agentic_base.POR." + run_configs.ref + "()." + run_configs.agent + "().")
-        value = value.replace("agent.", "agentic_base.POR." + run_configs.ref + "()." + run_configs.agent + "().")
+    if isinstance(functionList, StreamingFunctionPlan):
+        # Subtasks and PendingTasks are only known once the streamed response is complete
+        functionList.onComplete = lambda: startSpeculativeOrchestration(state)
+    else:
+        startSpeculativeOrchestration(state)
+    batch = agentic_base.helper.batchedVisualAssertions() if run_configs.batch_visual_assertions else nullcontext()
+    executedBefore = len(run_configs.planSteps)
+    with batch:
+        exception = executeFunctions(functionList)
+    rejectedCalls = []
+    if isinstance(functionList, StreamingFunctionPlan):
+        rejectedCalls = functionList.validationErrors
+        if exception != "" or rejectedCalls:
+            functionList.onComplete = None
+        functionList.drain()
+    plannedCalls = functionList.functionList if isinstance(functionList, StreamingFunctionPlan) else list(functionList)
+    state.unexecutedCalls = plannedCalls[len(run_configs.planSteps) - executedBefore:] if exception != "" else []
+    agentic_base.refChangeCheck()
+    if rejectedCalls and exception == "":
+        # Stopped before the invalid call was dispatched, its subtask and the rest of the plan are still pending
+        print("Function Plan rejected before executing:\n" + "\n".join(rejectedCalls))
+        state.planRejections += 1
+        state.planFeedback = rejectedCalls
+        PlanValidator.recordReplan()
+        return AgentStep.PLAN
+    if isinstance(functionList, StreamingFunctionPlan):
+        state.planRejections = 0
+        state.planFeedback = []
+    if exception == "":
+        return AgentStep.LEARN
+    if state.speculation is not None:
+        state.speculation.discard("function plan execution failed")
+        state.speculation = None
+    print("Failed: " + str(run_configs.failedSubTask))
+    state.exception = exception
+    return AgentStep.ANALYZE_FAILURE
+
+def executeFunctions(functionList) -> str:
+    exception = ""
+    for functionCall in functionList:
+        queuedAssertion = functionCall.strip().startswith("helper.assertionVisual(")
         try:
-            print(value)
-            exec(value)
-            run_configs.codeStorage.append(value)
-            run_configs.completedSubtasks.append(run_configs.pendingTask.pop(0))
+            if not queuedAssertion:
+                # Queued visual assertions are validated before the UI is changed by the next function
+                agentic_base.helper.flushVisualAssertions()
+            print(functionCall)
+            dispatch_function_call(functionCall)
+            run_configs.codeStorage.append(qualified_function_call(functionCall))
+            completedSubtask = run_configs.pendingTask.pop(0)
+            run_configs.completedSubtasks.append(completedSubtask)
+            run_configs.planSteps.append({"functionCall": functionCall, "ref": run_configs.ref,
+                                          "agent": run_configs.agent, "subTask": completedSubtask})
         except Exception as e:
             print("Exception occurred while executing the above function: " + str(e))
             exception = str(e)
             run_configs.failedSubTask = run_configs.pendingTask.pop(0)
             break 
-    agentic_base.refChangeCheck()
-    if exception == "":
-        learnerAgent()
-    else:
-        print("Failed: " + str(run_configs.failedSubTask))
-        failureAnalyzer(exception)
+    return exception
 
-def learnerAgent():
-    global task
+def learnerAgent(state: AgentState) -> AgentStep:
     if run_configs.countOfConsecutiveFailures > 0:
         print("-----------------LEARNER------------------")
         print("Learning: " + str(run_configs.learnerList))
+        run_configs.countOfConsecutiveFailures = 0
+        if run_configs.learning_store_local_dedup:
+            duplicate = LearningStore.findDuplicate(run_configs.learnerList)
+            if duplicate is not None:
+                print(f"Matching record found in Learning Document. ID: {duplicate[0]} (similarity {duplicate[1]:.2f})")
+            else:
+                print("No suitable record found in Learning Document. Adding new record")
+                LearningStore.append(run_configs.learnerList)
+            return orchestrationStep()
         systemPrompt = (
             "You are a validation assistant for checking whether a new learning already exists in a given Learning Document.\n\n"
 
@@ -354,7 +684,7 @@ def learnerAgent():
             "- Task to Perform (To Mitigate Failure)\n\n"
 
             "📄 Document Contents:\n"
-            f"{agentic_base.readLearner()}\n\n"
+            f"{agentic_base.readLearner(' '.join(str(value) for value in run_configs.learnerList.values()))}\n\n"
 
             "🧠 Your Task:\n"
             "Compare the new learning (provided in the user prompt) against the records in the Learning Document. "
@@ -381,33 +711,49 @@ def learnerAgent():
             "}"
         )
         userPrompt = str(run_configs.learnerList)
-        run_configs.countOfConsecutiveFailures = 0
-        response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt)
-        json_response = agentic_base.helper.extract_json_block(response)
-        output = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/output")
-        reasoning = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/reasoning")
-        idVal = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/ID")
+        response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                                callSite=run_configs.LLM_CallSite.LEARNER)
+        verdict = LearnerVerdict.fromJson(agentic_base.helper.extract_json_block(response))
+        output = verdict.output
+        reasoning = verdict.reasoning
+        idVal = verdict.id
         print("Output: " + output + " ID: " + idVal + "\nReasoning: " + reasoning)
         if output.lower().strip() == "false":
             print("No suitable record found in Learning Document. Adding new record")
-            learner_path = os.path.join(run_configs.get_project_root(), "learner.csv")
-            agentic_base.append_record_to_csv(learner_path, run_configs.learnerList)
-    internal_orchestrator()
+            LearningStore.append(run_configs.learnerList)
+    return orchestrationStep()
 
-def failureAnalyzer(exception: str):
+def failureAnalyzer(state: AgentState) -> AgentStep:
     print("-----------------FAILURE ANALYZER-----------------")
+    exception, state.exception = state.exception, ""
     if "assertion" in exception.lower():
         print("Skipping Failure Analysis")
         pytest.fail(exception)
-        return
+        return AgentStep.DONE
+    unexecutedCalls, state.unexecutedCalls = state.unexecutedCalls, []
+    if FailureFastPath.recover(exception, run_configs.failedSubTask, state.fastPathAttempts,
+                                agentic_base.page, agentic_base.helper) is not None:
+        # Retry the failed call and the rest of its plan, the page is unchanged apart from the recovery
+        run_configs.pendingTask.insert(0, run_configs.failedSubTask)
+        run_configs.failedSubTask = ""
+        if unexecutedCalls:
+            state.functionList = unexecutedCalls
+            return AgentStep.EXECUTE
+        return AgentStep.PLAN
     run_configs.countOfConsecutiveFailures = run_configs.countOfConsecutiveFailures+1
     print ("Consecutive Failures Count: " + str(run_configs.countOfConsecutiveFailures))
     if run_configs.countOfConsecutiveFailures>=2:
         pytest.fail("Consecutive failures exceeded limit. Terminating execution.")
         agentic_base.afterExecutionCleanup()
-        return
+        return AgentStep.DONE
     else:
-        whatsOnUI = agentic_base.helper.askLLMAboutImage(agentic_base.helper.take_screenshot_as_base64())
+        screenshot = agentic_base.helper.take_screenshot_as_base64()
+        # Describe the screen while the agent catalog and past learnings are gathered
+        whatsOnUI, agentsCatalog, pastLearnings = gatherLLM(
+            lambda: agentic_base.helper.askLLMAboutImage(screenshot),
+            agentic_base.getAgentsBasedOnRef,
+            lambda: agentic_base.readLearner(f"{run_configs.failedSubTask} {exception} {run_configs.pendingTask}")
+        )
         systemPrompt = (
             "You are a failure recovery assistant responsible for selecting the best agent to mitigate a failed subtask in a UI automation task.\n\n"
 
@@ -434,10 +780,10 @@ def failureAnalyzer(exception: str):
         )
         userPrompt = (
             "📋 Agents List and Descriptions (CSV):\n"
-            f"{agentic_base.getAgentsBasedOnRef()}\n\n"
+            f"{agentsCatalog}\n\n"
 
             "🎯 User's Overall Task:\n"
-            f"{task}\n\n"
+            f"{run_configs.task}\n\n"
 
             "✅ Completed Subtasks:\n"
             f"{run_configs.completedSubtasks}\n\n"
@@ -455,15 +801,16 @@ def failureAnalyzer(exception: str):
             f"{str(exception)}\n\n"
 
             "📚 Past Learnings:\n"
-            f"{agentic_base.readLearner()}"
+            f"{pastLearnings}"
         )
-        response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt)
-        json_response = agentic_base.helper.extract_json_block(response)
-        run_configs.agent = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/Agent")
-        reasoning = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/Reasoning")
-        failureMitigationTask = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/task")
-        failureReason = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/failureReason")
-        decisionFactor = agentic_base.helper.extractJsonValueBasedOnPath(json_response, "/decisionFactor")
+        response = agentic_base.helper.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                                callSite=run_configs.LLM_CallSite.FAILURE_ANALYZER)
+        analysis = FailureAnalysis.fromJson(agentic_base.helper.extract_json_block(response))
+        run_configs.agent = analysis.agent
+        reasoning = analysis.reasoning
+        failureMitigationTask = analysis.task
+        failureReason = analysis.failureReason
+        decisionFactor = analysis.decisionFactor
         print("Agent Selected by Failure Analyzer Agent: " + run_configs.agent + "\nLLM Reasoning: " + reasoning + "\nTask to be performed: " + failureMitigationTask + "\nFailure Reason: " + failureReason + "\nDecision Factor: " + decisionFactor)
         run_configs.learnerList = {"Failed Subtask": run_configs.failedSubTask, "Failure Reason": failureReason, "Agent Selected": run_configs.agent, "Reasoning for Agent Selection": reasoning, "Task to Perform": failureMitigationTask}
         run_configs.pendingTask.insert(0, failureMitigationTask)
@@ -472,4 +819,4 @@ def failureAnalyzer(exception: str):
         if run_configs.agent.upper().strip() == "TERMINATE":
             pytest.fail("Failure Analyzer could not find a suitable agent available to mitigate failure. Terminating execution")
             agentic_base.afterExecutionCleanup()
-        functionPlanner()
+        return AgentStep.PLAN
@@ -24,17 +24,46 @@ from src.main.utilities.helper.helper_apps_implementation import HelperApps
 
 from src.main.utilities.helper.helper_browser_implementation import HelperBrowser
 from src.main.utilities.helper.helper_common import HelperInterface
+from src.main.utilities.llm.llm_client_registry import LLMClientRegistry
+from src.main.utilities.llm.llm_response_cache import LLMResponseCache
+from src.main.utilities.llm.llm_router import LLMRouter
+from src.main.utilities.llm.vision_memo import VisionMemo
+from src.main.utilities.llm.llm_fixture_provider import LLMFixtureTranscript
+from core_agentic.learning_store import LearningStore
+from core_agentic.plan_store import PlanStore
+from core_agentic.plan_validator import PlanValidator
+from core_agentic.tool_registry import ToolRegistry
+from core_agentic.speculative_orchestrator import SpeculativeOrchestration
+from core_agentic.failure_fast_path import FailureFastPath
+from core_agentic.page_identifier import PageIdentifier, CONFIRMED, REJECTED, AMBIGUOUS
+from core_agentic.browser_pool import BrowserPool
+
+class _AgenticBaseModule(ModuleType):
+    """
+    `page`, `playwright`, `browser`, `mobile_driver`, `helper` and `POR` belong to the current session, see
+    run_configs.RunContext.
+    """
+    page: Page = run_configs.context_property("page")
+    playwright: Playwright = run_configs.context_property("playwright")
+    browser: Browser = run_configs.context_property("browser")
+    mobile_driver: WebDriver = run_configs.context_property("mobile_driver")
+    POR = run_configs.context_property("POR")
+
+    @property
+    def helper(self) -> HelperInterface:
+        context = run_configs.current_context()
+        if context.helper is None:
+            context.helper = HelperInterface()
+        return context.helper
 
-page: Page = None
-playwright: Playwright = None
-browser: Browser = None
-mobile_driver: WebDriver = None
+    @helper.setter
+    def helper(self, value: HelperInterface):
+        run_configs.current_context().helper = value
 
-helper: HelperInterface = HelperInterface()
-POR = None
+
+sys.modules[__name__].__class__ = _AgenticBaseModule
 
 def launch_app():
-    global mobile_driver
     if run_configs.channel.lower().strip() == "android":
         print("Android Execution")
         options = UiAutomator2Options()
@@ -50,43 +79,80 @@ def launch_app():
         options.udid = ""
         options.bundle_id = ""
         options.no_reset = True
-    mobile_driver = webdriver.Remote("http://127.0.0.1:4723", options=options)
-    mobile_driver.implicitly_wait(10)
+    run_configs.mobile_driver = webdriver.Remote("http://127.0.0.1:4723", options=options)
+    run_configs.mobile_driver.implicitly_wait(10)
 
 def launch_browser():
-    global page, playwright, browser
     if not run_configs.dryRun:
-        playwright = sync_playwright().start()
-        browser = playwright.chromium.launch(headless=False)
-        context = None
-        if run_configs.channel == "dweb":
-            context = browser.new_context()
-        elif run_configs.channel == "mweb":
-            # dict_keys(['Blackberry PlayBook', 'Blackberry PlayBook landscape', 'BlackBerry Z30', 'BlackBerry Z30 landscape', 'Galaxy Note 3', 'Galaxy Note 3 landscape', 'Galaxy Note II', 'Galaxy Note II landscape', 'Galaxy S III', 'Galaxy S III landscape', 'Galaxy S5', 'Galaxy S5 landscape', 'Galaxy S8', 'Galaxy S8 landscape', 'Galaxy S9+', 'Galaxy S9+ landscape', 'Galaxy S24', 'Galaxy S24 landscape', 'Galaxy A55', 'Galaxy A55 landscape', 'Galaxy Tab S4', 'Galaxy Tab S4 landscape', 'Galaxy Tab S9', 'Galaxy Tab S9 landscape', 'iPad (gen 5)', 'iPad (gen 5) landscape', 'iPad (gen 6)', 'iPad (gen 6) landscape', 'iPad (gen 7)', 'iPad (gen 7) landscape', 'iPad (gen 11)', 'iPad (gen 11) landscape', 'iPad Mini', 'iPad Mini landscape', 'iPad Pro 11', 'iPad Pro 11 landscape', 'iPhone 6', 'iPhone 6 landscape', 'iPhone 6 Plus', 'iPhone 6 Plus landscape', 'iPhone 7', 'iPhone 7 landscape', 'iPhone 7 Plus', 'iPhone 7 Plus landscape', 'iPhone 8', 'iPhone 8 landscape', 'iPhone 8 Plus', 'iPhone 8 Plus landscape', 'iPhone SE', 'iPhone SE landscape', 'iPhone SE (3rd gen)', 'iPhone SE (3rd gen) landscape', 'iPhone X', 'iPhone X landscape', 'iPhone XR', 'iPhone XR landscape', 'iPhone 11', 'iPhone 11 landscape', 'iPhone 11 Pro', 'iPhone 11 Pro landscape', 'iPhone 11 Pro Max', 'iPhone 11 Pro Max landscape', 'iPhone 12', 'iPhone 12 landscape', 'iPhone 12 Pro', 'iPhone 12 Pro landscape', 'iPhone 12 Pro Max', 'iPhone 12 Pro Max landscape', 'iPhone 12 Mini', 'iPhone 12 Mini landscape', 'iPhone 13', 'iPhone 13 landscape', 'iPhone 13 Pro', 'iPhone 13 Pro landscape', 'iPhone 13 Pro Max', 'iPhone 13 Pro Max landscape', 'iPhone 13 Mini', 'iPhone 13 Mini landscape', 'iPhone 14', 'iPhone 14 landscape', 'iPhone 14 Plus', 'iPhone 14 Plus landscape', 'iPhone 14 Pro', 'iPhone 14 Pro landscape', 'iPhone 14 Pro Max', 'iPhone 14 Pro Max landscape', 'iPhone 15', 'iPhone 15 landscape', 'iPhone 15 Plus', 'iPhone 15 Plus landscape', 'iPhone 15 Pro', 'iPhone 15 Pro landscape', 'iPhone 15 Pro Max', 'iPhone 15 Pro Max landscape', 'Kindle Fire HDX', 'Kindle Fire HDX landscape', 'LG Optimus L70', 'LG Optimus L70 landscape', 'Microsoft Lumia 550', 'Microsoft Lumia 550 landscape', 'Microsoft Lumia 950', 'Microsoft Lumia 950 landscape', 'Nexus 10', 'Nexus 10 landscape', 'Nexus 4', 'Nexus 4 landscape', 'Nexus 5', 'Nexus 5 landscape', 'Nexus 5X', 'Nexus 5X landscape', 'Nexus 6', 'Nexus 6 landscape', 'Nexus 6P', 'Nexus 6P landscape', 'Nexus 7', 'Nexus 7 landscape', 'Nokia Lumia 520', 'Nokia Lumia 520 landscape', 'Nokia N9', 'Nokia N9 landscape', 'Pixel 2', 'Pixel 2 landscape', 'Pixel 2 XL', 'Pixel 2 XL landscape', 'Pixel 3', 'Pixel 3 landscape', 'Pixel 4', 'Pixel 4 landscape', 'Pixel 4a (5G)', 'Pixel 4a (5G) landscape', 'Pixel 5', 'Pixel 5 landscape', 'Pixel 7', 'Pixel 7 landscape', 'Moto G4', 'Moto G4 landscape', 'Desktop Chrome HiDPI', 'Desktop Edge HiDPI', 'Desktop Firefox HiDPI', 'Desktop Safari', 'Desktop Chrome', 'Desktop Edge', 'Desktop Firefox'])
-            device = playwright.devices['Pixel 7']
-            context = browser.new_context(**device)
-        context.tracing.start(
-            screenshots=True,
-            snapshots=True,
-            sources=True  # Optional: include source files
-        )
-        page = context.new_page()
-        page.goto(run_configs.url)
+        if run_configs.browser_pool:
+            context, page, navigated = BrowserPool.acquire(startTracing)
+        else:
+            playwright = run_configs.playwright = sync_playwright().start()
+            browser = run_configs.browser = playwright.chromium.launch(headless=run_configs.browser_headless)
+            context = None
+            if run_configs.channel == "dweb":
+                context = browser.new_context()
+            elif run_configs.channel == "mweb":
+                # dict_keys(['Blackberry PlayBook', 'Blackberry PlayBook landscape', 'BlackBerry Z30', 'BlackBerry Z30 landscape', 'Galaxy Note 3', 'Galaxy Note 3 landscape', 'Galaxy Note II', 'Galaxy Note II landscape', 'Galaxy S III', 'Galaxy S III landscape', 'Galaxy S5', 'Galaxy S5 landscape', 'Galaxy S8', 'Galaxy S8 landscape', 'Galaxy S9+', 'Galaxy S9+ landscape', 'Galaxy S24', 'Galaxy S24 landscape', 'Galaxy A55', 'Galaxy A55 landscape', 'Galaxy Tab S4', 'Galaxy Tab S4 landscape', 'Galaxy Tab S9', 'Galaxy Tab S9 landscape', 'iPad (gen 5)', 'iPad (gen 5) landscape', 'iPad (gen 6)', 'iPad (gen 6) landscape', 'iPad (gen 7)', 'iPad (gen 7) landscape', 'iPad (gen 11)', 'iPad (gen 11) landscape', 'iPad Mini', 'iPad Mini landscape', 'iPad Pro 11', 'iPad Pro 11 landscape', 'iPhone 6', 'iPhone 6 landscape', 'iPhone 6 Plus', 'iPhone 6 Plus landscape', 'iPhone 7', 'iPhone 7 landscape', 'iPhone 7 Plus', 'iPhone 7 Plus landscape', 'iPhone 8', 'iPhone 8 landscape', 'iPhone 8 Plus', 'iPhone 8 Plus landscape', 'iPhone SE', 'iPhone SE landscape', 'iPhone SE (3rd gen)', 'iPhone SE (3rd gen) landscape', 'iPhone X', 'iPhone X landscape', 'iPhone XR', 'iPhone XR landscape', 'iPhone 11', 'iPhone 11 landscape', 'iPhone 11 Pro', 'iPhone 11 Pro landscape', 'iPhone 11 Pro Max', 'iPhone 11 Pro Max landscape', 'iPhone 12', 'iPhone 12 landscape', 'iPhone 12 Pro', 'iPhone 12 Pro landscape', 'iPhone 12 Pro Max', 'iPhone 12 Pro Max landscape', 'iPhone 12 Mini', 'iPhone 12 Mini landscape', 'iPhone 13', 'iPhone 13 landscape', 'iPhone 13 Pro', 'iPhone 13 Pro landscape', 'iPhone 13 Pro Max', 'iPhone 13 Pro Max landscape', 'iPhone 13 Mini', 'iPhone 13 Mini landscape', 'iPhone 14', 'iPhone 14 landscape', 'iPhone 14 Plus', 'iPhone 14 Plus landscape', 'iPhone 14 Pro', 'iPhone 14 Pro landscape', 'iPhone 14 Pro Max', 'iPhone 14 Pro Max landscape', 'iPhone 15', 'iPhone 15 landscape', 'iPhone 15 Plus', 'iPhone 15 Plus landscape', 'iPhone 15 Pro', 'iPhone 15 Pro landscape', 'iPhone 15 Pro Max', 'iPhone 15 Pro Max landscape', 'Kindle Fire HDX', 'Kindle Fire HDX landscape', 'LG Optimus L70', 'LG Optimus L70 landscape', 'Microsoft Lumia 550', 'Microsoft Lumia 550 landscape', 'Microsoft Lumia 950', 'Microsoft Lumia 950 landscape', 'Nexus 10', 'Nexus 10 landscape', 'Nexus 4', 'Nexus 4 landscape', 'Nexus 5', 'Nexus 5 landscape', 'Nexus 5X', 'Nexus 5X landscape', 'Nexus 6', 'Nexus 6 landscape', 'Nexus 6P', 'Nexus 6P landscape', 'Nexus 7', 'Nexus 7 landscape', 'Nokia Lumia 520', 'Nokia Lumia 520 landscape', 'Nokia N9', 'Nokia N9 landscape', 'Pixel 2', 'Pixel 2 landscape', 'Pixel 2 XL', 'Pixel 2 XL landscape', 'Pixel 3', 'Pixel 3 landscape', 'Pixel 4', 'Pixel 4 landscape', 'Pixel 4a (5G)', 'Pixel 4a (5G) landscape', 'Pixel 5', 'Pixel 5 landscape', 'Pixel 7', 'Pixel 7 landscape', 'Moto G4', 'Moto G4 landscape', 'Desktop Chrome HiDPI', 'Desktop Edge HiDPI', 'Desktop Firefox HiDPI', 'Desktop Safari', 'Desktop Chrome', 'Desktop Edge', 'Desktop Firefox'])
+                device = playwright.devices['Pixel 7']
+                context = browser.new_context(**device)
+            startTracing(context)
+            page = context.new_page()
+            navigated = False
+        run_configs.page = page
+        if not navigated:
+            print(f"🌐 Navigating to: {run_configs.url}")
+            page.goto(run_configs.url)
 
 def closeBrowser():
-    global page, browser, playwright, mobile_driver, helper
     if "web" in run_configs.channel.lower().strip():
         if run_configs.eventValidationGA:
-            helper.clear_events()
-        page.close()
-        browser.close()
-        playwright.stop()
+            run_configs.helper.clear_events()
+        if run_configs.browser_pool:
+            BrowserPool.release(run_configs.page.context, startTracing)
+        else:
+            run_configs.page.close()
+            run_configs.browser.close()
+            run_configs.playwright.stop()
     else:
-        mobile_driver.quit()
+        run_configs.mobile_driver.quit()
+
+def startTracing(context):
+    """
+    Starts tracing the context at `run_configs.trace_level`. Starting also opens the trace chunk of the test,
+    see stopTracing.
+    """
+    if run_configs.trace_level == run_configs.TraceLevel.OFF:
+        return
+    full = run_configs.trace_level == run_configs.TraceLevel.FULL
+    context.tracing.start(screenshots=full, snapshots=full, sources=full)
+
+def traceFilePath() -> str:
+    name = re.sub(r"[^\w.-]+", "_", run_configs.testName or "trace").strip("_")
+    return os.path.join(run_configs.get_project_root(), run_configs.trace_dir, f"{name}.zip")
+
+def stopTracing():
+    """
+    Saves the trace chunk of the test as `<trace_dir>/<test name>.zip`, or discards it when the test passed and
+    `run_configs.trace_retention` is ON_FAILURE.
+    """
+    if run_configs.trace_level == run_configs.TraceLevel.OFF or run_configs.page is None:
+        return
+    tracing = run_configs.page.context.tracing
+    try:
+        if run_configs.trace_retention == run_configs.TraceRetention.ALWAYS or run_configs.testFailed:
+            path = traceFilePath()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tracing.stop_chunk(path=path)
+            print(f"🧾 Trace saved: {path}")
+        else:
+            tracing.stop_chunk()
+        tracing.stop()
+    except Exception as e:
+        print(f"⚠️  Could not stop tracing: {e}")
 
 def getPage() -> Page:
-    global page
-    return page
+    return run_configs.page
 
 def extract_agent_info(file_path: str, channel: str):
     with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
@@ -143,15 +209,22 @@ def getAgentsBasedOnRef() -> str:
     if not os.path.exists(folder_path):
         return ""
 
-    agents = []
-
+    details_paths = []
     for root, dirs, files in os.walk(folder_path):
         for file in files:
             if file == "agent_details.py":
-                full_path = os.path.join(root, file)
-                result = extract_agent_info(full_path, run_configs.channel)
-                if result:
-                    agents.append(result)
+                details_paths.append(os.path.join(root, file))
+
+    channel = run_configs.channel
+    return ToolRegistry.cached(f"agents|{run_configs.ref}|{channel}", details_paths,
+                               lambda: buildAgentsCsv(details_paths, channel))
+
+def buildAgentsCsv(details_paths: List[str], channel: str) -> str:
+    agents = []
+    for full_path in details_paths:
+        result = extract_agent_info(full_path, channel)
+        if result:
+            agents.append(result)
 
     # Write CSV content
     output = io.StringIO()
@@ -164,7 +237,14 @@ def getAgentsBasedOnRef() -> str:
     output.close()
     return csv_string
 
-def readLearner() -> str:
+def readLearner(query: str = None) -> str:
+    """
+    Learnings for the failure analyzer and learner prompts: the `run_configs.learning_store_top_k` learnings most
+    similar to `query`, or the whole learner.csv when no query is given.
+    """
+    if query is not None:
+        return LearningStore.toCsv(LearningStore.topK(query))
+
     project_root = run_configs.get_project_root()
 
     file_path = os.path.join(project_root, "learner.csv")
@@ -180,23 +260,25 @@ def readLearner() -> str:
             writer.writerow(row)
         return output.getvalue()
 
-def getTools(toolType:str):
+def getTools(toolType:str, agent:str = None):
     className = ""
     input_file = ""
+    agent = run_configs.agent if agent is None else agent
     if (toolType.lower().strip() == "helper"):
         input_file = "/src/main/utilities/helper/helper_description.py"
         className = "HelperAgent"
     elif (toolType.lower().strip() == "locator"):
-        input_file = f"/src/main/agent_groups/{run_configs.ref}/agents/{run_configs.agent}/tools/definition/agent_locator_tools.py"
+        input_file = f"/src/main/agent_groups/{run_configs.ref}/agents/{agent}/tools/definition/agent_locator_tools.py"
         className = run_configs.channel
     elif (toolType.lower().strip() == "function"):
-        input_file = f"/src/main/agent_groups/{run_configs.ref}/agents/{run_configs.agent}/tools/definition/agent_function_tools.py"
+        input_file = f"/src/main/agent_groups/{run_configs.ref}/agents/{agent}/tools/definition/agent_function_tools.py"
         className = run_configs.channel
 
     project_root = run_configs.get_project_root()
 
-    finalString = analyze_abstract_methods(str(project_root) + str(input_file), className)
-    return finalString
+    file_path = str(project_root) + str(input_file)
+    return ToolRegistry.cached(f"tools|{file_path}|{className}", [file_path],
+                               lambda: analyze_abstract_methods(file_path, className))
 
 def get_agents_por():
     module_path = f"src.main.por.por_agent_groups"
@@ -204,36 +286,35 @@ def get_agents_por():
     return getattr(module, "Agents_POR")
 
 def initialSetup():
-    global page, helper, POR, mobile_driver
     if "web" in run_configs.channel.lower().strip():
         launch_browser()
-        helper = HelperBrowser(page)
+        run_configs.helper = HelperBrowser(run_configs.page)
     else:
         launch_app()
-        helper = HelperApps(mobile_driver)
+        run_configs.helper = HelperApps(run_configs.mobile_driver)
     Agents_POR_Class = get_agents_por()
-    POR = Agents_POR_Class()
+    run_configs.POR = Agents_POR_Class()
 
 def refChangeCheck():
-    global helper
+    helper = run_configs.helper
     if run_configs.dryRun == False:
         newRef = run_configs.newRef
         oldRef = run_configs.ref
         if oldRef != newRef:
             print("---------------------PAGE CHANGE VALIDATION---------------------")
-            desc = newRef
-            if newRef == "home_page":
-                desc = "Home Page of Ferry booking application. If you find a search widget with Source, Destination, Departure date and Return date fields, you are on the correct page. Important: If the page has a modify search option, on top of search result page, it should still be considered as home page"
-            elif newRef == "search_result_page":
-                desc = "Displaying ferries available based on search criteria (No ferries available message may be displayed if no ferries are available)"
-            elif newRef == "time_selection_page":
-                desc = "Displaying list of time slots available for the selected ferry"
-            response = helper.visualValidation(helper.take_screenshot_as_base64(),
-                                        "Check the entire screenshot and verify if we are on " + newRef + ": " + desc)
-            arr = response.split("|")
-            check = arr[0].strip().lower()
-            reasoning = arr[1].strip()
-            if check == "false":
+            outcome, reasoning = AMBIGUOUS, ""
+            if run_configs.page_signatures and "web" in run_configs.channel.lower().strip():
+                outcome, reasoning = PageIdentifier.identify(newRef, oldRef)
+                print(f"Page signature check for {newRef}: {outcome} ({reasoning})")
+            if outcome == AMBIGUOUS:
+                desc = PageIdentifier.description(newRef)
+                response = helper.visualValidation(helper.take_screenshot_as_base64(),
+                                            "Check the entire screenshot and verify if we are on " + newRef + ": " + desc,
+                                            run_configs.LLM_CallSite.PAGE_CHANGE)
+                arr = response.split("|")
+                outcome = REJECTED if arr[0].strip().lower() == "false" else CONFIRMED
+                reasoning = arr[1].strip()
+            if outcome == REJECTED:
                 # setRef(oldRef)
                 error_msg = f"❌ PAGE CHANGE VALIDATION FAILED!\n" + \
                            f"───────────────────────────────\n" + \
@@ -244,24 +325,20 @@ def refChangeCheck():
                 run_configs.ref = newRef
                 print("Page changed successfully to: " + newRef + "\nReasoning: " + reasoning)
 
-def afterExecutionCleanup():
-    global page
+def afterExecutionCleanup(sharedStats: bool = True):
+    """
+    Ends the session of the current test. `sharedStats=False` leaves the process-wide statistics and the vision
+    memo to printSharedStats, for sessions that run concurrently with others.
+    """
     print("--------------------Cleanup started---------------------------------------------")
     print("Code Storage: ")
     for s in run_configs.codeStorage:
         print("        " + s)
     if "web" in run_configs.channel.lower().strip():
-        try:
-            page.context.tracing.stop(path="trace.zip")
-        except Exception as e:
-            pass
+        stopTracing()
     else:
-       mobile_driver.quit()
+       run_configs.mobile_driver.quit()
     run_configs.end_time = time.time()
-    try:
-        page.context.tracing.stop(path="trace.zip")
-    except Exception as e:
-        pass
     closeBrowser()
     run_configs.end_time = time.time()
     print(f"End time: {datetime.now()}")
@@ -272,10 +349,45 @@ def afterExecutionCleanup():
     llmTotalTime = sum(run_configs.llmResponseTime)
     print(f"Total time consumed by all LLM calls: {llmTotalTime:.2f} seconds")
     print(f"Portion of execution time consumed by LLM: {(llmTotalTime / duration) * 100:.2f}%")
+    print("Prompt cache read tokens: " + str(sum(run_configs.llmCacheReadTokens)) +
+          " | Prompt cache creation tokens: " + str(sum(run_configs.llmCacheCreationTokens)))
+    for step, durations in run_configs.agentStepTimes.items():
+        print(f"Agent step [{step}]: count={len(durations)}, total={sum(durations):.2f}s, "
+              f"avg={sum(durations) / len(durations):.2f}s")
+    for callSite, stats in run_configs.llmCallSiteStats.items():
+        print(f"LLM call site [{callSite}]: calls={stats['calls']}, "
+              f"avg latency={sum(stats['responseTime']) / stats['calls']:.2f}s, "
+              f"max latency={max(stats['responseTime']):.2f}s, tokens={sum(stats['tokens'])}, "
+              f"avg tokens={sum(stats['tokens']) / stats['calls']:.0f}")
+    if run_configs.screenshotBytesSaved:
+        print(f"Screenshot preprocessing: {len(run_configs.screenshotBytesSaved)} screenshots, "
+              f"bytes saved={sum(run_configs.screenshotBytesSaved)}, "
+              f"estimated vision tokens saved={sum(run_configs.screenshotTokensSaved)}")
+    if sharedStats:
+        printSharedStats()
     run_configs.reset_global_variables()
     print("--------------------Cleanup Done---------------------------------------------")
     print("------------------------------END OF AGENTIC EXECUTION-----------------------------------")
 
+def printSharedStats():
+    """
+    Prints the statistics kept per process rather than per session and clears the vision memo. Concurrent
+    sessions share them, so runConcurrentSessions calls this once after the last session finished.
+    """
+    PlanStore.printStats()
+    PlanValidator.printStats()
+    ToolRegistry.printStats()
+    SpeculativeOrchestration.printStats()
+    FailureFastPath.printStats()
+    PageIdentifier.printStats()
+    BrowserPool.printStats()
+    VisionMemo.printStats()
+    VisionMemo.clear()  # Answers about these screens must not answer the next test
+    LLMClientRegistry.printConnectionStats()
+    LLMRouter.printStats()
+    LLMFixtureTranscript.printStats()
+    LLMResponseCache.printStats()
+
 def append_record_to_csv(csv_file_path, record_dict):
     """
     Appends a dictionary record to a CSV file with auto-incrementing ID.
@@ -354,6 +466,21 @@ def append_record_to_csv(csv_file_path, record_dict):
 
     return new_id
 
+def rankAgentsForTask(agentsCsv: str, taskText: str, topK: int) -> List[str]:
+    """
+    Returns the names of the topK agents from the `getAgentsBasedOnRef` CSV whose name and description share the
+    most words with the task. Ties keep the catalog order.
+    """
+    rows = list(csv.reader(io.StringIO(agentsCsv)))[1:]
+    taskWords = {word for word in re.findall(r"[a-z0-9]+", taskText.lower()) if len(word) > 2}
+    scored = []
+    for index, row in enumerate(rows):
+        if len(row) < 2:
+            continue
+        agentWords = set(re.findall(r"[a-z0-9]+", (row[0].replace("_", " ") + " " + row[1]).lower()))
+        scored.append((-len(taskWords & agentWords), index, row[0]))
+    return [name for _, _, name in sorted(scored)[:topK]]
+
 def findAgentAndDescription(multiline_string, textToStarWith):
     for line in multiline_string.splitlines():
         if line.startswith(textToStarWith):
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Tuple
+
+from playwright.sync_api import sync_playwright, BrowserContext, Page
+
+from core_agentic import run_configs
+
+
+class BrowserPool:
+    """
+    Keeps Chromium running between tests and gives every test a fresh BrowserContext.
+
+    Playwright's sync API objects can only be used from the thread that created them, so the driver and browser
+    are kept per thread (one per concurrent session worker). Up to `run_configs.browser_pool_standby` contexts
+    are kept on standby with `run_configs.url` already loading, so the next test starts on a loaded page.
+    Every context is set up with the given `setupContext` (e.g. agentic_base.startTracing) before its first
+    navigation, so the trace covers the first page load.
+    Call `shutdown()` on a thread once it runs no more tests.
+    """
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    launches = 0
+    contexts = 0
+    standbyHits = 0
+    acquireSeconds = 0.0
+
+    @classmethod
+    def _browser(cls):
+        local = cls._local
+        if getattr(local, "browser", None) is None or not local.browser.is_connected():
+            local.playwright = sync_playwright().start()
+            local.browser = local.playwright.chromium.launch(headless=run_configs.browser_headless)
+            local.standby = deque()
+            with cls._lock:
+                cls.launches += 1
+            print("🚀 Browser launched for the browser pool")
+        return local.playwright, local.browser
+
+    @classmethod
+    def contextOptions(cls, playwright) -> Dict[str, Any]:
+        if run_configs.channel == "mweb":
+            return dict(playwright.devices['Pixel 7'])
+        return {}
+
+    @classmethod
+    def _newContext(cls, setupContext: Callable[[BrowserContext], None]) -> Tuple[BrowserContext, Page]:
+        playwright, browser = cls._browser()
+        context = browser.new_context(**cls.contextOptions(playwright))
+        setupContext(context)
+        with cls._lock:
+            cls.contexts += 1
+        return context, context.new_page()
+
+    @classmethod
+    def acquire(cls, setupContext: Callable[[BrowserContext], None]) -> Tuple[BrowserContext, Page, bool]:
+        """
+        Returns a fresh (context, page, navigated) for a test. `navigated` is True when the page comes from the
+        standby contexts and is already on `run_configs.url`.
+        """
+        startTime = time.time()
+        cls._browser()
+        standby = cls._local.standby
+        key = (run_configs.channel, run_configs.url)
+        while standby:
+            standbyKey, context, page = standby.popleft()
+            if standbyKey == key and not page.is_closed():
+                page.wait_for_load_state("load")
+                with cls._lock:
+                    cls.standbyHits += 1
+                    cls.acquireSeconds += time.time() - startTime
+                return context, page, True
+            context.close()
+        context, page = cls._newContext(setupContext)
+        with cls._lock:
+            cls.acquireSeconds += time.time() - startTime
+        return context, page, False
+
+    @classmethod
+    def release(cls, context: BrowserContext, setupContext: Callable[[BrowserContext], None]):
+        """
+        Closes the context of a finished test and tops up the standby contexts for the next one. Never raises,
+        as it runs during the test cleanup; a standby context that could not be prepared is left to `acquire`.
+        """
+        try:
+            context.close()
+        except Exception as e:
+            print(f"⚠️  Could not close the browser context: {e}")
+        try:
+            cls.fillStandby(setupContext)
+        except Exception as e:
+            print(f"⚠️  Could not prepare a standby browser context: {e}")
+
+    @classmethod
+    def fillStandby(cls, setupContext: Callable[[BrowserContext], None]):
+        standby = getattr(cls._local, "standby", None)
+        if standby is None:
+            return
+        while len(standby) < run_configs.browser_pool_standby:
+            context, page = cls._newContext(setupContext)
+            try:
+                # Only wait for the response to commit, the page keeps loading until the next test acquires it
+                page.goto(run_configs.url, wait_until="commit")
+            except Exception:
+                context.close()
+                raise
+            standby.append(((run_configs.channel, run_configs.url), context, page))
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Closes the standby contexts, the browser and the driver of the current thread.
+        """
+        local = cls._local
+        if getattr(local, "browser", None) is None:
+            return
+        for _, context, _ in local.standby:
+            try:
+                context.close()
+            except Exception:
+                pass
+        try:
+            local.browser.close()
+        finally:
+            local.playwright.stop()
+            local.browser = local.playwright = None
+            local.standby = deque()
+
+    @classmethod
+    def printStats(cls):
+        if cls.contexts:
+            print(f"Browser pool: browser launches={cls.launches}, contexts={cls.contexts}, "
+                  f"standby hits={cls.standbyHits}, time acquiring contexts={cls.acquireSeconds:.2f}s")
@@ -0,0 +1,158 @@
+import ast
+import inspect
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Dict, List, Optional, Tuple
+
+from core_agentic import run_configs
+
+PLAN_OBJECTS = ("helper", "locator", "agent")
+
+
+class FunctionCallValidationError(Exception):
+    """
+    Raised when a planned function call references a function that does not exist or passes arguments its
+    signature does not accept. It is raised before anything is executed.
+    """
+
+
+@dataclass
+class CompiledFunctionCall:
+    functionCall: str
+    code: CodeType
+    # (object name, function name, positional argument count, keyword names, has *args/**kwargs, line number)
+    calls: List[Tuple[str, str, int, Tuple[str, ...], bool, int]] = field(default_factory=list)
+    usesAgent: bool = False
+
+
+@lru_cache(maxsize=1024)
+def compile_function_call(functionCall: str) -> CompiledFunctionCall:
+    """
+    Parses a planned function call (a call expression, or a statement block such as the try/except wrapping
+    optional locators) once and caches the code object and the calls made on `helper`, `locator` and `agent`.
+    """
+    try:
+        tree = ast.parse(functionCall.strip(), mode="exec")
+    except SyntaxError as e:
+        raise FunctionCallValidationError(f"Function call is not valid Python: {e.msg}") from None
+    calls = []
+    usesAgent = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and node.attr.startswith("__"):
+            raise FunctionCallValidationError(f"Access to '{node.attr}' is not allowed in a function call")
+        if isinstance(node, ast.Name) and node.id in ("locator", "agent"):
+            usesAgent = True
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id in PLAN_OBJECTS):
+            starred = any(isinstance(arg, ast.Starred) for arg in node.args) or any(
+                keyword.arg is None for keyword in node.keywords)
+            calls.append((node.func.value.id, node.func.attr, len(node.args),
+                          tuple(keyword.arg for keyword in node.keywords if keyword.arg is not None),
+                          starred, node.lineno))
+    code = compile(tree, "<function call>", "exec")
+    return CompiledFunctionCall(functionCall=functionCall, code=code, calls=calls, usesAgent=usesAgent)
+
+
+def resolve_agent():
+    """
+    Object behind the `locator` and `agent` names: the current agent of the current page ref.
+    """
+    return getattr(getattr(run_configs.POR, run_configs.ref)(), run_configs.agent)()
+
+
+def build_namespace(usesAgent: bool) -> Dict[str, Any]:
+    from core_agentic import agentic_base  # agentic_base imports this module through plan_validator
+    namespace = {
+        "helper": agentic_base.helper,
+        "getConfig": agentic_base.getConfig,
+        "variables": run_configs.variables,
+    }
+    if usesAgent:
+        agentObject = resolve_agent()
+        namespace["locator"] = agentObject
+        namespace["agent"] = agentObject
+    return namespace
+
+
+_signatures: Dict[Tuple[type, str], Optional[inspect.Signature]] = {}
+
+
+def function_signature(target: Any, functionName: str) -> Optional[inspect.Signature]:
+    """
+    Signature of a helper/locator/agent function, cached per class. None when it cannot be inspected.
+    """
+    key = (type(target), functionName)
+    if key not in _signatures:
+        try:
+            _signatures[key] = inspect.signature(getattr(target, functionName))
+        except (TypeError, ValueError):
+            _signatures[key] = None
+    return _signatures[key]
+
+
+def check_call(namespace: Dict[str, Any], objectName: str, functionName: str, argCount: int,
+               keywords: Tuple[str, ...] = (), starred: bool = False) -> Optional[str]:
+    """
+    Returns why `objectName.functionName` cannot be called with these arguments, None when it can.
+    """
+    target = namespace.get(objectName)
+    if target is None:
+        return f"'{objectName}' is not available"
+    if not callable(getattr(target, functionName, None)):
+        return f"'{objectName}.{functionName}' is not an available function"
+    signature = function_signature(target, functionName)
+    if starred or signature is None:
+        return None
+    try:
+        signature.bind(*range(argCount), **{keyword: None for keyword in keywords})
+    except TypeError as e:
+        return f"'{objectName}.{functionName}{signature}' cannot be called with {argCount} positional arguments: {e}"
+    return None
+
+
+def validate_function_call(compiled: CompiledFunctionCall, namespace: Dict[str, Any]):
+    """
+    Checks that every helper/locator/agent function exists and accepts the arguments it is called with.
+    """
+    for objectName, functionName, argCount, keywords, starred, lineno in compiled.calls:
+        error = check_call(namespace, objectName, functionName, argCount, keywords, starred)
+        if error is not None:
+            raise FunctionCallValidationError(f"{error} (line {lineno} of the function call)")
+
+
+def dispatch_function_call(functionCall: str):
+    """
+    Validates and executes a planned function call with `helper`, `locator`, `agent`, `getConfig` and
+    `variables` resolved through a namespace instead of rewriting the call text.
+    """
+    compiled = compile_function_call(functionCall)
+    namespace = build_namespace(compiled.usesAgent)
+    validate_function_call(compiled, namespace)
+    exec(compiled.code, namespace)
+
+
+class _QualifyNames(ast.NodeTransformer):
+    def __init__(self, agentPath: str):
+        self.replacements = {
+            "helper": "agentic_base.helper",
+            "locator": agentPath,
+            "agent": agentPath,
+            "getConfig": "agentic_base.getConfig",
+            "variables": "run_configs.variables",
+        }
+
+    def visit_Name(self, node):
+        if node.id in self.replacements:
+            return ast.copy_location(ast.parse(self.replacements[node.id], mode="eval").body, node)
+        return node
+
+
+def qualified_function_call(functionCall: str) -> str:
+    """
+    Fully qualified source of a function call as it ran (e.g. `agentic_base.POR.home_page().search_widget().src()`),
+    kept in `run_configs.codeStorage`.
+    """
+    agentPath = f"agentic_base.POR.{run_configs.ref}().{run_configs.agent}()"
+    tree = _QualifyNames(agentPath).visit(ast.parse(functionCall.strip(), mode="exec"))
+    return ast.unparse(tree)
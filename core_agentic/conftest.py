@@ -1,5 +1,7 @@
 import pytest
 
+from core_agentic import run_configs
+from core_agentic.browser_pool import BrowserPool
 from src.main.utilities.helper.helper_common import HelperInterface
 
 
@@ -104,6 +106,55 @@ def pytest_configure(config):
     config.pluginmanager.register(test_stats_plugin, "test_stats")
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Name the trace of the test after it, before its fixtures start the browser"""
+    run_configs.testName = item.nodeid
+    run_configs.testFailed = False  # Tests that never reach afterExecutionCleanup leave the previous verdict behind
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Record failures before teardown, so the cleanup knows to keep the trace"""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when in ("setup", "call") and report.failed:
+        run_configs.testFailed = True
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Close the pooled browser kept warm between tests"""
+    BrowserPool.shutdown()
+
+
+class FakeAgent:
+    """Stand-in for the search_widget agent of home_page, for tests without a browser"""
+
+    def src(self):
+        return "//*[@data-autoid='src']"
+
+    def selectDate(self, days):
+        return f"//*[@data-day='{days}']"
+
+
+class FakePageAgents:
+    def search_widget(self):
+        return FakeAgent()
+
+
+class FakePOR:
+    def home_page(self):
+        return FakePageAgents()
+
+
+@pytest.fixture
+def agent_session(helper):
+    """Runs the test in its own session on home_page/search_widget with the module's `helper` fixture"""
+    context = run_configs.RunContext(ref="home_page", agent="search_widget", helper=helper, POR=FakePOR())
+    with run_configs.session(context):
+        yield context
+
+
 # @pytest.fixture(scope="session", autouse=True)
 # def setup_once_before_all_tests():
 #     print("\n=== Setup before all tests ===")
@@ -0,0 +1,165 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from playwright.sync_api import Page
+
+from core_agentic import run_configs
+
+SPINNER_XPATH = "//*[contains(@class,'indeterminate_spinner_')]"
+BOTTOM_SHEET_XPATH = "//*[@data-autoid='bottom-sheet']"
+# Close buttons and backdrops that dismiss a bottom sheet, tried in order when Escape does not close it
+BOTTOM_SHEET_CLOSE_XPATHS = [
+    "//*[@data-autoid='bottom-sheet']//*[contains(@class,'icon-close')]",
+    "//*[@data-autoid='bottom-sheet']//*[contains(@class,'closeIcon_')]",
+    "//*[contains(@class,'backdrop_') and not(ancestor-or-self::*[@data-autoid='bottom-sheet'])]",
+]
+
+# Failure signatures over the Playwright exception text
+TIMEOUT = re.compile(r"Timeout \d+ms exceeded")
+OVERLAY = re.compile(r"intercepts pointer events|element is not stable|element is outside of the viewport")
+# verifyAndGetLocator returned None and the None selector reached Playwright
+MISSING_LOCATOR = re.compile(r"expected string, got (undefined|null|object)|'NoneType' object|selector: None")
+
+# Whether the page is still loading and which known overlays are visible, in a single round trip
+DOM_PROBE = """([spinnerXpath, bottomSheetXpath]) => {
+    const visible = (xpath) => {
+        const nodes = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < nodes.snapshotLength; i++) {
+            const rect = nodes.snapshotItem(i).getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) return true;
+        }
+        return false;
+    };
+    return {
+        loading: document.readyState !== "complete" || visible(spinnerXpath),
+        bottomSheet: visible(bottomSheetXpath)
+    };
+}"""
+
+
+@dataclass
+class FailureRule:
+    name: str
+    signature: re.Pattern  # Matched against the exception text
+    applies: Callable[[Dict[str, Any]], bool]  # Checked against the DOM probe result
+    recover: Callable[[Page, Any], bool]  # Recovery action on (page, helper), returns whether the page can be retried
+
+
+def probe_dom(page: Page) -> Optional[Dict[str, Any]]:
+    try:
+        return page.evaluate(DOM_PROBE, [SPINNER_XPATH, BOTTOM_SHEET_XPATH])
+    except Exception as e:
+        print(f"⚠️  DOM probe for the failure fast path failed: {e}")
+        return None
+
+
+def wait_for_page_load(page: Page, helper) -> bool:
+    helper.wait_until_page_load_complete()
+    state = probe_dom(page)
+    return state is not None and not state["loading"]
+
+
+def dismiss_bottom_sheet(page: Page, helper) -> bool:
+    """
+    Closes the bottom sheet with Escape, else with the first visible declared close button or backdrop.
+    Only counts as recovered when the sheet is gone and the page did not navigate away.
+    """
+    url = page.url
+    page.keyboard.press("Escape")
+    time.sleep(0.5)
+    state = probe_dom(page)
+    for xpath in BOTTOM_SHEET_CLOSE_XPATHS:
+        if state is None or not state["bottomSheet"]:
+            break
+        closer = page.locator(xpath).first
+        if closer.count() == 0 or not closer.is_visible():
+            continue
+        closer.click(timeout=2000)
+        time.sleep(0.5)
+        state = probe_dom(page)
+    if page.url != url:
+        print(f"⚠️  Dismissing the bottom sheet navigated from {url} to {page.url}")
+        return False
+    return state is not None and not state["bottomSheet"]
+
+
+class FailureFastPath:
+    """
+    Recovers from mechanical Playwright failures without the failure analyzer.
+
+    The exception text is matched against known failure signatures and confirmed with one DOM probe. A known
+    signature is mapped straight to its recovery action (waiting for the page to load, dismissing a bottom sheet)
+    and the failed call is retried. That skips the screenshot, the screen description and the failure analyzer
+    LLM calls; unknown signatures, failed recoveries and repeated failures still go to the failure analyzer.
+    """
+
+    RULES = [
+        # A bottom sheet is only dismissed when it intercepts the action, the plan may have opened it on purpose
+        FailureRule("overlay_bottom_sheet", OVERLAY, lambda dom: dom["bottomSheet"], dismiss_bottom_sheet),
+        FailureRule("overlay_loading", OVERLAY, lambda dom: dom["loading"], wait_for_page_load),
+        FailureRule("timeout_loading", TIMEOUT, lambda dom: dom["loading"], wait_for_page_load),
+        FailureRule("missing_locator_loading", MISSING_LOCATOR, lambda dom: dom["loading"], wait_for_page_load),
+    ]
+
+    _lock = threading.Lock()
+    matched: Dict[str, int] = {}
+    avoidedAnalyzerCalls = 0
+    fallbacks = 0
+
+    @classmethod
+    def classify(cls, exception: str, page: Page) -> Optional[FailureRule]:
+        """
+        Rule for a failure, None when its signature is unknown or the DOM does not confirm it.
+        """
+        candidates = [rule for rule in cls.RULES if rule.signature.search(exception)]
+        if not candidates:
+            return None
+        dom = probe_dom(page)
+        if dom is None:
+            return None
+        return next((rule for rule in candidates if rule.applies(dom)), None)
+
+    @classmethod
+    def recover(cls, exception: str, failedSubTask: str, attempts: Dict[str, int], page: Page,
+                helper) -> Optional[str]:
+        """
+        Applies the recovery action of the matching rule. Returns the rule name when the failed subtask can be
+        retried, None when the failure analyzer is needed. `attempts` counts recoveries per rule and subtask so a
+        failure that persists after its recovery is handed over to the failure analyzer. `page` and `helper` are
+        the ones of the session the failure happened in.
+        """
+        if not run_configs.failure_fast_path or run_configs.dryRun or "web" not in run_configs.channel.lower():
+            return None
+        rule = cls.classify(exception, page)
+        if rule is None:
+            return None
+        key = f"{rule.name}|{failedSubTask}"
+        if attempts.get(key, 0) >= run_configs.failure_fast_path_max_retries:
+            print(f"⏩ Failure fast path: {rule.name} persisted after recovery, falling back to the failure analyzer")
+            with cls._lock:
+                cls.fallbacks += 1
+            return None
+        attempts[key] = attempts.get(key, 0) + 1
+        print(f"⏩ Failure fast path: known failure {rule.name}, recovering without the failure analyzer")
+        try:
+            recovered = rule.recover(page, helper)
+        except Exception as e:
+            print(f"⚠️  Failure fast path recovery {rule.name} failed: {e}")
+            recovered = False
+        with cls._lock:
+            cls.matched[rule.name] = cls.matched.get(rule.name, 0) + 1
+            if recovered:
+                cls.avoidedAnalyzerCalls += 1
+            else:
+                cls.fallbacks += 1
+        return rule.name if recovered else None
+
+    @classmethod
+    def printStats(cls):
+        if cls.matched or cls.fallbacks:
+            rules = ", ".join(f"{name}={count}" for name, count in cls.matched.items())
+            print(f"Failure fast path: failure analyzer calls avoided={cls.avoidedAnalyzerCalls}, "
+                  f"fallbacks={cls.fallbacks}, matched rules: {rules or 'none'}")
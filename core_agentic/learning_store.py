@@ -0,0 +1,198 @@
+import csv
+import io
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from core_agentic import run_configs
+
+LEARNING_FIELDS = [
+    'Failed Subtask',
+    'Failure Reason',
+    'Agent Selected',
+    'Reasoning for Agent Selection',
+    'Task to Perform'
+]
+_COLUMNS = ["failed_subtask", "failure_reason", "agent_selected", "reasoning", "task_to_perform"]
+
+
+def learning_terms(text: str) -> Counter:
+    """
+    Word unigrams and bigrams of a text, used as TF-IDF terms.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+class LearningStore:
+    """
+    SQLite backed store of failure learnings with an in-memory TF-IDF index.
+
+    Prompts only get the `run_configs.learning_store_top_k` learnings most similar to the failure at hand,
+    near-duplicates are detected locally and a new learning is a single INSERT. Every learning is mirrored to
+    learner.csv so the file stays readable and reviewable. An existing learner.csv is imported on first use.
+    """
+
+    _lock = threading.RLock()
+    _connection: Optional[sqlite3.Connection] = None
+    _connectionPath: Optional[str] = None
+    _records: Dict[int, Dict[str, Any]] = {}  # id -> learning record
+    _terms: Dict[int, Counter] = {}  # id -> term counts
+    _documentFrequency: Counter = Counter()
+    _postings: Dict[str, set] = {}  # term -> ids of the learnings containing it
+    _indexedId = 0
+
+    @classmethod
+    def csvPath(cls) -> str:
+        return os.path.join(run_configs.get_project_root(), "learner.csv")
+
+    @classmethod
+    def dbPath(cls) -> str:
+        return os.path.join(run_configs.get_project_root(), run_configs.learning_store_db)
+
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        path = cls.dbPath()
+        if cls._connection is not None and cls._connectionPath == path:
+            return cls._connection
+        connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        connection.execute("CREATE TABLE IF NOT EXISTS learnings (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                           + ", ".join(f"{column} TEXT" for column in _COLUMNS) + ")")
+        if connection.execute("SELECT COUNT(*) FROM learnings").fetchone()[0] == 0:
+            cls._importCsv(connection)
+        connection.commit()
+        cls._connection, cls._connectionPath = connection, path
+        cls._records, cls._terms, cls._documentFrequency, cls._postings, cls._indexedId = {}, {}, Counter(), {}, 0
+        return connection
+
+    @classmethod
+    def _importCsv(cls, connection: sqlite3.Connection):
+        if not os.path.exists(cls.csvPath()):
+            return
+        with open(cls.csvPath(), 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    recordId = int(row['ID'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                connection.execute(f"INSERT OR IGNORE INTO learnings (id, {', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                                   [recordId] + [row.get(field) or "" for field in LEARNING_FIELDS])
+
+    @classmethod
+    def _refreshIndex(cls):
+        """
+        Indexes learnings added since the last refresh, including ones written by other test processes.
+        """
+        connection = cls._connect()
+        rows = connection.execute(f"SELECT id, {', '.join(_COLUMNS)} FROM learnings WHERE id > ? ORDER BY id",
+                                  (cls._indexedId,)).fetchall()
+        for row in rows:
+            record = {'ID': row[0], **dict(zip(LEARNING_FIELDS, row[1:]))}
+            terms = learning_terms(" ".join(str(record[field] or "") for field in LEARNING_FIELDS))
+            cls._records[row[0]] = record
+            cls._terms[row[0]] = terms
+            cls._documentFrequency.update(terms.keys())
+            for term in terms:
+                cls._postings.setdefault(term, set()).add(row[0])
+            cls._indexedId = row[0]
+
+    @classmethod
+    def _idf(cls, term: str) -> float:
+        return math.log((len(cls._records) + 1) / (cls._documentFrequency[term] + 1)) + 1
+
+    @classmethod
+    def _similar(cls, text: str) -> List[Tuple[float, int]]:
+        queryTerms = learning_terms(text)
+        queryWeights = {term: count * cls._idf(term) for term, count in queryTerms.items()}
+        queryNorm = math.sqrt(sum(weight * weight for weight in queryWeights.values()))
+        if not queryNorm:
+            return []
+        candidates = set()
+        for term in queryTerms:
+            candidates |= cls._postings.get(term, set())
+        scored = []
+        for recordId in candidates:
+            documentWeights = {term: count * cls._idf(term) for term, count in cls._terms[recordId].items()}
+            dot = sum(weight * documentWeights.get(term, 0.0) for term, weight in queryWeights.items())
+            documentNorm = math.sqrt(sum(weight * weight for weight in documentWeights.values()))
+            if dot and documentNorm:
+                scored.append((dot / (queryNorm * documentNorm), recordId))
+        return sorted(scored, key=lambda item: (-item[0], item[1]))
+
+    @classmethod
+    def topK(cls, query: str, k: int = None) -> List[Dict[str, Any]]:
+        """
+        Returns the k learnings most similar to the query (TF-IDF cosine over word unigrams and bigrams).
+        """
+        k = run_configs.learning_store_top_k if k is None else k
+        with cls._lock:
+            cls._refreshIndex()
+            return [cls._records[recordId] for _, recordId in cls._similar(query)[:k]]
+
+    @classmethod
+    def findDuplicate(cls, record: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """
+        Returns (ID, similarity) of an existing learning for the same agent whose fields are at least
+        `run_configs.learning_duplicate_threshold` similar to the record, None when it is new.
+        """
+        agent = str(record.get('Agent Selected') or "").strip().lower()
+        with cls._lock:
+            cls._refreshIndex()
+            for score, recordId in cls._similar(" ".join(str(record.get(field) or "") for field in LEARNING_FIELDS)):
+                if score < run_configs.learning_duplicate_threshold:
+                    break
+                if str(cls._records[recordId]['Agent Selected'] or "").strip().lower() == agent:
+                    return recordId, score
+        return None
+
+    @classmethod
+    def append(cls, record: Dict[str, Any]) -> int:
+        """
+        Inserts a learning and appends it to learner.csv, returning its ID.
+        """
+        missing_keys = [key for key in LEARNING_FIELDS if key not in record]
+        if missing_keys:
+            raise KeyError(f"Missing required keys in record_dict: {missing_keys}")
+        with cls._lock:
+            connection = cls._connect()
+            cursor = connection.execute(f"INSERT INTO learnings ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                                        [str(record[field] or "") for field in LEARNING_FIELDS])
+            connection.commit()
+            newId = cursor.lastrowid
+            cls._appendCsv({'ID': newId, **{field: record[field] for field in LEARNING_FIELDS}})
+            cls._refreshIndex()
+        return newId
+
+    @classmethod
+    def _appendCsv(cls, row: Dict[str, Any]):
+        path = cls.csvPath()
+        writeHeader = not os.path.exists(path) or os.path.getsize(path) == 0
+        needsNewline = False
+        if not writeHeader:
+            with open(path, 'rb') as f:
+                f.seek(-1, 2)
+                needsNewline = f.read(1) != b'\n'
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            if needsNewline:
+                f.write('\n')
+            writer = csv.DictWriter(f, fieldnames=['ID'] + LEARNING_FIELDS)
+            if writeHeader:
+                writer.writeheader()
+            writer.writerow(row)
+
+    @classmethod
+    def toCsv(cls, records: List[Dict[str, Any]]) -> str:
+        """
+        Learnings in the learner.csv format used in prompts. Empty when there are none.
+        """
+        if not records:
+            return ""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=['ID'] + LEARNING_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+        return output.getvalue()
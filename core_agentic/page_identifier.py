@@ -0,0 +1,161 @@
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core_agentic import run_configs
+from core_agentic.tool_registry import ToolRegistry
+
+# URL, title and the visible landmarks among the given XPaths, in a single round trip
+PAGE_PROBE = """(xpaths) => {
+    const visible = (xpath) => {
+        const nodes = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < nodes.snapshotLength; i++) {
+            const rect = nodes.snapshotItem(i).getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) return true;
+        }
+        return false;
+    };
+    return {url: window.location.href, title: document.title, landmarks: xpaths.filter(visible)};
+}"""
+
+CONFIRMED = "confirmed"
+REJECTED = "rejected"
+AMBIGUOUS = "ambiguous"
+
+
+def load_page_details(details_path: str, channel: str) -> Optional[Dict[str, Any]]:
+    from core_agentic import agentic_base  # agentic_base imports this module
+    module = agentic_base.load_module_from_file(details_path)
+    details = getattr(module, channel, None) or getattr(module, "common", None)
+    if details is None:
+        return None
+    return {
+        "page_name": details.page_name,
+        "page_description": getattr(details, "page_description", details.page_name),
+        "url_patterns": list(getattr(details, "url_patterns", [])),
+        "title_patterns": list(getattr(details, "title_patterns", [])),
+        "landmarks": list(getattr(details, "landmarks", [])),
+    }
+
+
+def has_signature(details: Dict[str, Any]) -> bool:
+    return bool(details["url_patterns"] or details["title_patterns"] or details["landmarks"])
+
+
+def signature_matches(details: Dict[str, Any], probe: Dict[str, Any]) -> bool:
+    """
+    Whether the probed page has the page's signature: one of its URL patterns, one of its title patterns and one
+    of its landmarks, each only when declared.
+    """
+    if not has_signature(details):
+        return False
+    if details["url_patterns"] and not any(re.search(p, probe["url"]) for p in details["url_patterns"]):
+        return False
+    if details["title_patterns"] and not any(re.search(p, probe["title"]) for p in details["title_patterns"]):
+        return False
+    if details["landmarks"] and not set(details["landmarks"]) & set(probe["landmarks"]):
+        return False
+    return True
+
+
+class PageIdentifier:
+    """
+    Identifies the current page from the signatures declared in `agent_groups/<ref>/page_details.py` (URL
+    patterns, title regexes and landmark data-autoid selectors) with one in-page probe, instead of a screenshot
+    and a vision LLM call.
+
+    The expected page is confirmed when it is the only page whose signature matches and rejected when another page
+    alone matches. Anything else (no signature declared, several or no pages matching, only the previous page
+    matching because it has not been replaced yet) is ambiguous and left to the vision validation.
+    """
+
+    _lock = threading.Lock()
+    probes = 0
+    confirmed = 0
+    rejected = 0
+    ambiguous = 0
+
+    @classmethod
+    def detailsPaths(cls) -> List[str]:
+        folder_path = os.path.join(run_configs.get_project_root(), "src", "main", "agent_groups")
+        if not os.path.exists(folder_path):
+            return []
+        return sorted(os.path.join(folder_path, ref, "page_details.py") for ref in os.listdir(folder_path)
+                      if os.path.isfile(os.path.join(folder_path, ref, "page_details.py")))
+
+    @classmethod
+    def pages(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Page details of every agent group for the current channel, keyed by page ref.
+        """
+        details_paths = cls.detailsPaths()
+        channel = run_configs.channel
+
+        def build():
+            pages = {}
+            for details_path in details_paths:
+                details = load_page_details(details_path, channel)
+                if details is not None:
+                    pages[details["page_name"]] = details
+            return pages
+
+        return ToolRegistry.cached(f"pages|{channel}", details_paths, build)
+
+    @classmethod
+    def description(cls, ref: str) -> str:
+        details = cls.pages().get(ref)
+        return details["page_description"] if details else ref
+
+    @classmethod
+    def waitForLandmark(cls, details: Dict[str, Any]):
+        """
+        Waits up to `run_configs.page_signature_wait_ms` for one of the page's landmarks, as the action that
+        changes the page usually returns before the new page is rendered.
+        """
+        if not details["landmarks"] or not run_configs.page_signature_wait_ms:
+            return
+        try:
+            run_configs.page.wait_for_selector("xpath=" + " | ".join(details["landmarks"]), state="visible",
+                                               timeout=run_configs.page_signature_wait_ms)
+        except Exception:
+            print(f"⚠️  No landmark of {details['page_name']} visible after {run_configs.page_signature_wait_ms}ms")
+
+    @classmethod
+    def identify(cls, expectedRef: str, previousRef: str = None) -> Tuple[str, str]:
+        """
+        Returns (CONFIRMED | REJECTED | AMBIGUOUS, reasoning) for being on `expectedRef` after leaving `previousRef`.
+        """
+        pages = cls.pages()
+        if expectedRef not in pages or not has_signature(pages[expectedRef]):
+            return cls._record(AMBIGUOUS, f"no page signature declared for {expectedRef}")
+        cls.waitForLandmark(pages[expectedRef])
+        xpaths = sorted({xpath for details in pages.values() for xpath in details["landmarks"]})
+        try:
+            probe = run_configs.page.evaluate(PAGE_PROBE, xpaths)
+        except Exception as e:
+            return cls._record(AMBIGUOUS, f"page probe failed: {e}")
+        with cls._lock:
+            cls.probes += 1
+        matching = [ref for ref, details in pages.items() if signature_matches(details, probe)]
+        if matching == [expectedRef]:
+            return cls._record(CONFIRMED, f"only the {expectedRef} signature matches {probe['url']}")
+        if matching == [previousRef]:
+            # The previous page may not have been replaced yet, vision decides
+            return cls._record(AMBIGUOUS, f"only the previous page {previousRef} signature matches {probe['url']}")
+        if len(matching) == 1:
+            return cls._record(REJECTED, f"the page matches the {matching[0]} signature instead "
+                                         f"(url: {probe['url']}, landmarks: {probe['landmarks']})")
+        return cls._record(AMBIGUOUS, f"pages matching the signatures: {matching or 'none'}")
+
+    @classmethod
+    def _record(cls, outcome: str, reasoning: str) -> Tuple[str, str]:
+        with cls._lock:
+            setattr(cls, outcome, getattr(cls, outcome) + 1)
+        return outcome, reasoning
+
+    @classmethod
+    def printStats(cls):
+        if cls.confirmed or cls.rejected or cls.ambiguous:
+            print(f"Page signatures: probes={cls.probes}, confirmed={cls.confirmed}, rejected={cls.rejected}, "
+                  f"ambiguous (vision validation)={cls.ambiguous}")
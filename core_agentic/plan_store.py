@@ -0,0 +1,109 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core_agentic import run_configs
+from src.main.utilities.llm.llm_response_cache import sha256_text
+
+
+def normalize_task(userTask: str) -> str:
+    """
+    Case and whitespace insensitive form of a user task, so re-indented or re-wrapped test prompts share a plan.
+    """
+    return re.sub(r"\s+", " ", userTask or "").strip().lower()
+
+
+class PlanStore:
+    """
+    Persistent store of the function calls that completed a user task, keyed by the normalized task, the channel
+    and the starting `pageRef`.
+
+    Every successfully executed function call is recorded in `run_configs.planSteps` as the raw planner output
+    together with the page ref and agent it ran under. When a task completes the steps are written to
+    `run_configs.plan_store_dir` as one JSON file, and the next run of the same task replays them through the
+    executor without calling the orchestrator or the planner.
+    """
+
+    _lock = threading.Lock()
+    replayedSteps = 0
+    replays = 0
+    fallbacks = 0
+    saved = 0
+
+    @classmethod
+    def storeDir(cls) -> str:
+        return os.path.join(run_configs.get_project_root(), run_configs.plan_store_dir)
+
+    @classmethod
+    def planKey(cls, userTask: str, channel: str = None, pageRef: str = None) -> str:
+        channel = run_configs.channel if channel is None else channel
+        pageRef = run_configs.pageRef if pageRef is None else pageRef
+        return sha256_text(json.dumps([normalize_task(userTask), channel.lower().strip(), pageRef]))
+
+    @classmethod
+    def _plan_path(cls, key: str) -> str:
+        return os.path.join(cls.storeDir(), key + ".json")
+
+    @classmethod
+    def lookup(cls, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the stored steps of the plan, None when the task was never completed or the file is unreadable.
+        """
+        try:
+            with open(cls._plan_path(key), "r", encoding="utf-8") as f:
+                steps = json.load(f).get("steps")
+        except (FileNotFoundError, json.JSONDecodeError, OSError, AttributeError):
+            return None
+        return steps or None
+
+    @classmethod
+    def save(cls, key: str, userTask: str, steps: List[Dict[str, Any]]):
+        if not steps:
+            return
+        path = cls._plan_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"task": userTask, "channel": run_configs.channel, "pageRef": run_configs.pageRef,
+                       "savedAt": time.time(), "steps": steps}, f, indent=2)
+        os.replace(tmp_path, path)
+        with cls._lock:
+            cls.saved += 1
+        print(f"💾 Stored plan with {len(steps)} function calls for replay: {path}")
+
+    @classmethod
+    def replaySteps(cls, steps: List[Dict[str, Any]], refChangeCheck: Callable[[], None]) -> Iterator[str]:
+        """
+        Yields the stored function calls for `executeFunctions`, switching to the agent each call originally ran
+        under just before it is executed. When the stored page ref changes between two calls, the page change is
+        validated with `refChangeCheck` (agentic_base.refChangeCheck) like after a planned function call; the
+        replay stops before the call when the application is not on the expected page.
+        """
+        with cls._lock:
+            cls.replays += 1
+        for step in steps:
+            if step["ref"] != run_configs.ref:
+                run_configs.setRef(step["ref"])
+                refChangeCheck()
+                if run_configs.ref != step["ref"]:
+                    print(f"Stored plan expected {step['ref']} before {step['functionCall']}, "
+                          f"the application is still on {run_configs.ref}")
+                    return
+            run_configs.agent = step["agent"]
+            yield step["functionCall"]
+            with cls._lock:
+                cls.replayedSteps += 1
+
+    @classmethod
+    def recordFallback(cls):
+        with cls._lock:
+            cls.fallbacks += 1
+
+    @classmethod
+    def printStats(cls):
+        if cls.replays or cls.saved:
+            print(f"Plan store: replays={cls.replays}, replayed function calls={cls.replayedSteps}, "
+                  f"fallbacks to LLM={cls.fallbacks}, plans stored={cls.saved}")
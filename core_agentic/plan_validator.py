@@ -0,0 +1,195 @@
+import ast
+import difflib
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from core_agentic import run_configs
+from core_agentic.call_dispatcher import PLAN_OBJECTS, FunctionCallValidationError, build_namespace, check_call, \
+    compile_function_call
+
+PLACEHOLDER = re.compile(r"<[^<>\s]+>")
+CATALOG_FUNCTION = re.compile(r"^- (\w+)\(", re.MULTILINE)
+# Tool catalog shown to the planner for each plan object (see agentic_base.getTools)
+CATALOG_TOOL_TYPES = {"helper": "Helper", "locator": "Locator", "agent": "Function"}
+
+
+def catalog_functions(objectName: str) -> List[str]:
+    """
+    Functions of the tool catalog the planner is given for a plan object, the only candidates for a repair.
+    """
+    from core_agentic import agentic_base  # agentic_base imports this module
+    try:
+        catalog = agentic_base.getTools(CATALOG_TOOL_TYPES[objectName])
+    except Exception:
+        return []
+    return CATALOG_FUNCTION.findall(catalog or "")
+
+
+class _RepairCall(ast.NodeTransformer):
+    """
+    Repairs the calls of one planned function call in place and collects what could not be repaired.
+    """
+
+    def __init__(self, namespace: Dict[str, Any]):
+        self.namespace = namespace
+        self.repairs: List[str] = []
+        self.errors: List[str] = []
+        self._catalogs: Dict[str, List[str]] = {}
+
+    def _functions(self, objectName: str) -> List[str]:
+        """
+        Catalog functions available on the plan object. Internal helper methods such as setupLLM are not in the
+        catalog, so a misspelled call is never repaired into one of them.
+        """
+        target = self.namespace.get(objectName)
+        if target is None:
+            return []
+        if objectName not in self._catalogs:
+            self._catalogs[objectName] = [name for name in catalog_functions(objectName)
+                                          if callable(getattr(target, name, None))]
+        return self._catalogs[objectName]
+
+    def _resolve_function(self, objectName: str, functionName: str) -> Tuple[str, str]:
+        """
+        Returns the (object, function) the planner most likely meant: the same function on another plan object
+        (e.g. `locator.click` -> `helper.click`), else the closest spelling on the same object.
+        """
+        for otherObject in PLAN_OBJECTS:
+            if functionName in self._functions(otherObject):
+                return otherObject, functionName
+        for candidateObject in (objectName,) + tuple(name for name in PLAN_OBJECTS if name != objectName):
+            matches = difflib.get_close_matches(functionName, self._functions(candidateObject), n=1,
+                                                cutoff=run_configs.plan_validation_match_cutoff)
+            if matches:
+                return candidateObject, matches[0]
+        return objectName, functionName
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in PLAN_OBJECTS:
+            self._repair_plan_call(node, func)
+        elif isinstance(func, ast.Name) and func.id == "getConfig":
+            self._check_config(node)
+        return node
+
+    def _repair_plan_call(self, node: ast.Call, func: ast.Attribute):
+        objectName, functionName = func.value.id, func.attr
+        if not callable(getattr(self.namespace.get(objectName), functionName, None)):
+            repairedObject, repairedFunction = self._resolve_function(objectName, functionName)
+            if (repairedObject, repairedFunction) != (objectName, functionName):
+                self.repairs.append(f"{objectName}.{functionName} -> {repairedObject}.{repairedFunction}")
+                func.value.id, func.attr = repairedObject, repairedFunction
+                objectName, functionName = repairedObject, repairedFunction
+        # Placeholders passed as plain strings are resolved through getConfig (Rule 12)
+        for index, arg in enumerate(node.args):
+            if (isinstance(arg, ast.Constant) and isinstance(arg.value, str) and PLACEHOLDER.fullmatch(arg.value)
+                    and self.namespace["getConfig"](arg.value) is not None):
+                self.repairs.append(f'"{arg.value}" -> getConfig(\'{arg.value}\')')
+                node.args[index] = ast.copy_location(ast.Call(func=ast.Name(id="getConfig", ctx=ast.Load()),
+                                                              args=[ast.Constant(value=arg.value)], keywords=[]), arg)
+        starred = any(isinstance(arg, ast.Starred) for arg in node.args) or any(
+            keyword.arg is None for keyword in node.keywords)
+        error = check_call(self.namespace, objectName, functionName, len(node.args),
+                           tuple(keyword.arg for keyword in node.keywords if keyword.arg is not None), starred)
+        if error is not None:
+            self.errors.append(error)
+
+    def _check_config(self, node: ast.Call):
+        if not node.args or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+            return
+        key = node.args[0].value
+        if self.namespace["getConfig"](key) is None:
+            self.errors.append(f"getConfig('{key}') has no value in the test data configs")
+
+
+class PlanValidator:
+    """
+    Checks planned function calls against the live helper/locator/agent signatures and the test data configs
+    before any of them runs.
+
+    Misspelled functions, functions called on the wrong object and unwrapped `<placeholder>` arguments are
+    repaired locally. Anything else is reported so the planner can be asked for a corrected plan instead of
+    failing mid-plan and going through screen description, failure analysis and re-planning.
+    """
+
+    ROUND_TRIPS_PER_RECOVERY = 3  # Screen description, failure analysis and re-planning LLM calls
+    _lock = threading.Lock()
+    validatedPlans = 0
+    repairedCalls = 0
+    rejectedPlans = 0
+    savedRoundTrips = 0
+
+    @classmethod
+    def _namespace(cls) -> Dict[str, Any]:
+        try:
+            return build_namespace(usesAgent=True)
+        except Exception:
+            # No current agent (e.g. a helper only plan), locator/agent calls are reported as unavailable
+            return build_namespace(usesAgent=False)
+
+    @classmethod
+    def repairCall(cls, functionCall: str, namespace: Dict[str, Any] = None) -> Tuple[str, List[str]]:
+        """
+        Returns the (possibly repaired) function call and the problems that could not be repaired. `namespace` is
+        the one the call runs with (see `build_namespace`), its `getConfig` resolves placeholders.
+        """
+        namespace = cls._namespace() if namespace is None else namespace
+        try:
+            compile_function_call(functionCall)
+        except FunctionCallValidationError as e:
+            return functionCall, [str(e)]
+        repair = _RepairCall(namespace)
+        tree = repair.visit(ast.parse(functionCall.strip(), mode="exec"))
+        if not repair.repairs:
+            return functionCall, repair.errors
+        repaired = ast.unparse(ast.fix_missing_locations(tree))
+        print(f"🔧 Repaired function call {functionCall} -> {repaired} ({', '.join(repair.repairs)})")
+        with cls._lock:
+            cls.repairedCalls += 1
+        return repaired, repair.errors
+
+    @classmethod
+    def validatePlan(cls, functionList: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Repairs what it can in the whole plan. Returns the plan and the problems left, one per invalid call.
+        """
+        namespace = cls._namespace()
+        repairedPlan = []
+        errors = []
+        needsRecovery = False
+        for index, functionCall in enumerate(functionList):
+            repaired, callErrors = cls.repairCall(functionCall, namespace)
+            needsRecovery = needsRecovery or repaired != functionCall or bool(callErrors)
+            repairedPlan.append(repaired)
+            errors.extend(f"FunctionCalls[{index}] {functionCall}: {error}" for error in callErrors)
+        cls.recordPlan(rejected=bool(errors))
+        if needsRecovery and not errors:
+            # Executing the plan as planned would have failed at the first repaired call
+            cls.recordAvoidedRecovery()
+        return repairedPlan, errors
+
+    @classmethod
+    def recordPlan(cls, rejected: bool):
+        with cls._lock:
+            cls.validatedPlans += 1
+            if rejected:
+                cls.rejectedPlans += 1
+
+    @classmethod
+    def recordAvoidedRecovery(cls):
+        with cls._lock:
+            cls.savedRoundTrips += cls.ROUND_TRIPS_PER_RECOVERY
+
+    @classmethod
+    def recordReplan(cls):
+        # A corrected plan costs one planner call instead of a full failure recovery
+        with cls._lock:
+            cls.savedRoundTrips += cls.ROUND_TRIPS_PER_RECOVERY - 1
+
+    @classmethod
+    def printStats(cls):
+        if cls.validatedPlans or cls.repairedCalls:
+            print(f"Plan validation: plans={cls.validatedPlans}, repaired calls={cls.repairedCalls}, "
+                  f"rejected plans={cls.rejectedPlans}, LLM round trips saved (estimated)={cls.savedRoundTrips}")
@@ -1,12 +1,19 @@
 import os
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import MISSING, dataclass, field, fields
 from pathlib import Path
 from enum import Enum
+from types import ModuleType
+from typing import Any, Callable
 
 class LLM_Provider(Enum):
     PERPLEXITY = "perplexity"
     AWS_BEDROCK = "bedrock"
     GEMINI = "gemini"
     OPENAI_INTERNAL = "openai_internal"
+    LOCAL_FIXTURE = "local_fixture"  # Replays recorded responses from llm_fixture_dir, no network needed
 
 class LLM_MODEL(Enum):
     GPT_4O = "gpt-4O"
@@ -15,6 +22,44 @@ class LLM_MODEL(Enum):
     GEMINI_2_5_PRO = "gemini-2.5-pro"
     GEMINI_3 = "gemini-3-pro-preview"
 
+class LLM_CacheMode(Enum):
+    OFF = "off"
+    READ_WRITE = "read_write"  # Serve identical prompts from the on-disk cache, call the LLM on a miss
+    REPLAY_ONLY = "replay_only"  # Serve only from the on-disk cache, fail the test on a miss
+
+class LLM_FixtureLatency(Enum):
+    ZERO = "zero"  # Answer recorded responses immediately, measures LEAP's own overhead
+    RECORDED = "recorded"  # Sleep for the latency observed when the response was recorded
+
+class ScreenshotFormat(Enum):
+    PNG = "PNG"
+    JPEG = "JPEG"
+    WEBP = "WEBP"
+
+class TraceLevel(Enum):
+    OFF = "off"
+    ACTIONS = "actions"  # Actions and their logs only, no screenshots, DOM snapshots or sources
+    FULL = "full"  # Actions with screenshots, DOM snapshots and sources
+
+class TraceRetention(Enum):
+    ALWAYS = "always"
+    ON_FAILURE = "on_failure"  # Traces of passed tests are discarded
+
+class LLM_CallSite(Enum):
+    DEFAULT = "default"
+    ORCHESTRATOR = "orchestrator"
+    FUNCTION_PLANNER = "function_planner"
+    ORCHESTRATE_AND_PLAN = "orchestrate_and_plan"
+    FAILURE_ANALYZER = "failure_analyzer"
+    LEARNER = "learner"
+    PAGE_CHANGE = "page_change"
+    VISUAL_ASSERTION = "visual_assertion"
+    TEXT_ASSERTION = "text_assertion"
+    VISUAL_GET_TEXT = "visual_get_text"
+    DESCRIBE_SCREEN = "describe_screen"
+    TEXT_MATCH = "text_match"
+    LOCATOR_HEALING = "locator_healing"
+
 from playwright.sync_api import Page, Browser, Playwright
 
 channel = "mweb" # Options: "mweb", "dweb", "android", "ios"
@@ -26,37 +71,190 @@ pageRef = "home_page"  # Initial page reference
 llm_provider = LLM_Provider.GEMINI # Options: "openai", "gemini", "anthropic"
 llm_model = LLM_MODEL.GEMINI_2_5_PRO
 project_root_folder_name = 'leap'
+llm_http_pool_size = 10  # Max keep-alive connections pooled per LLM provider
+llm_cache_mode = LLM_CacheMode.OFF  # Options: OFF, READ_WRITE, REPLAY_ONLY
+llm_cache_dir = ".llm_cache"  # Relative to project root
+llm_cache_max_bytes = 500 * 1024 * 1024
+llm_cache_max_age_seconds = 7 * 24 * 60 * 60
+llm_cache_eviction_interval = 50  # Eviction pass runs after every N cache writes
+llm_prompt_caching = True  # Mark static system prompts (planner/orchestrator rules) as provider-side cacheable prefix
+llm_prompt_cache_ttl_seconds = 600  # Lifetime of Gemini cached contents
+llm_max_concurrency = 4  # Max LLM requests in flight when independent calls are fanned out concurrently
+llm_prompt_cache_min_chars = 8000  # Gemini explicit caching is skipped below this size (provider minimum token count)
+# Model, thinking budget and max output tokens per LLM call site. None falls back to `llm_model` and the provider
+# defaults (thinking budget 24576 on Gemini / 30000 on Bedrock, max tokens 65536 on Bedrock); a thinking budget of 0
+# disables thinking. Call sites missing here use the DEFAULT route.
+llm_routing = {
+    LLM_CallSite.DEFAULT: {"model": None, "thinking_budget": None, "max_tokens": None},
+    LLM_CallSite.LEARNER: {"model": None, "thinking_budget": 1024, "max_tokens": 4096},
+    LLM_CallSite.PAGE_CHANGE: {"model": None, "thinking_budget": 1024, "max_tokens": 4096},
+    LLM_CallSite.TEXT_MATCH: {"model": None, "thinking_budget": 1024, "max_tokens": 4096},
+    LLM_CallSite.VISUAL_GET_TEXT: {"model": None, "thinking_budget": 0, "max_tokens": None},
+}
+llm_fallback_providers = []  # Providers hedged to / failed over to after llm_provider, e.g. [LLM_Provider.AWS_BEDROCK]
+llm_provider_models = {  # Model used when a request is hedged or failed over to another provider
+    LLM_Provider.GEMINI: LLM_MODEL.GEMINI_2_5_PRO,
+    LLM_Provider.AWS_BEDROCK: LLM_MODEL.SONNET_4_5,
+}
+llm_hedging = True  # Send a duplicate request to the next provider once the first is slower than its p95 latency
+llm_hedge_default_delay_seconds = 30  # Hedge delay until a provider has llm_router_min_samples latency samples
+llm_router_window = 50  # Rolling latency/error samples kept per provider
+llm_router_min_samples = 5
+llm_retry_base_delay_seconds = 1  # Exponential backoff with jitter between retries of the same provider
+llm_retry_max_delay_seconds = 20
+llm_fixture_dir = "llm_fixtures"  # Recorded transcript used by LLM_Provider.LOCAL_FIXTURE, relative to project root
+llm_fixture_record = False  # Record every live LLM response into llm_fixture_dir
+llm_fixture_latency = LLM_FixtureLatency.ZERO
+llm_fixture_match_images = False  # Screenshots differ between runs, so images are not part of the transcript key
+screenshot_preprocessing = True  # Crop, downscale and re-encode screenshots before vision LLM calls (needs Pillow)
+screenshot_max_long_edge = 1568  # Longer screenshot edge in pixels after downscaling, 0 keeps the original size
+screenshot_format = ScreenshotFormat.JPEG
+screenshot_quality = 85  # JPEG/WebP quality
+vision_memo_enabled = True  # Answer repeated vision questions about an unchanged screen locally
+vision_memo_hash_size = 16  # Perceptual hash is hash_size x hash_size bits
+vision_memo_hamming_threshold = 0  # Max differing hash bits for two screenshots to count as the same screen
+vision_memo_max_entries = 128
+# Call sites answered from the memo. Text extraction and visual assertions are excluded: a changed digit (price,
+# date, count) rarely changes the perceptual hash
+vision_memo_call_sites = [LLM_CallSite.PAGE_CHANGE, LLM_CallSite.DESCRIBE_SCREEN]
+batch_visual_assertions = True  # Consecutive assertionVisual calls on the same viewport share one screenshot and LLM call
+max_agent_steps = 500  # Upper bound on orchestrator/planner/executor/learner/failure analyzer steps per test
+streaming_planner = True  # Stream the planner response and execute each function call as soon as it is complete
+speculative_orchestration = True  # Start the next orchestrator call while the function plan executes, used only if the plan succeeds
+learning_store_db = "learner.db"  # SQLite learning store mirrored to learner.csv, relative to project root
+learning_store_top_k = 5  # Most similar past learnings put into failure analyzer and learner prompts
+learning_store_local_dedup = True  # Detect already known learnings locally instead of asking the LLM
+learning_duplicate_threshold = 0.85  # TF-IDF cosine similarity from which a learning for the same agent is a duplicate
+plan_validation = True  # Check planned calls against the tool signatures and test data before executing any of them
+plan_validation_max_replans = 1  # Times an invalid plan is sent back to the planner before it is executed anyway
+plan_validation_match_cutoff = 0.85  # Minimum similarity for repairing a misspelled function name
+failure_fast_path = True  # Recover from known Playwright failure signatures without the failure analyzer LLM calls
+failure_fast_path_max_retries = 1  # Fast path recoveries per failure signature and subtask before the failure analyzer is used
+page_signatures = True  # Confirm page changes from the page_details.py signatures of the agent groups, vision only when ambiguous
+page_signature_wait_ms = 5000  # Wait for a landmark of the expected page before probing, the old page may still be shown
+browser_pool = True  # Keep Chromium running between tests, each test gets a fresh BrowserContext
+browser_pool_standby = 1  # Contexts per worker thread kept on standby with the url already loading
+browser_headless = False
+trace_level = TraceLevel.FULL  # Options: OFF, ACTIONS, FULL
+trace_retention = TraceRetention.ON_FAILURE  # Options: ALWAYS, ON_FAILURE
+trace_dir = "traces"  # Traces are saved as <trace_dir>/<test name>.zip, relative to project root
+combined_orchestration = False  # Select the agent and plan its function calls in a single LLM call
+combined_orchestration_top_k = 3  # Candidate agents whose tool catalogs are sent in combined orchestration
+tool_registry_manifest = ".tool_registry.json"  # Agent catalog and tool descriptions cache, relative to project root. None keeps it in memory only
+plan_store_record = False  # Store the function calls of every completed task for replay
+plan_store_replay = False  # Replay stored function calls without LLM calls, the orchestrator takes over from the first failure. Skips the orchestrator and planner, so opt in only where that is what the suite should test
+plan_store_dir = "plan_store"  # Relative to project root
 
 ## Variables used internally during execution
 thinking = True
-ref = 'home_page'
-SECTION_AUTO_ID = []
-pendingTask = []
-completedSubtasks = []
-countOfConsecutiveFailures = 0
-codeStorage = []
-variables = {}
-agent = None
-agentReasoning = ""
-failedSubTask = "None"
-orchestratorExecutionCount = 0
-learnerList = {}
-start_time = None
-end_time = None
-llmResponseTime = []
-llmTokens = []
-mobile_driver = None
-page: Page = None  # type: Page
-browser: Browser = None  # type: Browser
-playwright: Playwright = None  # type: Playwright
-newRef = None
-mandatoryElement = True
+
+
+@dataclass
+class RunContext:
+    """
+    State of one test run: the agentic loop progress, LLM statistics and the browser/app session with its helper
+    and POR.
+
+    The fields are read and written as `run_configs.<field>` (and `agentic_base.page/helper/POR/...`) as before,
+    which resolves to the RunContext of the current session. Outside of `session()` every caller shares one
+    default RunContext, so a single test per process behaves as if these were module globals.
+    """
+    ref: str = 'home_page'
+    SECTION_AUTO_ID: list = field(default_factory=list)
+    task: str = None
+    pendingTask: list = field(default_factory=list)
+    completedSubtasks: list = field(default_factory=list)
+    countOfConsecutiveFailures: int = 0
+    codeStorage: list = field(default_factory=list)
+    planSteps: list = field(default_factory=list)  # Successful function calls with the page ref and agent they ran under, see PlanStore
+    variables: dict = field(default_factory=dict)
+    agent: str = None
+    agentReasoning: str = ""
+    failedSubTask: str = "None"
+    orchestratorExecutionCount: int = 0
+    learnerList: dict = field(default_factory=dict)
+    start_time: float = None
+    end_time: float = None
+    llmResponseTime: list = field(default_factory=list)
+    llmTokens: list = field(default_factory=list)
+    llmCacheReadTokens: list = field(default_factory=list)
+    llmCacheCreationTokens: list = field(default_factory=list)
+    llmCallSiteStats: dict = field(default_factory=dict)  # call site -> {"calls", "responseTime", "tokens"}
+    screenshotBytesSaved: list = field(default_factory=list)
+    screenshotTokensSaved: list = field(default_factory=list)
+    agentStepTimes: dict = field(default_factory=dict)  # agent step -> list of durations
+    mobile_driver: Any = None
+    page: Page = None  # type: Page
+    browser: Browser = None  # type: Browser
+    playwright: Playwright = None  # type: Playwright
+    helper: Any = None  # HelperBrowser / HelperApps of this session, see agentic_base
+    POR: Any = None  # Agents_POR of this session
+    newRef: str = None
+    mandatoryElement: bool = True
+    sampleList: list = field(default_factory=list)
+    testName: str = None  # Names the trace file, set by conftest per test
+    testFailed: bool = False  # Set by conftest when the test failed, decides whether the trace is kept
+
+    def reset(self):
+        for contextField in fields(self):
+            if contextField.default_factory is not MISSING:
+                setattr(self, contextField.name, contextField.default_factory())
+            else:
+                setattr(self, contextField.name, contextField.default)
+
+
+_defaultContext = RunContext()
+_currentContext: ContextVar[RunContext] = ContextVar("run_context")
+
+
+def current_context() -> RunContext:
+    return _currentContext.get(_defaultContext)
+
+
+@contextmanager
+def session(context: RunContext = None):
+    """
+    Runs the enclosed code, and everything it calls on this thread, against its own RunContext. Several sessions
+    can run concurrently on different threads, each with its own Playwright context, helper and POR.
+    """
+    token = _currentContext.set(context if context is not None else RunContext())
+    try:
+        yield current_context()
+    finally:
+        _currentContext.reset(token)
+
+
+def in_current_session(call: Callable) -> Callable:
+    """
+    Wraps `call` so it runs against the caller's RunContext on a worker thread. Threads do not inherit the
+    session of the thread that started them.
+    """
+    context = current_context()
+
+    def run(*args, **kwargs):
+        with session(context):
+            return call(*args, **kwargs)
+
+    return run
+
+
+def context_property(name: str) -> property:
+    return property(lambda module: getattr(current_context(), name),
+                    lambda module, value: setattr(current_context(), name, value))
+
+
+class _RunConfigsModule(ModuleType):
+    pass
+
+
+for _contextField in fields(RunContext):
+    setattr(_RunConfigsModule, _contextField.name, context_property(_contextField.name))
+sys.modules[__name__].__class__ = _RunConfigsModule
 
 swipe_start_vertical = 0.75
 swipe_end_vertical = 0.25
 
 rules_helper = None
-sampleList = []
 
 def get_project_root(start_path: str = None) -> str:
     """
@@ -94,46 +292,17 @@ def get_project_root(start_path: str = None) -> str:
     return os.path.dirname(start_path) if start_path != os.getcwd() else start_path
 
 def getRef():
-    return ref
+    return current_context().ref
 
 def setRef(new_ref):
-    global newRef
-    newRef = new_ref
+    current_context().newRef = new_ref
 
 def getNewRef():
-    global newRef
-    return newRef
+    return current_context().newRef
 
 def reset_global_variables():
     """
-        Resets all global variables back to their original values.
+        Resets the run state of the current session back to its original values.
     """
-    global dryRun, exactMatch, pageRef
-    global ref, SECTION_AUTO_ID, pendingTask
-    global completedSubtasks, countOfConsecutiveFailures, codeStorage, variables
-    global agent, agentReasoning, failedSubTask, orchestratorExecutionCount
-    global learnerList, start_time, end_time, llmResponseTime, llmTokens
-    global page, browser, playwright, newRef, mandatoryElement, sampleList, mobile_driver
-    ref = None
-    SECTION_AUTO_ID = []
-    pendingTask = []
-    completedSubtasks = []
-    countOfConsecutiveFailures = 0
-    codeStorage = []
-    variables = {}
-    agent = None
-    agentReasoning = ""
-    failedSubTask = "None"
-    orchestratorExecutionCount = 0
-    learnerList = {}
-    start_time = None
-    end_time = None
-    llmResponseTime = []
-    llmTokens = []
-    page = None
-    browser = None
-    playwright = None
-    mobile_driver = None
-    newRef = None
-    mandatoryElement = True
-    sampleList = []
+    current_context().reset()
+    current_context().ref = None
@@ -0,0 +1,91 @@
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from core_agentic import run_configs
+
+LLM_STAT_FIELDS = ("llmResponseTime", "llmTokens", "llmCacheReadTokens", "llmCacheCreationTokens")
+
+
+class SpeculativeOrchestration:
+    """
+    Orchestrator LLM call started in the background while the current function plan executes.
+
+    The prompts are built assuming every planned call succeeds and the planner's PendingTasks is accurate. When
+    the orchestrator runs, the speculative response is only used if its prompts are identical to the real ones;
+    otherwise (a call failed, the page ref changed, ...) it is discarded and a regular call is made.
+
+    The request cannot be cancelled, so it records its LLM statistics in a private copy of the session that is
+    merged into the session on commit. A discarded request that completes after the test was cleaned up leaves
+    the statistics of that test, and of the next one, untouched.
+    """
+
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-orchestrator")
+    _lock = threading.Lock()
+    started = 0
+    committed = 0
+    discarded = 0
+    overlapSeconds = 0.0
+
+    def __init__(self, systemPrompt: str, userPrompt: str, call: Callable[[], str]):
+        self.prompts = (systemPrompt, userPrompt)
+        self.startTime = time.time()
+        self.endTime = None
+        self._context = dataclasses.replace(run_configs.current_context(), llmCallSiteStats={},
+                                            **{name: [] for name in LLM_STAT_FIELDS})
+        self._future = self._executor.submit(self._run, call)
+        with self._lock:
+            SpeculativeOrchestration.started += 1
+        print("🔮 Speculative orchestrator call started while the function plan executes")
+
+    def _run(self, call: Callable[[], str]) -> str:
+        try:
+            with run_configs.session(self._context):
+                return call()
+        finally:
+            self.endTime = time.time()
+
+    def _mergeStats(self):
+        for name in LLM_STAT_FIELDS:
+            getattr(run_configs, name).extend(getattr(self._context, name))
+        for callSite, stats in self._context.llmCallSiteStats.items():
+            siteStats = run_configs.llmCallSiteStats.setdefault(callSite, {"calls": 0, "responseTime": [], "tokens": []})
+            siteStats["calls"] += stats["calls"]
+            siteStats["responseTime"].extend(stats["responseTime"])
+            siteStats["tokens"].extend(stats["tokens"])
+
+    def commit(self, systemPrompt: str, userPrompt: str) -> Optional[str]:
+        """
+        Returns the speculative response when it was requested for exactly these prompts, waiting for it if it is
+        still in flight. Returns None, discarding the speculation, when the prompts differ or the request failed.
+        """
+        if (systemPrompt, userPrompt) != self.prompts:
+            self.discard("pending tasks or page changed since it was started")
+            return None
+        waitStart = time.time()
+        try:
+            response = self._future.result()
+        except Exception as e:
+            self.discard(f"speculative request failed: {e}")
+            return None
+        self._mergeStats()
+        overlap = min(self.endTime or waitStart, waitStart) - self.startTime
+        with self._lock:
+            SpeculativeOrchestration.committed += 1
+            SpeculativeOrchestration.overlapSeconds += overlap
+        print(f"🔮 Using speculative orchestrator response, {overlap:.2f}s of it overlapped the function executor")
+        return response
+
+    def discard(self, reason: str):
+        # The request cannot be cancelled once sent, its response is simply ignored
+        with self._lock:
+            SpeculativeOrchestration.discarded += 1
+        print("🗑️  Discarding speculative orchestrator response: " + reason)
+
+    @classmethod
+    def printStats(cls):
+        if cls.started:
+            print(f"Speculative orchestration: started={cls.started}, committed={cls.committed}, "
+                  f"discarded={cls.discarded}, LLM time overlapped with execution={cls.overlapSeconds:.2f}s")
@@ -0,0 +1,130 @@
+import queue
+import threading
+from typing import List
+
+import pytest
+
+from core_agentic import agentic_base
+from core_agentic import run_configs
+from core_agentic.plan_validator import PlanValidator
+from src.main.utilities.llm.incremental_json import IncrementalJsonArrayParser
+from src.main.utilities.llm.llm_response_models import FunctionPlan
+
+_END = object()
+
+
+class StreamingFunctionPlan:
+    """
+    Function plan of the planner that is consumed while the LLM response is still streaming.
+
+    The response is read on a background thread and every `/FunctionCalls/N` entry is handed to the executor as
+    soon as it is complete, so `FunctionCalls[0]` runs while the remaining calls, Reasoning and PendingTasks are
+    still being generated. Subtasks are appended to `run_configs.pendingTask` in the same order as the
+    non-streaming planner; PendingTasks is appended once the response is complete.
+
+    With plan validation every call is validated before it is handed to the executor. When `rejectInvalidCalls`
+    is set, the first call that cannot be repaired ends the iteration without being executed and its problems are
+    kept in `validationErrors`, so the planner can be asked for a corrected plan.
+    """
+
+    def __init__(self, systemPrompt: str, userPrompt: str, rejectInvalidCalls: bool = False):
+        self.functionList = []
+        self.response = ""
+        self.rejectInvalidCalls = rejectInvalidCalls
+        self.validationErrors: List[str] = []
+        self._queue = queue.Queue()
+        self._error = None
+        self._finished = False
+        self._draining = False
+        self._remaining = []
+        # Called once the response is complete and PendingTasks is recorded. It runs on the executor thread in
+        # __next__, between two function calls, so it sees completed and pending subtasks in a consistent state
+        self.onComplete = None
+        self._thread = threading.Thread(target=run_configs.in_current_session(self._consume),
+                                        args=(systemPrompt, userPrompt), daemon=True)
+        self._thread.start()
+
+    def _consume(self, systemPrompt: str, userPrompt: str):
+        parser = IncrementalJsonArrayParser("FunctionCalls")
+        chunks = []
+        try:
+            for chunk in agentic_base.helper.streamLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                                          callSite=run_configs.LLM_CallSite.FUNCTION_PLANNER):
+                chunks.append(chunk)
+                for functionCall in parser.feed(chunk):
+                    self._queue.put(functionCall)
+        except Exception as e:
+            self._error = e
+        self.response = agentic_base.helper.split_on_last("".join(chunks), "```json")[-1]
+        self._queue.put(_END)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        while not self._finished:
+            if self.validationErrors and not self._draining:
+                raise StopIteration
+            item = self._queue.get()
+            if item is _END:
+                self._finish()
+                continue
+            value = self._accept(item)
+            if value is not None:
+                return value
+        # Entries the incremental parser could not emit (e.g. malformed JSON tolerated by the path based parser)
+        while len(self.functionList) < len(self._remaining):
+            if self.validationErrors and not self._draining:
+                raise StopIteration
+            value = self._accept(self._remaining[len(self.functionList)])
+            if value is not None:
+                return value
+        raise StopIteration
+
+    def _accept(self, functionCall):
+        value = functionCall.get("functionCall") if isinstance(functionCall, dict) else None
+        if value is None:
+            return None
+        if not self.functionList and value == "TERMINATE":
+            pytest.fail("Agent could not find any suitable functions to execute")
+        rejected = False
+        if run_configs.plan_validation and not self.validationErrors and not self._draining:
+            repaired, errors = PlanValidator.repairCall(value)
+            if errors and self.rejectInvalidCalls:
+                # Not executed, its subtask stays pending for the corrected plan
+                self.validationErrors = [f"FunctionCalls[{len(self.functionList)}] {value}: {error}" for error in errors]
+                rejected = True
+            elif repaired != value:
+                PlanValidator.recordAvoidedRecovery()
+                value = repaired
+        self.functionList.append(value)
+        # Once the response is complete PendingTasks is the last entry and subtasks go before it
+        run_configs.pendingTask.insert(len(run_configs.pendingTask) - (1 if self._finished else 0),
+                                       functionCall.get("subTask"))
+        return None if rejected else value
+
+    def _finish(self):
+        self._finished = True
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        plan = FunctionPlan.fromJson(agentic_base.helper.extract_json_block(self.response))
+        self._remaining = [{"functionCall": call.functionCall, "subTask": call.subTask} for call in plan.functionCalls]
+        run_configs.pendingTask.append(plan.pendingTasks)
+        print("Function Plan by Agent: " + str(plan.functionList or self.functionList))
+        print("Reasoning by Agent: " + str(plan.reasoning))
+        if not self.functionList and not self._remaining:
+            pytest.fail("Agent could not find any suitable functions to execute")
+        if run_configs.plan_validation:
+            PlanValidator.recordPlan(rejected=bool(self.validationErrors))
+        if self.onComplete is not None:
+            self.onComplete()
+
+    def drain(self):
+        """
+        Waits for the rest of the response without executing further calls, so the remaining subtasks and
+        PendingTasks are recorded after the executor stopped early.
+        """
+        self._draining = True
+        for _ in self:
+            pass
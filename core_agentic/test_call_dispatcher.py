@@ -0,0 +1,77 @@
+import pytest
+
+from core_agentic.call_dispatcher import FunctionCallValidationError, compile_function_call, dispatch_function_call, \
+    qualified_function_call
+
+# Dispatches planned calls against stand-in helper and agent objects (see conftest), no browser or LLM involved
+pytestmark = pytest.mark.usefixtures("agent_session")
+
+
+class FakeHelper:
+    def __init__(self):
+        self.calls = []
+
+    def click(self, element):
+        self.calls.append(("click", element))
+
+    def type(self, element, text):
+        self.calls.append(("type", element, text))
+
+    def assertion(self, assertion):
+        self.calls.append(("assertion", assertion))
+
+
+@pytest.fixture
+def helper():
+    return FakeHelper()
+
+
+def test_fstring_expands_variables(helper, agent_session):
+    agent_session.variables["city"] = "Sihanoukville"
+    dispatch_function_call("""helper.type(locator.src(), f"Ferry to {variables['city']}")""")
+    assert helper.calls == [("type", "//*[@data-autoid='src']", "Ferry to Sihanoukville")]
+
+
+def test_agent_inside_string_literal_is_left_alone(helper):
+    functionCall = 'helper.assertion("agent.selectDate(7) shows locator.src()")'
+    assert not compile_function_call(functionCall).usesAgent
+    dispatch_function_call(functionCall)
+    assert helper.calls == [("assertion", "agent.selectDate(7) shows locator.src()")]
+    assert qualified_function_call(functionCall) == \
+           "agentic_base.helper.assertion('agent.selectDate(7) shows locator.src()')"
+
+
+def test_qualified_function_call_resolves_plan_objects():
+    assert qualified_function_call("helper.click(agent.selectDate(7))") == \
+           "agentic_base.helper.click(agentic_base.POR.home_page().search_widget().selectDate(7))"
+
+
+def test_wrong_arity_is_rejected_before_anything_runs(helper):
+    with pytest.raises(FunctionCallValidationError, match="cannot be called with 0 positional arguments"):
+        dispatch_function_call("helper.click(locator.src())\nhelper.click()")
+    assert helper.calls == []
+
+
+def test_unknown_function_is_rejected(helper):
+    with pytest.raises(FunctionCallValidationError, match="'locator.destination' is not an available function"):
+        dispatch_function_call("helper.click(locator.destination())")
+    assert helper.calls == []
+
+
+@pytest.mark.parametrize("functionCall", [
+    "helper.__class__",
+    "helper.click(variables.__class__.__bases__)",
+    "getConfig.__globals__['os']",
+])
+def test_dunder_access_is_blocked(functionCall):
+    with pytest.raises(FunctionCallValidationError, match="is not allowed"):
+        dispatch_function_call(functionCall)
+
+
+def test_invalid_python_is_rejected():
+    with pytest.raises(FunctionCallValidationError, match="not valid Python"):
+        compile_function_call("helper.click(")
+
+
+def test_compiled_calls_are_cached():
+    assert compile_function_call("helper.click(locator.src())") is compile_function_call("helper.click(locator.src())")
@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+
+from core_agentic import agentic_base
+from core_agentic import run_configs
+from core_agentic.agentic import orchestrator, beforeExecution, AgentStep
+from src.main.utilities.llm.vision_memo import VisionMemo
+
+# Benchmarks the two call orchestrator -> planner path against combined orchestration on the same tasks.
+# Runs against the configured provider; use LLM_Provider.LOCAL_FIXTURE to compare without network latency.
+# Opt-in as it runs live browser sessions: RUN_ORCHESTRATION_BENCHMARK=1 pytest core_agentic/test_orchestration_benchmark.py
+pytestmark = pytest.mark.skipif(os.environ.get("RUN_ORCHESTRATION_BENCHMARK") != "1",
+                                reason="set RUN_ORCHESTRATION_BENCHMARK=1 to run the orchestration benchmark")
+BENCHMARK_TASKS = [
+    """I want to reach <destination>. I am currently in <source>.
+        "I want to travel 10 days from today. Verify if there are any ferries available """,
+]
+BENCHMARK_RUNS = 3
+DECISION_STEPS = (AgentStep.ORCHESTRATE.value, AgentStep.PLAN.value, AgentStep.ORCHESTRATE_AND_PLAN.value)
+
+results = {}  # mode -> list of {"passed", "duration", "decisionTime", "decisions", "llmCalls"}
+
+@pytest.fixture(scope="module", autouse=True)
+def benchmark_report():
+    saved = (run_configs.combined_orchestration, run_configs.plan_store_replay,
+             run_configs.speculative_orchestration, run_configs.llm_cache_mode)
+    run_configs.plan_store_replay = False  # Stored plans would skip the LLM in both modes
+    run_configs.speculative_orchestration = False  # Only used by the two call mode, it would skew the comparison
+    run_configs.llm_cache_mode = run_configs.LLM_CacheMode.OFF  # Cached responses would answer the later runs
+    yield
+    (run_configs.combined_orchestration, run_configs.plan_store_replay,
+     run_configs.speculative_orchestration, run_configs.llm_cache_mode) = saved
+    print("-----------------ORCHESTRATION BENCHMARK-----------------")
+    for mode, runs in results.items():
+        decisions = sum(run["decisions"] for run in runs)
+        decisionTime = sum(run["decisionTime"] for run in runs)
+        print(f"[{mode}] runs={len(runs)}, "
+              f"success rate={sum(run['passed'] for run in runs) / len(runs) * 100:.2f}%, "
+              f"avg test time={sum(run['duration'] for run in runs) / len(runs):.2f}s, "
+              f"avg step latency (agent selection + planning)={decisionTime / decisions if decisions else 0:.2f}s, "
+              f"avg LLM calls={sum(run['llmCalls'] for run in runs) / len(runs):.1f}")
+
+@pytest.fixture(scope="function", autouse=True)
+def setup_and_teardown():
+    VisionMemo.clear()  # Vision answers of a previous run must not answer this one
+    beforeExecution()
+    print("Fresh browser started")
+    yield
+    agentic_base.afterExecutionCleanup()
+    print("Cleanup done, browser closed")
+
+@pytest.mark.parametrize("run", range(BENCHMARK_RUNS))
+@pytest.mark.parametrize("userTask", BENCHMARK_TASKS)
+@pytest.mark.parametrize("combined", [False, True], ids=["two_call", "combined"])
+def test_orchestration_benchmark(combined, userTask, run):
+    run_configs.combined_orchestration = combined
+    startTime = time.time()
+    passed = False
+    try:
+        orchestrator(userTask)
+        passed = True
+    finally:
+        stepTimes = run_configs.agentStepTimes
+        results.setdefault("combined" if combined else "two_call", []).append({
+            "passed": passed,
+            "duration": time.time() - startTime,
+            "decisionTime": sum(sum(stepTimes.get(step, [])) for step in DECISION_STEPS),
+            "decisions": len(stepTimes.get(AgentStep.ORCHESTRATE.value, [])) +
+                         len(stepTimes.get(AgentStep.ORCHESTRATE_AND_PLAN.value, [])),
+            "llmCalls": len(run_configs.llmResponseTime),
+        })
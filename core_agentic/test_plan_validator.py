@@ -0,0 +1,71 @@
+import pytest
+
+from core_agentic import agentic_base
+from core_agentic.plan_validator import PlanValidator
+
+# Repairs planned calls against stand-in helper and agent objects (see conftest), no browser or LLM involved
+
+TOOL_CATALOGS = {
+    "Helper": "- click(element)\n  Clicks the element\n\n- type(element, text)\n  Types text into the element\n",
+    "Locator": "- src()\n  Source city input\n",
+    "Function": "- selectDate(days)\n  Date days from today\n",
+}
+TEST_DATA = {"<source>": "Koh Touch Beach", "<destination>": "Sihanoukville"}
+
+
+class FakeHelper:
+    def click(self, element):
+        pass
+
+    def type(self, element, text):
+        pass
+
+    def setupLLM(self, systemPrompt, userPrompt):
+        pass
+
+
+@pytest.fixture
+def helper():
+    return FakeHelper()
+
+
+@pytest.fixture(autouse=True)
+def planner_tools(monkeypatch, agent_session):
+    monkeypatch.setattr(agentic_base, "getTools", lambda toolType, *args, **kwargs: TOOL_CATALOGS[toolType])
+    monkeypatch.setattr(agentic_base, "getConfig", lambda key: TEST_DATA.get(key))
+
+
+def test_placeholder_is_wrapped_in_getConfig():
+    repaired, errors = PlanValidator.repairCall('helper.type(locator.src(), "<source>")')
+    assert repaired == "helper.type(locator.src(), getConfig('<source>'))"
+    assert errors == []
+
+
+def test_unknown_placeholder_is_reported():
+    repaired, errors = PlanValidator.repairCall("helper.type(locator.src(), getConfig('<sourse>'))")
+    assert repaired == "helper.type(locator.src(), getConfig('<sourse>'))"
+    assert errors == ["getConfig('<sourse>') has no value in the test data configs"]
+
+
+def test_misspelled_function_is_repaired():
+    repaired, errors = PlanValidator.repairCall("helper.clik(agent.selectDate(7))")
+    assert repaired == "helper.click(agent.selectDate(7))"
+    assert errors == []
+
+
+def test_function_on_wrong_object_is_repaired():
+    repaired, errors = PlanValidator.repairCall("locator.click(locator.src())")
+    assert repaired == "helper.click(locator.src())"
+    assert errors == []
+
+
+def test_typo_is_never_repaired_to_a_function_outside_the_catalog():
+    repaired, errors = PlanValidator.repairCall("helper.setupLL('system', 'user')")
+    assert repaired == "helper.setupLL('system', 'user')"
+    assert len(errors) == 1 and "'helper.setupLL' is not an available function" in errors[0]
+
+
+def test_plan_errors_name_the_invalid_call():
+    plan, errors = PlanValidator.validatePlan(["helper.clik(locator.src())", "helper.click()"])
+    assert plan == ["helper.click(locator.src())", "helper.click()"]
+    assert len(errors) == 1 and errors[0].startswith("FunctionCalls[1] helper.click():")
@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core_agentic import run_configs
+
+
+class ToolRegistry:
+    """
+    Cache of the agent catalog and the helper/locator/function tool descriptions put into LLM prompts.
+
+    Building them imports the tool definition modules and walks `agent_groups/<ref>/agents`, so each entry is
+    built once per key (e.g. ref, agent and channel) and reused until the modification time of one of its source
+    files changes. With `run_configs.tool_registry_manifest` set, entries are also saved to a JSON manifest so a
+    fresh process starts warm.
+    """
+
+    _lock = threading.RLock()
+    _entries: Dict[str, Dict[str, Any]] = {}  # key -> {"fingerprint": [[path, mtime_ns], ...], "value": ...}
+    _manifestLoaded = False
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def manifestPath(cls) -> Optional[str]:
+        if not run_configs.tool_registry_manifest:
+            return None
+        return os.path.join(run_configs.get_project_root(), run_configs.tool_registry_manifest)
+
+    @classmethod
+    def fingerprint(cls, paths: List[str]) -> List[List[Any]]:
+        """
+        Modification times of the source files (relative to the project root) an entry was built from.
+        """
+        root = run_configs.get_project_root()
+        fingerprint = []
+        for path in paths:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime = None
+            fingerprint.append([os.path.relpath(path, root), mtime])
+        return fingerprint
+
+    @classmethod
+    def cached(cls, key: str, paths: List[str], build: Callable[[], Any]) -> Any:
+        """
+        Returns the entry for `key`, calling `build` when it is missing or one of `paths` changed since.
+        """
+        fingerprint = cls.fingerprint(paths)
+        with cls._lock:
+            cls._loadManifest()
+            entry = cls._entries.get(key)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                cls.hits += 1
+                return entry["value"]
+            cls.misses += 1
+            value = build()
+            cls._entries[key] = {"fingerprint": fingerprint, "value": value}
+            cls._saveManifest()
+            return value
+
+    @classmethod
+    def _loadManifest(cls):
+        if cls._manifestLoaded:
+            return
+        cls._manifestLoaded = True
+        path = cls.manifestPath()
+        if path is None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cls._entries.update(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            pass
+
+    @classmethod
+    def _saveManifest(cls):
+        path = cls.manifestPath()
+        if path is None:
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cls._entries, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not save the tool registry manifest: {e}")
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def printStats(cls):
+        if cls.hits or cls.misses:
+            print(f"Tool registry: hits={cls.hits}, misses={cls.misses}, entries={len(cls._entries)}")
@@ -0,0 +1,18 @@
+class common:
+    page_name = "home_page"
+    page_description = "Home Page of Ferry booking application. If you find a search widget with Source, Destination, Departure date and Return date fields, you are on the correct page. Important: If the page has a modify search option, on top of search result page, it should still be considered as home page"
+    url_patterns = []
+    title_patterns = []
+    landmarks = ["//*[@data-autoid='searchWidget']"]
+
+class mweb(common):
+    pass
+
+class dweb(common):
+    pass
+
+class android(common):
+    pass
+
+class ios(common):
+    pass
@@ -0,0 +1,18 @@
+class common:
+    page_name = "search_result_page"
+    page_description = "Displaying ferries available based on search criteria (No ferries available message may be displayed if no ferries are available)"
+    url_patterns = []
+    title_patterns = []
+    landmarks = ["//*[@data-autoid='inventoryList']", "//*[@data-autoid='topNavContainer']"]
+
+class mweb(common):
+    pass
+
+class dweb(common):
+    pass
+
+class android(common):
+    pass
+
+class ios(common):
+    pass
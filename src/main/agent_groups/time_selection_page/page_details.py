@@ -0,0 +1,18 @@
+class common:
+    page_name = "time_selection_page"
+    page_description = "Displaying list of time slots available for the selected ferry"
+    url_patterns = []
+    title_patterns = []
+    landmarks = []
+
+class mweb(common):
+    pass
+
+class dweb(common):
+    pass
+
+class android(common):
+    pass
+
+class ios(common):
+    pass
@@ -7,11 +7,11 @@ class Agents_POR():
     obj_search_result_page: SearchResultPage_POR = None
 
     def home_page(self):
-        if Agents_POR.obj_home_page is None:
-            Agents_POR.obj_home_page = HomePage_POR()
-        return Agents_POR.obj_home_page
+        if self.obj_home_page is None:
+            self.obj_home_page = HomePage_POR()
+        return self.obj_home_page
 
     def search_result_page(self):
-         if Agents_POR.obj_search_result_page is None:
-             Agents_POR.obj_search_result_page = SearchResultPage_POR()
-         return Agents_POR.obj_search_result_page
+         if self.obj_search_result_page is None:
+             self.obj_search_result_page = SearchResultPage_POR()
+         return self.obj_search_result_page
@@ -6,25 +6,25 @@ class HomePage_POR():
     obj_offers = None
 
     def lob(self):
-        if HomePage_POR.obj_lob is None:
+        if self.obj_lob is None:
             if run_configs.channel == "dweb" or run_configs.channel == "mweb":
                 from src.main.agent_groups.home_page.agents.lob.tools.implementation.web import lob
-                HomePage_POR.obj_lob = lob()
-        return HomePage_POR.obj_lob
+                self.obj_lob = lob()
+        return self.obj_lob
 
     def search_widget(self):
-        if HomePage_POR.obj_search_widget is None:
+        if self.obj_search_widget is None:
             if run_configs.channel == "dweb" or run_configs.channel == "mweb":
                 from src.main.agent_groups.home_page.agents.search_widget.tools.implementation.web import search_widget
-                HomePage_POR.obj_search_widget = search_widget()
+                self.obj_search_widget = search_widget()
             elif run_configs.channel.lower().strip() == "android":
                 from src.main.agent_groups.home_page.agents.search_widget.tools.implementation.android import search_widget
-                HomePage_POR.obj_search_widget = search_widget()
-        return HomePage_POR.obj_search_widget
+                self.obj_search_widget = search_widget()
+        return self.obj_search_widget
 
     def offers(self):
-        if HomePage_POR.obj_offers is None:
+        if self.obj_offers is None:
             if run_configs.channel == "dweb" or run_configs.channel == "mweb":
                 from src.main.agent_groups.home_page.agents.offers.tools.implementation.web import offers
-                HomePage_POR.obj_offers = offers()
-        return HomePage_POR.obj_offers
+                self.obj_offers = offers()
+        return self.obj_offers
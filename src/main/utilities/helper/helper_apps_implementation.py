@@ -7,26 +7,25 @@ from selenium.webdriver import ActionChains
 
 from core_agentic import run_configs
 from src.main.utilities.helper.helper_common import HelperInterface
-
-mobile_driver: WebDriver = None
+from src.main.utilities.llm.screenshot_preprocessor import preprocess_screenshot
 
 class HelperApps(HelperInterface):
     def __init__(self, mobile_driver_obj: WebDriver):
-        global mobile_driver
-        mobile_driver = mobile_driver_obj
+        super().__init__()
+        self.mobile_driver = mobile_driver_obj
 
     def find_element(self, element):
         return self.scrollToElement(element)
 
     def swipe_up(self):
         """Perform a universal W3C swipe (works for iOS + Android)."""
-        size = mobile_driver.get_window_size()
+        size = self.mobile_driver.get_window_size()
         start_x = size["width"] / 2
         start_y = size["height"] * run_configs.swipe_start_vertical
         end_x = size["width"] / 2
         end_y = size["height"] * run_configs.swipe_end_vertical
 
-        actions = ActionChains(mobile_driver)
+        actions = ActionChains(self.mobile_driver)
         actions.w3c_actions.pointer_action.move_to_location(start_x, start_y)
         actions.w3c_actions.pointer_action.pointer_down()
         actions.w3c_actions.pointer_action.move_to_location(end_x, end_y)
@@ -38,7 +37,7 @@ class HelperApps(HelperInterface):
             max_swipes = 10
             for _ in range(max_swipes):
                 try:
-                    return mobile_driver.find_element(AppiumBy.XPATH, element)
+                    return self.mobile_driver.find_element(AppiumBy.XPATH, element)
                 except Exception:
                     self.swipe_up()
             raise Exception(f"Element not found after {max_swipes} swipes: {element}")
@@ -65,10 +64,10 @@ class HelperApps(HelperInterface):
     def navigateBack(self):
         if run_configs.dryRun == False:
             if run_configs.channel.lower().strip() == "android":
-                mobile_driver.back()
+                self.mobile_driver.back()
             else:
                 # iOS
-                mobile_driver.find_element(AppiumBy.ACCESSIBILITY_ID, "Back").click()
+                self.mobile_driver.find_element(AppiumBy.ACCESSIBILITY_ID, "Back").click()
 
     def getTextPure(self, locator):
         if run_configs.dryRun == False:
@@ -79,13 +78,13 @@ class HelperApps(HelperInterface):
 
     def getAllTexts(self, locator) -> list[str]:
         if run_configs.dryRun == False:
-            elements = mobile_driver.find_elements(AppiumBy.XPATH, locator)
+            elements = self.mobile_driver.find_elements(AppiumBy.XPATH, locator)
             texts = [el.text for el in elements]
             return texts
 
     def locatorCount(self, locator) -> int:
         if run_configs.dryRun == False:
-            return len(mobile_driver.find_elements(AppiumBy.XPATH, locator))
+            return len(self.mobile_driver.find_elements(AppiumBy.XPATH, locator))
 
     def scroll_the_element_to_top(self, element):
         pass
@@ -95,9 +94,30 @@ class HelperApps(HelperInterface):
 
     def is_locator_present(self, element):
         if run_configs.dryRun == False:
-            count = len(mobile_driver.find_elements(AppiumBy.XPATH, element))
+            count = len(self.mobile_driver.find_elements(AppiumBy.XPATH, element))
             return count > 0
 
-    def take_screenshot_as_base64(self) -> str:
+    def isElementInViewport(self, element) -> bool:
+        if run_configs.dryRun:
+            return False
+        elements = self.mobile_driver.find_elements(AppiumBy.XPATH, element)
+        if not elements or not elements[0].is_displayed():
+            return False
+        rect = elements[0].rect
+        window = self.mobile_driver.get_window_size()
+        return (rect["x"] >= 0 and rect["y"] >= 0 and rect["x"] + rect["width"] <= window["width"]
+                and rect["y"] + rect["height"] <= window["height"])
+
+    def elementBox(self, element):
+        elements = self.mobile_driver.find_elements(AppiumBy.XPATH, element)
+        if not elements:
+            return None
+        rect = elements[0].rect
+        return rect["x"], rect["y"], rect["x"] + rect["width"], rect["y"] + rect["height"]
+
+    def take_screenshot_as_base64(self, scopeElements=None) -> str:
         if run_configs.dryRun == False:
-            return mobile_driver.get_screenshot_as_base64()
\ No newline at end of file
+            val = self.mobile_driver.get_screenshot_as_base64()
+            cropBoxes = self.sectionCropBoxes(scopeElements)
+            viewportWidth = self.mobile_driver.get_window_size()["width"] if cropBoxes else None
+            return preprocess_screenshot(val, cropBoxes, viewportWidth)
\ No newline at end of file
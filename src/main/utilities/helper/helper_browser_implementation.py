@@ -21,12 +21,11 @@ from bs4 import BeautifulSoup
 from bs4.element import Comment
 
 from src.main.utilities.helper.helper_common import HelperInterface
+from src.main.utilities.llm.screenshot_preprocessor import preprocess_screenshot
 
 from playwright.sync_api import sync_playwright, Page
 from core_agentic import run_configs
 
-page:Page = None
-
 class BrowserAction(Enum):
     CLICK = "CLICK"
     SCROLL = "SCROLL"
@@ -35,12 +34,10 @@ class BrowserAction(Enum):
 
 class HelperBrowser(HelperInterface):
     def __init__(self, pageObj:Page):
-        global page
-        page = pageObj
+        super().__init__()
+        self.page = pageObj
     ############# Browser specific implementations of helper functions #############
 
-    _ga_events : List[Dict] = []  # shared across all instances
-
     def mock_api(self, api_key: str, mock_file: str):
         if run_configs.dryRun:
             return
@@ -90,7 +87,7 @@ class HelperBrowser(HelperInterface):
         # ✅ INDUSTRY STANDARD: Only intercept the specific API pattern
         # This allows other APIs (autocomplete, analytics, etc.) to work normally
         specific_pattern = f"**/*{url_pattern}*"
-        run_configs.page.route(specific_pattern, route_handler)
+        self.page.route(specific_pattern, route_handler)
         print(f"✅ Mock installed: {api_key} API → {mock_file}")
         print(f"   Pattern: {specific_pattern}\n")
 
@@ -98,10 +95,10 @@ class HelperBrowser(HelperInterface):
         for _ in range(30):
             time.sleep(1)
             try:
-                ready_state = page.evaluate("() => document.readyState")
+                ready_state = self.page.evaluate("() => document.readyState")
                 if ready_state and ready_state.lower() == "complete":
                     try:
-                        count = page.locator("//*[contains(@class,'indeterminate_spinner_')]").count()
+                        count = self.page.locator("//*[contains(@class,'indeterminate_spinner_')]").count()
                         if count == 0:
                             return True
                     except Exception as e:
@@ -113,7 +110,7 @@ class HelperBrowser(HelperInterface):
 
     def navigateBack(self):
         if run_configs.dryRun == False:
-            page.go_back()
+            self.page.go_back()
             time.sleep(2)
 
     def fetch_response(self, api_name: str, locator: Optional[str], action: BrowserAction) -> Optional[str]:
@@ -142,7 +139,7 @@ class HelperBrowser(HelperInterface):
                 response_data[0] = "NO BODY"
         
         # Set up response listener
-        page.on("response", handle_response)
+        self.page.on("response", handle_response)
         
         try:
             # Perform the action based on the enum
@@ -178,24 +175,24 @@ class HelperBrowser(HelperInterface):
         finally:
             # Remove the response listener
             try:
-                page.remove_listener("response", handle_response)
+                self.page.remove_listener("response", handle_response)
             except Exception:
                 pass  # Ignore errors when removing listener
 
     def getTextPure(self, locator):
-        return page.locator(locator).inner_text()
+        return self.page.locator(locator).inner_text()
 
     def scrollToElement(self, element):
         if run_configs.dryRun == False:
-            page.set_default_timeout(1000)
+            self.page.set_default_timeout(1000)
             try:
                 self.scrollUsingJS(element)
-                # page.locator(element).scroll_into_view_if_needed()
+                # self.page.locator(element).scroll_into_view_if_needed()
             finally:
-                page.set_default_timeout(15000)
+                self.page.set_default_timeout(15000)
 
     def scrollUsingJS(self, xpath: str):
-        page.evaluate(
+        self.page.evaluate(
             """(xpath) => {
                 const el = document.evaluate(
                     xpath,
@@ -211,20 +208,42 @@ class HelperBrowser(HelperInterface):
             xpath
         )
 
+    def isElementInViewport(self, element) -> bool:
+        if run_configs.dryRun:
+            return False
+        return self.page.evaluate(
+            """(xpath) => {
+                const el = document.evaluate(
+                    xpath,
+                    document,
+                    null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE,
+                    null
+                ).singleNodeValue;
+                if (!el) {
+                    return false;
+                }
+                const rect = el.getBoundingClientRect();
+                return rect.width > 0 && rect.height > 0 && rect.top >= 0 && rect.left >= 0
+                    && rect.bottom <= window.innerHeight && rect.right <= window.innerWidth;
+            }""",
+            element
+        )
+
     def click(self, element: Annotated[str, "WebElement"]):
         # print(f"Element passed to click(): {element!r}")
         if run_configs.dryRun == False:
             try:
                 if run_configs.channel == "mweb":
-                    page.tap(element)
+                    self.page.tap(element)
                 else:
-                    page.click(element)
+                    self.page.click(element)
             except Exception as e:
-                page.eval_on_selector(element, "el => el.click()")
-                # page.click(element, force=True)
+                self.page.eval_on_selector(element, "el => el.click()")
+                # self.page.click(element, force=True)
                 print(f"Element {str(element)} is Unstable, js click performed")
                 # if "intercepts pointer events" in str(e) or "element is not stable" in str(e):
-                #     page.click(element, force=True)
+                #     self.page.click(element, force=True)
                 #     print(f"Element {str(element)} is Unstable, forced click performed")
                 # else:
                 #     raise
@@ -233,19 +252,19 @@ class HelperBrowser(HelperInterface):
     def type(self, element, text):
         # print(f"Element passed to type(): {element!r}")
         if run_configs.dryRun == False:
-            if page.locator(element).is_disabled() == True:
+            if self.page.locator(element).is_disabled() == True:
                 print(f"Element {element} is disabled, skipping type")
             else:
                 time.sleep(1)
                 if text is None:
                     print("No text provided to type in element: " + element + ", skipping type")
                 else:
-                    page.type(element, text)
+                    self.page.type(element, text)
                 time.sleep(3)
 
     def set_cookie(self, name: str, value: str, domain: str):
         if run_configs.dryRun == False:
-            page.context.add_cookies([{
+            self.page.context.add_cookies([{
                 "name": name,
                 "value": value,
                 "domain": domain,
@@ -257,18 +276,18 @@ class HelperBrowser(HelperInterface):
 
     def refreshPage(self):
         if run_configs.dryRun == False:
-            page.reload()
+            self.page.reload()
 
     def scroll_page_height(self):
         """Scroll to the full height of the page."""
         if run_configs.dryRun == False:
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+            self.page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
             print("Scrolled to page height")
 
     def open_url(self, url: str):
         """Navigate to a specific URL."""
         if run_configs.dryRun == False:
-            page.goto(url)
+            self.page.goto(url)
             self.wait_until_page_load_complete()
             print(f"Navigated to URL: {url}")
 
@@ -287,7 +306,7 @@ class HelperBrowser(HelperInterface):
 
     def verifyBrokenLink(self, locator):
         if run_configs.dryRun == False:
-            elements = page.locator(locator)
+            elements = self.page.locator(locator)
             count = elements.count()
             print(f"Found {count} links")
             brokenCheck = False
@@ -317,17 +336,17 @@ class HelperBrowser(HelperInterface):
 
     def getAllTexts(self, locator) -> list[str]:
         if run_configs.dryRun == False:
-            return page.locator(locator).all_inner_texts()
+            return self.page.locator(locator).all_inner_texts()
 
 
     def getCount(self, locator) -> int:
         if run_configs.dryRun == False:
-            return page.locator(locator).count()
+            return self.page.locator(locator).count()
 
 
     def scroll_the_element_to_top(self, element):
-        page.locator(element).scroll_into_view_if_needed()
-        page.evaluate(f"""
+        self.page.locator(element).scroll_into_view_if_needed()
+        self.page.evaluate(f"""
                    const el = document.evaluate("{element}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
                    if (el) {{
                        el.scrollIntoView({{ block: 'start', behavior: 'smooth' }});
@@ -337,7 +356,7 @@ class HelperBrowser(HelperInterface):
 
 
     def scroll_to_bottom_of_page(self):
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
+        self.page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
         print("Scrolled to bottom of the page")
 
 
@@ -345,8 +364,8 @@ class HelperBrowser(HelperInterface):
         # Inject axe-core
         axe_source_url = "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.9.1/axe.min.js"
         try:
-            page.add_script_tag(url=axe_source_url)
-            page.wait_for_timeout(1000)  # Ensure axe-core is loaded
+            self.page.add_script_tag(url=axe_source_url)
+            self.page.wait_for_timeout(1000)  # Ensure axe-core is loaded
         except Exception as e:
             print(f"Error injecting axe-core: {e}")
             return
@@ -397,7 +416,7 @@ class HelperBrowser(HelperInterface):
 
         # Run axe-core with additional configs similar to Lighthouse
         try:
-            results = page.evaluate(f"""
+            results = self.page.evaluate(f"""
                    async () => {{
                        if (typeof axe === 'undefined') {{
                            throw new Error('axe-core not loaded');
@@ -433,7 +452,7 @@ class HelperBrowser(HelperInterface):
         timestamp_display = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # --- Auto-generate filenames based on page title if not provided ---
-        page_title = page.title() or "page"
+        page_title = self.page.title() or "page"
         safe_title = re.sub(r"[^A-Za-z0-9_-]+", "_", page_title)
 
         if not html_report:
@@ -463,7 +482,7 @@ class HelperBrowser(HelperInterface):
                 screenshot_html = ""
                 if with_screenshots and targets:
                     try:
-                        element_handle = page.query_selector(targets)
+                        element_handle = self.page.query_selector(targets)
                         if element_handle:
                             screenshot_bytes = element_handle.screenshot()
                             b64_img = base64.b64encode(screenshot_bytes).decode("utf-8")
@@ -525,20 +544,20 @@ class HelperBrowser(HelperInterface):
         metrics = {}
 
         # First Contentful Paint (FCP)
-        metrics['FCP'] = page.evaluate('''() => {
+        metrics['FCP'] = self.page.evaluate('''() => {
                        const paintEntries = performance.getEntriesByType('paint');
                        const fcpEntry = paintEntries.find(e => e.name === 'first-contentful-paint');
                        return fcpEntry ? fcpEntry.startTime : null;
                    }''')
 
         # Largest Contentful Paint (LCP)
-        metrics['LCP'] = page.evaluate('''() => {
+        metrics['LCP'] = self.page.evaluate('''() => {
                        const lcpEntries = performance.getEntriesByType('largest-contentful-paint');
                        return lcpEntries.length > 0 ? lcpEntries[lcpEntries.length - 1].startTime : null;
                    }''')
 
         # Cumulative Layout Shift (CLS)
-        metrics['CLS'] = page.evaluate('''() => {
+        metrics['CLS'] = self.page.evaluate('''() => {
                        const shiftEntries = performance.getEntriesByType('layout-shift');
                        return shiftEntries.reduce((acc, entry) => {
                            if (!entry.hadRecentInput) {
@@ -571,7 +590,7 @@ class HelperBrowser(HelperInterface):
 
 
     def is_locator_present(self, element):
-        count = page.locator(element).count()
+        count = self.page.locator(element).count()
         return count > 0
 
 
@@ -634,7 +653,7 @@ class HelperBrowser(HelperInterface):
                 self.click(locators)
                 time.sleep(2)
             else:
-                capturedGAEventsAfterClick = self.fetch_ga_events_console_data_layer(page)
+                capturedGAEventsAfterClick = self.fetch_ga_events_console_data_layer()
                 self.click(locators)
                 time.sleep(2)
                 print(f"Total GA events captured after click: {len(capturedGAEventsAfterClick)}")
@@ -663,8 +682,8 @@ class HelperBrowser(HelperInterface):
                             capturedGAEvents.append(ga_event_json)
                             run_configs.sampleList.append(ga_event_json)
 
-            page.on("console", handle_console_msg)
-            page.evaluate("""() => {
+            self.page.on("console", handle_console_msg)
+            self.page.evaluate("""() => {
                // For standard Google Analytics (ga.js)
                window.dataLayer = window.dataLayer || [];
                const originalPush = window.dataLayer.push;
@@ -693,7 +712,7 @@ class HelperBrowser(HelperInterface):
         if run_configs.dryRun == False:
             try:
                 self.scrollToElement(element)
-                page.locator(element).fill("")
+                self.page.locator(element).fill("")
                 print(f"Cleared text in element: {element}")
             except Exception as e:
                 print(f"Error clearing text in element {element}: {e}")
@@ -703,7 +722,7 @@ class HelperBrowser(HelperInterface):
         """
         Inject JavaScript before any page loads to capture GA events.
         """
-        page.context.add_init_script("""
+        self.page.context.add_init_script("""
             window.dataLayer = window.dataLayer || [];
             const originalPush = window.dataLayer.push;
             window.dataLayer.push = function() {
@@ -738,31 +757,28 @@ class HelperBrowser(HelperInterface):
                 # print("Meaningful GA Event captured:", event)
                 self._ga_events.append(event)
 
-        page.context.expose_function("sendGaEventToPython", handle_ga_event)
+        self.page.context.expose_function("sendGaEventToPython", handle_ga_event)
 
 
-    @classmethod
-    def _add_event(cls, event: Dict):
+    def _add_event(self, event: Dict):
         """
-        Internal helper to safely append events to the shared event store.
+        Internal helper to safely append events to the event store of this session.
         """
-        cls._ga_events.append(event)
+        self._ga_events.append(event)
 
 
-    @classmethod
-    def get_all_events(cls) -> List[Dict]:
+    def get_all_events(self) -> List[Dict]:
         """
         Retrieve all captured GA events.
         """
-        return cls._ga_events.copy()
+        return self._ga_events.copy()
 
 
-    @classmethod
-    def clear_events(cls):
+    def clear_events(self):
         """
         Clear all stored GA events.
         """
-        cls._ga_events.clear()
+        self._ga_events.clear()
 
 
     def _setup_listener(self):
@@ -849,8 +865,6 @@ class HelperBrowser(HelperInterface):
             """
         return prompt
 
-    _request_payloads: List[str] = []
-
     def fetch_request_payloads(self, api_name: str, locator: str = None, action: str = None, wait_timeout: int = 5000) -> list:
         """
         Fetch all request payloads for requests whose URL contains `api_name`.
@@ -879,26 +893,26 @@ class HelperBrowser(HelperInterface):
                 self._request_payloads.append(payload)
                 print(f"Captured request to {request.url} with payload: {payload}")
 
-        page.on("request", on_request)
+        self.page.on("request", on_request)
 
         # Perform the browser action
         if action == BrowserAction.CLICK and locator:
-            page.locator(locator).click()
+            self.page.locator(locator).click()
         elif action == BrowserAction.SCROLL and locator:
-            page.locator(locator).scroll_into_view_if_needed()
+            self.page.locator(locator).scroll_into_view_if_needed()
         elif action == BrowserAction.REFRESH:
-            page.reload()
+            self.page.reload()
 
         # Wait for the page to load completely
         try:
-            page.wait_for_load_state("load", timeout=wait_timeout)
-            page.wait_for_load_state("networkidle", timeout=wait_timeout)
+            self.page.wait_for_load_state("load", timeout=wait_timeout)
+            self.page.wait_for_load_state("networkidle", timeout=wait_timeout)
         except TimeoutError:
             # Even if page/network does not idle, continue
             print("Timeout waiting for page/network to load completely.")
 
         # Extra buffer to ensure late network requests are captured
-        page.wait_for_timeout(1500)
+        self.page.wait_for_timeout(1500)
 
         return self._request_payloads
 
@@ -955,11 +969,22 @@ class HelperBrowser(HelperInterface):
 
         return mock_response_to_send
 
-    def take_screenshot_as_base64(self) -> str:
+    def elementBox(self, element):
+        try:
+            box = self.page.locator(element).first.bounding_box(timeout=1000)
+        except Exception:
+            box = None
+        if box is None:
+            return None
+        return box["x"], box["y"], box["x"] + box["width"], box["y"] + box["height"]
+
+    def take_screenshot_as_base64(self, scopeElements=None) -> str:
         time.sleep(2)
-        screenshot_bytes = page.screenshot(full_page=False)
+        screenshot_bytes = self.page.screenshot(full_page=False)
         val = base64.b64encode(screenshot_bytes).decode('utf-8')
-        return val
+        cropBoxes = self.sectionCropBoxes(scopeElements)
+        viewportWidth = self.page.evaluate("window.innerWidth") if cropBoxes else None
+        return preprocess_screenshot(val, cropBoxes, viewportWidth)
 
     def get_relative_xpath(self, locator_description: str, sanitized_html: str) -> str:
         system_prompt = """
@@ -1128,7 +1153,8 @@ class HelperBrowser(HelperInterface):
         user_prompt = f"\nLocator Description: {locator_description}\nHTML Content: {sanitized_html}"
         # print("System prompt: " + system_prompt)
         print("User prompt: " + user_prompt)
-        locator_from_ai = self.setupLLM(systemPrompt=system_prompt, userPrompt=user_prompt)
+        locator_from_ai = self.setupLLM(systemPrompt=system_prompt, userPrompt=user_prompt,
+                                        callSite=run_configs.LLM_CallSite.LOCATOR_HEALING)
         print("Raw locator from AI: " + locator_from_ai)
         locator_from_ai = locator_from_ai.strip()
         locator_from_ai = locator_from_ai.replace("/[", "/*[")  # Fix any potential syntax issues
@@ -1141,14 +1167,13 @@ class HelperBrowser(HelperInterface):
         return locator_from_ai
 
     def get_section_outer_html(self, xpath_list: list) -> str:
-        global page
         result = ""
         for xpath in xpath_list:
-            elements = page.query_selector_all(xpath)
+            elements = self.page.query_selector_all(xpath)
             for element in elements:
                 outer_html = element.evaluate("el => el.outerHTML")
                 result += outer_html + "\n"
         return result.strip()
 
     def locatorCount(self, element:str):
-        return page.locator(element).count()
+        return self.page.locator(element).count()
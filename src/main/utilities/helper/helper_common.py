@@ -1,11 +1,14 @@
+import asyncio
 import os
 from abc import abstractmethod
+from contextlib import contextmanager
 
 import time
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Annotated, Any
+from typing import List, Dict, Annotated, Any, Iterator, Optional
 
 import pandas as pd
 import pytest
@@ -14,7 +17,6 @@ from bs4 import BeautifulSoup, Comment
 
 from core_agentic import run_configs
 
-from botocore.config import Config
 from jsonpath_ng import parse
 
 import requests
@@ -24,11 +26,51 @@ import re
 
 from core_agentic.run_configs import LLM_MODEL
 from src.main.utilities.helper.helper_description import HelperAgent
+from src.main.utilities.llm.llm_client_registry import LLMClientRegistry
+from src.main.utilities.llm.llm_response_cache import LLMResponseCache
+from src.main.utilities.llm.llm_prompt_cache import GeminiContextCache, bedrock_cacheable_system
+from src.main.utilities.llm.llm_async import llm_concurrency_limit
+from src.main.utilities.llm.llm_router import LLMRouter, backoff_delay
+from src.main.utilities.llm.llm_fixture_provider import LLMFixtureTranscript
+from src.main.utilities.llm.screenshot_preprocessor import BoundingBox, box_contains, detect_image_mime
+from src.main.utilities.llm.vision_memo import VisionMemo
+from src.main.utilities.llm.llm_response_models import load_json_block
 
 import inspect
 
-llmResponseTime = []
-llmTokens = []
+
+@lru_cache(maxsize=256)
+def compiled_json_path(json_path: str):
+    """
+    Compiled jsonpath expression, cached as the same few paths are looked up on every LLM response.
+    """
+    return parse(json_path)
+
+
+VISUAL_VALIDATION_RULES = """
+        CRITICAL DATE VALIDATION RULE (Applicable only for date related validations):
+            VALIDATE ONLY: Date number + Month (any format) IGNORE: Year, date format, time (unless user explicitly requests)
+            - POSITIVE ASSERTION (True) IF:
+                - Correct date number visible
+                - Correct month visible (abbreviated/full/numeric - any format OK)
+            - NEGATIVE ASSERTION (False) ONLY IF:
+                - Wrong date number OR wrong month OR missing date/month
+            FORBIDDEN: Failing assertions due to year differences or format variations
+            Example:
+                Expected "7 August 2025" → Display "07 Aug" = ✅ POSITIVE,
+                Expected "07 Sept 2025" → Display "7 September" = ✅ POSITIVE
+
+        Rules for Position-Based Validation:
+        * Direct Relationship Required
+            - When validating relative position (e.g., verify if X is below Y), the result is True only if X is directly below Y.
+            - If X is below some other element (e.g., Z) that happens to be in the same section as Y, the result is False.
+            - Always validate strictly against the specified reference element.
+        * Above/Below Validity
+            - When the user has explicitly specified an above or below validation, the condition is valid as long as the element is vertically above or vertically below the reference element.
+            - In this case, horizontal alignment (left, center, right) is irrelevant and should be ignored.        
+
+"""
+
 
 class BrowserAction(Enum):
     CLICK = "CLICK"
@@ -38,9 +80,13 @@ class BrowserAction(Enum):
 
 
 class HelperInterface(HelperAgent):
-    ############# Browser specific implementations of helper functions #############
+    def __init__(self):
+        super().__init__()
+        # Per instance, so concurrent sessions do not share captured GA events and request payloads
+        self._ga_events: List[Dict] = []
+        self._request_payloads: List[str] = []
 
-    _ga_events: List[Dict] = []  # shared across all instances
+    ############# Browser specific implementations of helper functions #############
 
     @abstractmethod
     def mock_api(self, api_key: str, mock_file: str):
@@ -65,23 +111,31 @@ class HelperInterface(HelperAgent):
         else:
             return custom_path
 
-    def extractJsonValueBasedOnPath(self, json_data: str, json_path: str) -> str:
-        json_path = self.convert_intellij_json_path_to_right_format(json_path)
-        jsonpath_expr = parse(json_path)
-        response_json = None
-        try:
-            response_json = json.loads(json_data)
-        except Exception as e:
-            print(f"Error parsing JSON data: {e}")
-            print("JSON Data: \n", json_data)
+    def extractJsonValueBasedOnPath(self, json_data, json_path: str) -> str:
+        """
+        Returns the first value at the given path. `json_data` is either a JSON string or an already parsed
+        object, the latter lets callers reading several paths parse the response only once.
+        """
+        jsonpath_expr = compiled_json_path(self.convert_intellij_json_path_to_right_format(json_path))
+        response_json = json_data
+        if isinstance(json_data, (str, bytes)):
+            response_json = None
+            try:
+                response_json = json.loads(json_data)
+            except Exception as e:
+                print(f"Error parsing JSON data: {e}")
+                print("JSON Data: \n", json_data)
         matches = [match.value for match in jsonpath_expr.find(response_json)]
-        # setupLLM(model="openai", )
         return matches[0] if matches else None
 
     def calculate_total_token_count(self, val, tokenPathList):
         total = 0
+        try:
+            response_json = json.loads(val)
+        except Exception:
+            response_json = val  # Reported by extractJsonValueBasedOnPath
         for totalTokenPath in tokenPathList:
-            token_str = self.extractJsonValueBasedOnPath(val, self.convert_intellij_json_path_to_right_format(totalTokenPath))
+            token_str = self.extractJsonValueBasedOnPath(response_json, totalTokenPath)
             if token_str is not None:
                 try:
                     total += int(token_str)
@@ -94,157 +148,313 @@ class HelperInterface(HelperAgent):
             return [s]  # if separator not found, return the string as is
         return s.rsplit(sep, 1)
 
-    def visualValidation(self, base64Image: str, userPrompt: str="") -> str:
+    def visualValidation(self, base64Image: str, userPrompt: str="",
+                         callSite: run_configs.LLM_CallSite = run_configs.LLM_CallSite.VISUAL_ASSERTION) -> str:
         systemPrompt = """
         You are a helpful assistant. Respond with true/false. Then use a `|` symbol and provide detailed reasoning why you said true/false. You should exactly follow this format and do not output anything else. You should only provide one output post completing your reasoning
 
-        CRITICAL DATE VALIDATION RULE (Applicable only for date related validations):
-            VALIDATE ONLY: Date number + Month (any format) IGNORE: Year, date format, time (unless user explicitly requests)
-            - POSITIVE ASSERTION (True) IF:
-                - Correct date number visible
-                - Correct month visible (abbreviated/full/numeric - any format OK)
-            - NEGATIVE ASSERTION (False) ONLY IF:
-                - Wrong date number OR wrong month OR missing date/month
-            FORBIDDEN: Failing assertions due to year differences or format variations
-            Example:
-                Expected "7 August 2025" → Display "07 Aug" = ✅ POSITIVE,
-                Expected "07 Sept 2025" → Display "7 September" = ✅ POSITIVE
-
-        Rules for Position-Based Validation:
-        * Direct Relationship Required
-            - When validating relative position (e.g., verify if X is below Y), the result is True only if X is directly below Y.
-            - If X is below some other element (e.g., Z) that happens to be in the same section as Y, the result is False.
-            - Always validate strictly against the specified reference element.
-        * Above/Below Validity
-            - When the user has explicitly specified an above or below validation, the condition is valid as long as the element is vertically above or vertically below the reference element.
-            - In this case, horizontal alignment (left, center, right) is irrelevant and should be ignored.        
-
-        """ + "\nToday's date for your reference: " + datetime.now().strftime("%d-%B-%Y") + ".\n\n"
+        """ + VISUAL_VALIDATION_RULES + "\nToday's date for your reference: " + datetime.now().strftime("%d-%B-%Y") + ".\n\n"
         # global llm
         # temp = llm
         # llm = "openai"
         # print(systemPrompt)
         # print(userPrompt)
         # print("Base64 Image: ", base64Image)
-        val = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt, image=base64Image)
+        val = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt, image=base64Image, callSite=callSite)
         # llm = temp
         return val
 
+    def visualValidationBatch(self, base64Image: str, assertions: List[str]) -> List[str]:
+        """
+        Validates several assertions against one screenshot in a single LLM call.
+        Returns one `true|reasoning` / `false|reasoning` verdict per assertion, in order.
+        """
+        systemPrompt = """
+        You are a helpful assistant. You are given a numbered list of assertions about the same screenshot. Validate every assertion independently.
+        Respond with a JSON array containing exactly one string per assertion, in the same order as the assertions. Each string must be true/false, then a `|` symbol and detailed reasoning why you said true/false.
+        Example for two assertions: ["true|The button is displayed below the header", "false|The price shown is 20, not 25"]
+        You should exactly follow this format and do not output anything else.
+
+        """ + VISUAL_VALIDATION_RULES + "\nToday's date for your reference: " + datetime.now().strftime("%d-%B-%Y") + ".\n\n"
+        userPrompt = "\n".join(f"{index + 1}. {assertion}" for index, assertion in enumerate(assertions))
+        response = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt, image=base64Image,
+                                 callSite=run_configs.LLM_CallSite.VISUAL_ASSERTION)
+        verdicts = None
+        start, end = response.find("["), response.rfind("]")
+        if start != -1 and end > start:
+            try:
+                verdicts = json.loads(response[start:end + 1])
+            except json.JSONDecodeError:
+                verdicts = None
+        if not isinstance(verdicts, list) or len(verdicts) != len(assertions):
+            print("Batched visual validation returned " + str(response) + "\nValidating the assertions one by one")
+            return [self.visualValidation(base64Image, assertion) for assertion in assertions]
+        return [str(verdict) for verdict in verdicts]
+
     def wait_pause(self, seconds: Annotated[int, "Number of seconds to pause/wait (default 5)"]):
         time.sleep(seconds)
 
-    def assertionVisual(self, element, assertion):
-        time.sleep(3)
-        if run_configs.dryRun == False:
-            if element is not None:
-                try:
-                    self.scrollToElement(element)
-                except Exception as e:
-                    for xpath in run_configs.SECTION_AUTO_ID:
-                        try:
-                            self.scrollToElement(xpath)
-                        except Exception as e:
-                            pass
-                    # print(f"Error scrolling to element {element}: {e}, continuing with assertion")
-            else:
+    def scrollForAssertion(self, element):
+        if element is not None:
+            try:
+                self.scrollToElement(element)
+            except Exception as e:
                 for xpath in run_configs.SECTION_AUTO_ID:
                     try:
                         self.scrollToElement(xpath)
                     except Exception as e:
                         pass
-                        # print(f"Error scrolling to element {xpath}: {e}, continuing with assertion")
-            check = self.visualValidation(self.take_screenshot_as_base64(), assertion)
-            print("x-x-x-x-x-x-x-x-x-x-x-x-x-x-x")
-            print("Assertion: " + assertion)
-            print(check)
-            print("x-x-x-x-x-x-x-x-x-x-x-x-x-x-x")
-            actualAssertion: str = check.split("|")[0].strip().lower()
-            soft_assert.equal(actualAssertion, "true", f"Soft Assertion Failed: {assertion}")
+                # print(f"Error scrolling to element {element}: {e}, continuing with assertion")
+        else:
+            for xpath in run_configs.SECTION_AUTO_ID:
+                try:
+                    self.scrollToElement(xpath)
+                except Exception as e:
+                    pass
+                    # print(f"Error scrolling to element {xpath}: {e}, continuing with assertion")
+
+    def isElementInViewport(self, element) -> bool:
+        """
+        Whether the element is fully visible in the current viewport without scrolling. Channels that cannot
+        tell return False, so batched assertions fall back to one screenshot per assertion.
+        """
+        return False
+
+    def elementBox(self, element) -> Optional[BoundingBox]:
+        """
+        Viewport box of the first element matching the XPath, None when it is not found or the channel cannot
+        tell.
+        """
+        return None
+
+    def sectionCropBoxes(self, scopeElements: Optional[List[str]]) -> List[BoundingBox]:
+        """
+        Boxes of the run_configs.SECTION_AUTO_ID sections containing the asserted elements, to crop the screenshot
+        to. Empty (full screenshot) when there is no element, an element is None (page level assertion) or an
+        element lies outside every section.
+        """
+        if not scopeElements or any(element is None for element in scopeElements) or not run_configs.SECTION_AUTO_ID:
+            return []
+        sections = [box for box in map(self.elementBox, run_configs.SECTION_AUTO_ID) if box is not None]
+        cropBoxes = []
+        for element in scopeElements:
+            box = self.elementBox(element)
+            section = next((section for section in sections if box_contains(section, box)), None) if box else None
+            if section is None:
+                return []
+            if section not in cropBoxes:
+                cropBoxes.append(section)
+        return cropBoxes
+
+    def assertionVisual(self, element, assertion):
+        if getattr(self, "_visualAssertionBatch", None) is not None:
+            # Evaluated together with the following assertions when the batch is flushed
+            self._visualAssertionBatch.append((element, assertion))
+            return
+        time.sleep(3)
+        if run_configs.dryRun == False:
+            self.scrollForAssertion(element)
+            check = self.visualValidation(self.take_screenshot_as_base64(scopeElements=[element]), assertion)
+            self.softAssertVisual(assertion, check)
+
+    def softAssertVisual(self, assertion, check):
+        print("x-x-x-x-x-x-x-x-x-x-x-x-x-x-x")
+        print("Assertion: " + assertion)
+        print(check)
+        print("x-x-x-x-x-x-x-x-x-x-x-x-x-x-x")
+        actualAssertion: str = check.split("|")[0].strip().lower()
+        soft_assert.equal(actualAssertion, "true", f"Soft Assertion Failed: {assertion}")
+
+    @contextmanager
+    def batchedVisualAssertions(self):
+        """
+        Within this context `assertionVisual` calls are queued. Consecutive assertions whose elements share the
+        viewport are validated with one screenshot and one LLM call when `flushVisualAssertions` is called or the
+        context exits. Each verdict is still reported as its own soft assertion.
+        """
+        self._visualAssertionBatch = []
+        try:
+            yield
+        finally:
+            try:
+                self.flushVisualAssertions()
+            finally:
+                self._visualAssertionBatch = None
+
+    def flushVisualAssertions(self):
+        pending = getattr(self, "_visualAssertionBatch", None)
+        if not pending:
+            return
+        self._visualAssertionBatch = []
+        if run_configs.dryRun:
+            return
+        group = []
+        for index, (element, assertion) in enumerate(pending):
+            if group and not (element is None or self.isElementInViewport(element)):
+                self._validateVisualAssertionGroup(group)
+                group = []
+            if not group:
+                time.sleep(3)
+                self.scrollForAssertion(element)
+                if index < len(pending) - 1:
+                    time.sleep(1)  # Let the smooth scroll settle before checking which elements share the viewport
+            group.append((element, assertion))
+        self._validateVisualAssertionGroup(group)
+
+    def _validateVisualAssertionGroup(self, group: List[tuple]):
+        assertions = [assertion for _, assertion in group]
+        screenshot = self.take_screenshot_as_base64(scopeElements=[element for element, _ in group])
+        if len(assertions) == 1:
+            checks = [self.visualValidation(screenshot, assertions[0])]
+        else:
+            print(f"Validating {len(assertions)} visual assertions with a single screenshot")
+            checks = self.visualValidationBatch(screenshot, assertions)
+        for assertion, check in zip(assertions, checks):
+            self.softAssertVisual(assertion, check)
 
     def askLLMAboutImage(self, base64Image: str) -> str:
         systemPrompt = "You are given a screenshot of a web application. Describe the image in detail"
-        return self.setupLLM(systemPrompt=systemPrompt, userPrompt="", image=base64Image)
+        return self.setupLLM(systemPrompt=systemPrompt, userPrompt="", image=base64Image,
+                             callSite=run_configs.LLM_CallSite.DESCRIBE_SCREEN)
 
     def setupLLM(self,
                  provider: run_configs.LLM_Provider = run_configs.llm_provider,
-                 model: run_configs.LLM_MODEL = run_configs.llm_model.value,
+                 model: run_configs.LLM_MODEL = None,
                  systemPrompt:str="",
                  userPrompt:str ="",
                  image:str="",
                  thinking=True,
                  temperature: int=0,
+                 callSite: run_configs.LLM_CallSite = run_configs.LLM_CallSite.DEFAULT,
                  ) -> str:
-        import json
-        obj = {}
-        project_root = run_configs.get_project_root()
-        file_path = os.path.join(
-            project_root,
-            "credentials.json"
-        )
-        
-        # Priority 1: Load from environment variables (most secure for open source)
-        # Priority 2: Fall back to credentials.json file (for backward compatibility)
-        
-        # Try to load from JSON file if it exists
-        if os.path.exists(file_path):
-            try:
-                with open(file_path) as f:
-                    obj = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"⚠️  Warning: Could not read credentials.json: {e}")
-                obj = {}
-        
-        # Override with environment variables if they exist (environment variables take precedence)
-        # This allows users to use env vars without needing the JSON file
-        if "GEMINI_API_KEY" in os.environ:
-            if "gemini" not in obj:
-                obj["gemini"] = {}
-            obj["gemini"]["key"] = os.environ["GEMINI_API_KEY"]
-        
-        if "GPT_INTERNAL_USERNAME" in os.environ:
-            if "gpt_internal" not in obj:
-                obj["gpt_internal"] = {}
-            obj["gpt_internal"]["username"] = os.environ["GPT_INTERNAL_USERNAME"]
-        
-        if "GPT_INTERNAL_PASSWORD" in os.environ:
-            if "gpt_internal" not in obj:
-                obj["gpt_internal"] = {}
-            obj["gpt_internal"]["password"] = os.environ["GPT_INTERNAL_PASSWORD"]
-        
-        # AWS Bedrock credentials from environment variables
-        if "AWS_BEDROCK_SERVICE_NAME" in os.environ:
-            if "aws_bedrock" not in obj:
-                obj["aws_bedrock"] = {}
-            obj["aws_bedrock"]["service_name"] = os.environ["AWS_BEDROCK_SERVICE_NAME"]
-        
-        if "AWS_BEDROCK_REGION" in os.environ:
-            if "aws_bedrock" not in obj:
-                obj["aws_bedrock"] = {}
-            obj["aws_bedrock"]["region_name"] = os.environ["AWS_BEDROCK_REGION"]
-        
-        if "AWS_ACCESS_KEY_ID" in os.environ:
-            if "aws_bedrock" not in obj:
-                obj["aws_bedrock"] = {}
-            obj["aws_bedrock"]["aws_access_key_id"] = os.environ["AWS_ACCESS_KEY_ID"]
-        
-        if "AWS_SECRET_ACCESS_KEY" in os.environ:
-            if "aws_bedrock" not in obj:
-                obj["aws_bedrock"] = {}
-            obj["aws_bedrock"]["aws_secret_access_key"] = os.environ["AWS_SECRET_ACCESS_KEY"]
-        
-        if "AWS_SESSION_TOKEN" in os.environ:
-            if "aws_bedrock" not in obj:
-                obj["aws_bedrock"] = {}
-            obj["aws_bedrock"]["aws_session_token"] = os.environ["AWS_SESSION_TOKEN"]
-        userPrompt = systemPrompt + "\n\n" + userPrompt
-        systemPrompt = ""
+        route = self.resolveLLMRoute(callSite, model, thinking)
+        # Vision questions about a screen that has not changed are answered from memory
+        memoKey, rememberedResponse = VisionMemo.get(systemPrompt + "\n\n" + userPrompt, image, callSite)
+        if rememberedResponse is not None:
+            return self.split_on_last(rememberedResponse, "```json")[-1]
+        cacheKey, cachedResponse = self.lookupCachedLLMResponse(provider, systemPrompt, userPrompt, image, temperature, route)
+        if cachedResponse is not None:
+            if memoKey is not None:
+                VisionMemo.put(memoKey, cachedResponse)
+            return self.split_on_last(cachedResponse, "```json")[-1]
+        providers = [provider] + [fallback for fallback in run_configs.llm_fallback_providers if fallback != provider]
+        properResponse = LLMRouter.route(
+            lambda candidate: self.invokeLLMProvider(candidate, systemPrompt, userPrompt, image, temperature,
+                                                     route if candidate == provider else self.routeForProvider(route, candidate),
+                                                     cacheKey),
+            providers)
+        if properResponse is None:
+            print("LLM did not respond even after 3 attempts.")
+        elif memoKey is not None:
+            VisionMemo.put(memoKey, properResponse)
+        return self.split_on_last(properResponse, "```json")[-1]
+
+    def invokeLLMProvider(self, provider, systemPrompt, userPrompt, image, temperature, route, cacheKey=None) -> Optional[str]:
+        """
+        Sends the request to one provider, retrying up to 3 attempts with exponential backoff and jitter.
+        Returns the response text or None when the provider did not respond. Latency and outcome feed the router.
+        """
+        request = self.buildLLMRequest(provider, systemPrompt, userPrompt, image, temperature, route)
         startTime = time.time()
         properResponse = None
+        val = ""
+        for attempt in range(3):
+            if attempt > 0:
+                time.sleep(backoff_delay(attempt - 1))
+            try:
+                if provider == run_configs.LLM_Provider.LOCAL_FIXTURE:
+                    val = LLMFixtureTranscript.replay(request["payload"]["key"])
+                elif provider == run_configs.LLM_Provider.AWS_BEDROCK:
+                    response = LLMClientRegistry.invokeBedrock(request["model_id"], json.dumps(request["payload"]))
+                    val = response["body"].read().decode("utf-8")
+                else:
+                    response = LLMClientRegistry.post(provider, url=request["url"], data=json.dumps(request["payload"]), headers=request["headers"], timeout=120)
+                    val = response.text
+            except Exception as e:
+                if attempt == 2:
+                    LLMRouter.record(provider, time.time() - startTime, False)
+                    raise
+                print(f"LLM request to {provider.value} failed on attempt {attempt + 1}: {e}")
+                continue
+            properResponse = self.extractJsonValueBasedOnPath(val, self.convert_intellij_json_path_to_right_format(request["responsePath"]))
+            if properResponse is not None:
+                if attempt > 1:
+                    print(val)
+                    print("LLM responded successfully after " + str(attempt + 1) + " attempts")
+                break
+        if properResponse is None:
+            print(val)
+        latency = time.time() - startTime
+        LLMRouter.record(provider, latency, properResponse is not None)
+        tokenCount = self.recordLLMUsage(request, val, startTime)
+        if cacheKey is not None and properResponse is not None:
+            LLMResponseCache.put(cacheKey, properResponse, tokenCount)
+        if (run_configs.llm_fixture_record and properResponse is not None
+                and provider != run_configs.LLM_Provider.LOCAL_FIXTURE):
+            LLMFixtureTranscript.record(LLMFixtureTranscript.promptKey(systemPrompt, userPrompt, image),
+                                        properResponse, latency, tokenCount)
+        return properResponse
+
+    def routeForProvider(self, route: Dict[str, Any], provider: run_configs.LLM_Provider) -> Dict[str, Any]:
+        """
+        Route of a hedged/failover request: same call site settings on the provider's configured model.
+        """
+        return {**route, "model": run_configs.llm_provider_models.get(provider, route["model"])}
+
+    def resolveLLMRoute(self, callSite: run_configs.LLM_CallSite, model=None, thinking=True) -> Dict[str, Any]:
+        """
+        Resolves the model, thinking budget and max tokens of a call site from `run_configs.llm_routing`.
+        An explicitly passed model wins over the route and thinking=False always disables thinking.
+        """
+        route = run_configs.llm_routing.get(callSite, run_configs.llm_routing[run_configs.LLM_CallSite.DEFAULT])
+        thinkingBudget = route.get("thinking_budget")
+        return {
+            "callSite": callSite,
+            "model": model or route.get("model") or run_configs.llm_model,
+            "thinking": bool(thinking) and thinkingBudget != 0,
+            "thinkingBudget": thinkingBudget,
+            "maxTokens": route.get("max_tokens"),
+        }
+
+    def lookupCachedLLMResponse(self, provider, systemPrompt, userPrompt, image, temperature, route):
+        """
+        Returns (cacheKey, cachedResponse). Both are None when the response cache is disabled; cachedResponse is
+        None on a miss. Fails the test on a miss in replay-only mode.
+        """
+        if not LLMResponseCache.isEnabled():
+            return None, None
+        thinking = (route["thinkingBudget"] or True) if route["thinking"] else False
+        cacheKey = LLMResponseCache.buildKey(provider, route["model"], temperature, thinking,
+                                             systemPrompt + "\n\n" + userPrompt, image, route["maxTokens"])
+        cachedResponse = LLMResponseCache.get(cacheKey)
+        if cachedResponse is None and LLMResponseCache.isReplayOnly():
+            pytest.fail("LLM response cache miss in replay-only mode. Re-run with LLM_CacheMode.READ_WRITE to record the missing response")
+        return cacheKey, cachedResponse
+
+    def buildLLMRequest(self, provider, systemPrompt, userPrompt, image, temperature, route) -> Dict[str, Any]:
+        """
+        Validates credentials and builds the provider specific request: url, headers, payload, the path of the
+        response text and the token usage paths.
+        """
+        obj = LLMClientRegistry.getCredentials()
+        originalSystemPrompt, originalUserPrompt = systemPrompt, userPrompt
+        model = route["model"]
+        thinking = route["thinking"]
+        # The system prompt is the stable prefix (static rules) and the user prompt the volatile suffix. Providers
+        # supporting prompt caching get the prefix marked cacheable, all others receive a single folded prompt.
+        promptCaching = (run_configs.llm_prompt_caching and systemPrompt != ""
+                         and provider in (run_configs.LLM_Provider.GEMINI, run_configs.LLM_Provider.AWS_BEDROCK))
+        if not promptCaching:
+            userPrompt = systemPrompt + "\n\n" + userPrompt
+            systemPrompt = ""
         responsePath = ""
         totalTokenPath = ""
+        cacheReadTokenPath = []
+        cacheCreationTokenPath = []
         url = ""
         headers = ""
         payload = ""
+        model_id = model.value if hasattr(model, 'value') else model
         if provider == run_configs.LLM_Provider.GEMINI:
             # Validate credentials
             if "gemini" not in obj or "key" not in obj.get("gemini", {}):
@@ -263,13 +473,17 @@ class HelperInterface(HelperAgent):
             if image != "":
                 user_parts.append({
                     "inline_data": {
-                        "mime_type": "image/png",
+                        "mime_type": detect_image_mime(image),
                         "data": image
                     }
                 })
             responsePath = "/candidates/0/content/parts/0/text"
             totalTokenPath = ["/usageMetadata/totalTokenCount"]
-            url = 'https://generativelanguage.googleapis.com/v1beta/models/'+LLM_MODEL.GEMINI_2_5_PRO.value+':generateContent?key=' + obj["gemini"]["key"]
+            cacheReadTokenPath = ["/usageMetadata/cachedContentTokenCount"]
+            # Non Gemini models (e.g. a Bedrock default) fall back to Gemini 2.5 Pro
+            geminiModel = model_id if str(model_id).startswith("gemini") else LLM_MODEL.GEMINI_2_5_PRO.value
+            model_id = geminiModel
+            url = 'https://generativelanguage.googleapis.com/v1beta/models/'+geminiModel+':generateContent?key=' + obj["gemini"]["key"]
             headers = {
                 "Content-Type": "application/json"
             }
@@ -293,8 +507,21 @@ class HelperInterface(HelperAgent):
             }
             if thinking:
                 payload["generationConfig"]["thinkingConfig"] = {
-                    "thinkingBudget": 24576
+                    "thinkingBudget": route["thinkingBudget"] or 24576
                 }
+            if route["maxTokens"]:
+                payload["generationConfig"]["maxOutputTokens"] = route["maxTokens"]
+            if promptCaching:
+                cachedContent = GeminiContextCache.getCachedContent(geminiModel, systemPrompt, obj["gemini"]["key"])
+                if cachedContent is not None:
+                    # The system instruction already lives in the cached content and must not be repeated
+                    del payload["system_instruction"]
+                    payload["cachedContent"] = cachedContent
+        elif provider == run_configs.LLM_Provider.LOCAL_FIXTURE:
+            # Answered from the recorded transcript, the prompts as passed by the caller form the key
+            responsePath = "/response"
+            totalTokenPath = ["/tokens"]
+            payload = {"key": LLMFixtureTranscript.promptKey(originalSystemPrompt, originalUserPrompt, image)}
         elif provider == run_configs.LLM_Provider.OPENAI_INTERNAL:
             # Validate credentials
             if "gpt_internal" not in obj or "username" not in obj.get("gpt_internal", {}) or "password" not in obj.get("gpt_internal", {}):
@@ -316,7 +543,7 @@ class HelperInterface(HelperAgent):
                 model_code = 40
             user_parts = [{"type": "text", "text": userPrompt}]
             if image != "":
-                user_parts.append({"type": "image_url", "image_url": {"url": "data:image/png;base64," + image}})
+                user_parts.append({"type": "image_url", "image_url": {"url": "data:" + detect_image_mime(image) + ";base64," + image}})
             responsePath = "/response/openAIResponse/choices/0/message/content"
             totalTokenPath = ["/response/openAIResponse/usage/total_tokens"]
             url = ""
@@ -344,7 +571,7 @@ class HelperInterface(HelperAgent):
         elif provider == run_configs.LLM_Provider.PERPLEXITY:
             user_parts = [{"type": "text", "text": userPrompt}]
             if image != "":
-                user_parts.append({"type": "image_url", "image_url": {"url": "data:image/png;base64," + image}})
+                user_parts.append({"type": "image_url", "image_url": {"url": "data:" + detect_image_mime(image) + ";base64," + image}})
             responsePath = "/response/openAIResponse/choices/0/message/content"
             totalTokenPath = ["/response/openAIResponse/usage/total_tokens"]
             modelPath = "/response/openAIResponse/model"
@@ -377,7 +604,7 @@ class HelperInterface(HelperAgent):
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
+                        "media_type": detect_image_mime(image),
                         "data": image
                     }
                 })
@@ -389,6 +616,8 @@ class HelperInterface(HelperAgent):
             totalTokenPath = ["/usage/input_tokens", "/usage/cache_creation_input_tokens",
                               "/usage/cache_read_input_tokens",
                               "/usage/output_tokens"]
+            cacheReadTokenPath = ["/usage/cache_read_input_tokens"]
+            cacheCreationTokenPath = ["/usage/cache_creation_input_tokens"]
 
         if provider == run_configs.LLM_Provider.AWS_BEDROCK:
             # Validate credentials
@@ -414,28 +643,15 @@ class HelperInterface(HelperAgent):
                     "Please set all required credentials. See credentials.json.example for a template."
                 )
             
-            import boto3
-            config = Config(
-                read_timeout=300,  # 5 minutes
-                retries={'max_attempts': 3}
-            )
-            bedrock = boto3.client(
-                config=config,
-                service_name = obj["aws_bedrock"]["service_name"],
-                region_name = obj["aws_bedrock"]["region_name"],
-                aws_access_key_id = obj["aws_bedrock"]["aws_access_key_id"],
-                aws_secret_access_key = obj["aws_bedrock"]["aws_secret_access_key"],
-                aws_session_token = obj["aws_bedrock"].get("aws_session_token")  # Optional field
-            )
             if thinking:
                 payload = {
                     "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 65536,
+                    "max_tokens": route["maxTokens"] or 65536,
                     "temperature": 1,
                     "system": systemPrompt,
                     "thinking": {
                         "type": "enabled",
-                        "budget_tokens": 30000
+                        "budget_tokens": route["thinkingBudget"] or 30000
                     },
                     "messages": [
                         {
@@ -447,7 +663,7 @@ class HelperInterface(HelperAgent):
             else:
                 payload = {
                     "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 65536,
+                    "max_tokens": route["maxTokens"] or 65536,
                     "temperature": temperature,
                     "system": systemPrompt,
                     "messages": [
@@ -457,40 +673,137 @@ class HelperInterface(HelperAgent):
                         }
                     ]
                 }
-            # Handle both enum and string types
-            model_id = model.value if hasattr(model, 'value') else model
-            response = bedrock.invoke_model(
-                modelId=model_id,
-                body=json.dumps(payload)
-            )
-            val = response["body"].read().decode("utf-8")
-            properResponse = self.extractJsonValueBasedOnPath(val, self.convert_intellij_json_path_to_right_format(responsePath))
-        else:
-            for attempt in range(3):
-                response = requests.post(url=url, data=json.dumps(payload), headers=headers, timeout=120)
-                val = response.text
-                properResponse = self.extractJsonValueBasedOnPath(val, self.convert_intellij_json_path_to_right_format(responsePath))
-                if properResponse is not None:
-                    if attempt > 1:
-                        print(val)
-                        print("LLM responded successfully after " + str(attempt + 1) + " attempts")
-                    break
-        if properResponse is None:
-            print(response.text)
-            print("LLM did not respond even after 3 attempts.")
-        tokenCount = self.calculate_total_token_count(val, totalTokenPath)
+            if promptCaching:
+                payload["system"] = bedrock_cacheable_system(systemPrompt)
+        return {
+            "provider": provider,
+            "callSite": route["callSite"],
+            "model_id": model_id,
+            "url": url,
+            "headers": headers,
+            "payload": payload,
+            "responsePath": responsePath,
+            "totalTokenPath": totalTokenPath,
+            "cacheReadTokenPath": cacheReadTokenPath,
+            "cacheCreationTokenPath": cacheCreationTokenPath,
+        }
+
+    def recordLLMUsage(self, request: Dict[str, Any], val: str, startTime: float) -> int:
+        """
+        Records latency, total tokens and prompt cache tokens of a completed LLM call. Returns the total tokens.
+        """
+        tokenCount = self.calculate_total_token_count(val, request["totalTokenPath"])
         endTime = time.time()
         duration = endTime - startTime
-        llmResponseTime.append(duration)
+        run_configs.llmResponseTime.append(duration)
         if tokenCount is not None:
-            llmTokens.append(int(tokenCount))
+            run_configs.llmTokens.append(int(tokenCount))
         else:
-            llmTokens.append(0)
-        return self.split_on_last(properResponse, "```json")[-1]
+            run_configs.llmTokens.append(0)
+        run_configs.llmCacheReadTokens.append(self.calculate_total_token_count(val, request["cacheReadTokenPath"]))
+        run_configs.llmCacheCreationTokens.append(self.calculate_total_token_count(val, request["cacheCreationTokenPath"]))
+        siteStats = run_configs.llmCallSiteStats.setdefault(request["callSite"].value,
+                                                            {"calls": 0, "responseTime": [], "tokens": []})
+        siteStats["calls"] += 1
+        siteStats["responseTime"].append(duration)
+        siteStats["tokens"].append(int(tokenCount or 0))
+        return tokenCount
+
+    def streamLLM(self,
+                  provider: run_configs.LLM_Provider = run_configs.llm_provider,
+                  model: run_configs.LLM_MODEL = None,
+                  systemPrompt: str = "",
+                  userPrompt: str = "",
+                  image: str = "",
+                  thinking=True,
+                  temperature: int = 0,
+                  callSite: run_configs.LLM_CallSite = run_configs.LLM_CallSite.DEFAULT,
+                  ) -> Iterator[str]:
+        """
+        Streaming variant of setupLLM. Yields the response text in chunks as the provider produces them, thinking
+        output excluded. Gemini and Bedrock stream natively; other providers yield the complete response once.
+        Token usage and the response cache are recorded when the stream is exhausted.
+        When the stream cannot be opened (e.g. a 429 or 5xx) or ends without any text, the complete response is
+        requested through setupLLM instead, with its retries and provider failover.
+        """
+        if provider not in (run_configs.LLM_Provider.GEMINI, run_configs.LLM_Provider.AWS_BEDROCK):
+            yield self.setupLLM(provider, model, systemPrompt, userPrompt, image, thinking, temperature, callSite)
+            return
+        route = self.resolveLLMRoute(callSite, model, thinking)
+        cacheKey, cachedResponse = self.lookupCachedLLMResponse(provider, systemPrompt, userPrompt, image, temperature, route)
+        if cachedResponse is not None:
+            yield cachedResponse
+            return
+        request = self.buildLLMRequest(provider, systemPrompt, userPrompt, image, temperature, route)
+        startTime = time.time()
+        chunks = []
+        val = ""
+        try:
+            if provider == run_configs.LLM_Provider.GEMINI:
+                url = request["url"].replace(":generateContent?", ":streamGenerateContent?alt=sse&")
+                response = LLMClientRegistry.post(provider, url=url, data=json.dumps(request["payload"]),
+                                                  headers=request["headers"], timeout=120, stream=True)
+                if response.status_code != 200:
+                    error = f"HTTP {response.status_code}: {response.text[:500]}"
+                    response.close()
+                    raise RuntimeError(error)
+            else:
+                response = LLMClientRegistry.invokeBedrockStream(request["model_id"], json.dumps(request["payload"]))
+        except Exception as e:
+            LLMRouter.record(provider, time.time() - startTime, False)
+            print(f"⚠️  Streaming request to {provider.value} failed ({e}), requesting the complete response instead")
+            yield self.setupLLM(provider, model, systemPrompt, userPrompt, image, thinking, temperature, callSite)
+            return
+        if provider == run_configs.LLM_Provider.GEMINI:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                val = line[len("data:"):].strip()  # The last event carries the final usage metadata
+                event = json.loads(val)
+                for part in event.get("candidates", [{}])[0].get("content", {}).get("parts", []):
+                    if "text" in part and not part.get("thought"):
+                        chunks.append(part["text"])
+                        yield part["text"]
+        else:
+            usage = {}
+            for event in response["body"]:
+                if "chunk" not in event:
+                    continue
+                data = json.loads(event["chunk"]["bytes"].decode("utf-8"))
+                if data["type"] == "message_start":
+                    usage.update(data["message"].get("usage", {}))
+                elif data["type"] == "message_delta":
+                    usage.update(data.get("usage", {}))
+                elif data["type"] == "content_block_delta" and data["delta"]["type"] == "text_delta":
+                    chunks.append(data["delta"]["text"])
+                    yield data["delta"]["text"]
+            val = json.dumps({"usage": usage})
+        properResponse = "".join(chunks)
+        LLMRouter.record(provider, time.time() - startTime, properResponse != "")
+        tokenCount = self.recordLLMUsage(request, val, startTime)
+        if properResponse == "":
+            print(val)
+            print("LLM did not respond while streaming, requesting the complete response instead")
+            yield self.setupLLM(provider, model, systemPrompt, userPrompt, image, thinking, temperature, callSite)
+            return
+        if cacheKey is not None:
+            LLMResponseCache.put(cacheKey, properResponse, tokenCount)
+        if run_configs.llm_fixture_record:
+            LLMFixtureTranscript.record(LLMFixtureTranscript.promptKey(systemPrompt, userPrompt, image),
+                                        properResponse, time.time() - startTime, tokenCount)
+
+    async def asetupLLM(self, *args, **kwargs) -> str:
+        """
+        Async variant of setupLLM. The blocking provider call runs on a worker thread, so independent requests
+        can be awaited together (see `gatherLLM`). Concurrency is capped by `run_configs.llm_max_concurrency`.
+        """
+        async with llm_concurrency_limit():
+            return await asyncio.to_thread(self.setupLLM, *args, **kwargs)
 
     def visualGetText(self, base64Image: str, userPrompt: str) -> str:
         systemPrompt = "You are a helpful assistant. Extract the text specified by user from the given image and return it as a pure string without enclosing in single/double quotes. If no text is found, return `None`. Do not return anything else with this"
-        val = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt, image=base64Image, thinking=False)
+        val = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt, image=base64Image,
+                            callSite=run_configs.LLM_CallSite.VISUAL_GET_TEXT)
         return val
 
     def getText(self, element, textDescription, keyName):
@@ -697,7 +1010,8 @@ class HelperInterface(HelperAgent):
                     Expected "07 Sept 2025" → Display "7 September" = ✅ POSITIVE
             Note: Prepare your response post your thinking process and answer in the end
             """
-            check = self.setupLLM(systemPrompt=systemPrompt, userPrompt=assertion)
+            check = self.setupLLM(systemPrompt=systemPrompt, userPrompt=assertion,
+                                  callSite=run_configs.LLM_CallSite.TEXT_ASSERTION)
             print(check)
             actualAssertion: str = check.split("|")[0].strip().lower()
             soft_assert.equal(actualAssertion, "true", f"Soft Assertion Failed: {assertion}")
@@ -734,11 +1048,12 @@ class HelperInterface(HelperAgent):
                     "}\n\n"
                 )
                 userPrompt = "List: " + str(list_of_lists) + "\nUser text: " + val + "\n\n"
-                response = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt)
-                json_response = self.extract_json_block(response)
-                value = self.extractJsonValueBasedOnPath(json_response, "/value")
-                index = self.extractJsonValueBasedOnPath(json_response, "/index")
-                reasoning = self.extractJsonValueBasedOnPath(json_response, "/Reasoning")
+                response = self.setupLLM(systemPrompt=systemPrompt, userPrompt=userPrompt,
+                                         callSite=run_configs.LLM_CallSite.TEXT_MATCH)
+                json_response = load_json_block(self.extract_json_block(response))
+                value = json_response.get("value")
+                index = json_response.get("index")
+                reasoning = json_response.get("Reasoning")
                 # print("List of values: ", list_of_lists)
                 print("Could not find any locator whose text exactly matches: " + val + "\nExact Matching is False so AI is looking for a close match")
                 print("Value selected by LLM: " + value + "\nIndex selected by LLM: " + str(index) + "\nLLM Reasoning: " + reasoning)
@@ -941,27 +1256,24 @@ class HelperInterface(HelperAgent):
         """
         pass
 
-    @classmethod
     @abstractmethod
-    def _add_event(cls, event: Dict):
+    def _add_event(self, event: Dict):
         """
-        Internal helper to safely append events to the shared event store.
+        Internal helper to append events to the event store of this session.
         """
         pass
 
-    @classmethod
     @abstractmethod
-    def get_all_events(cls) -> List[Dict]:
+    def get_all_events(self) -> List[Dict]:
         """
-        Retrieve all captured GA events.
+        Retrieve all GA events captured in this session.
         """
         pass
 
-    @classmethod
     @abstractmethod
-    def clear_events(cls):
+    def clear_events(self):
         """
-        Clear all stored GA events.
+        Clear the GA events stored for this session.
         """
         pass
 
@@ -989,12 +1301,14 @@ class HelperInterface(HelperAgent):
         """
         pass
 
-    _request_payloads: List[str] = []
-
     _handlers = []
 
     @abstractmethod
-    def take_screenshot_as_base64(self) -> str:
+    def take_screenshot_as_base64(self, scopeElements: Optional[List[str]] = None) -> str:
+        """
+        Screenshot prepared for vision LLM calls. When every element of scopeElements lies inside a section of
+        run_configs.SECTION_AUTO_ID, it is cropped to those sections (see sectionCropBoxes).
+        """
         pass
 
     def sanitize_html(self, html_content: str) -> str:
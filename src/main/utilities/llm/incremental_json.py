@@ -0,0 +1,83 @@
+import json
+from typing import Any, List
+
+
+class IncrementalJsonArrayParser:
+    """
+    Incrementally parses a streamed JSON object and returns the elements of one top level array
+    (e.g. `FunctionCalls`) as soon as each element is complete, before the rest of the object has arrived.
+
+    Any text before the first `{` (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self, arrayKey: str):
+        self.arrayKey = arrayKey
+        self.buffer = ""
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None  # Last string closed at depth 1, a key candidate
+        self._expect_array = False  # Saw `"arrayKey":`, waiting for `[`
+        self._in_array = False
+        self._array_done = False
+        self._element_start = -1
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Consumes the next chunk of the stream and returns the array elements completed by it.
+        """
+        self.buffer += text
+        elements = []
+        buffer = self.buffer
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = buffer[self._string_start:self._pos + 1]
+                self._pos += 1
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char == ":":
+                if self._depth == 1 and not self._array_done and self._last_string is not None:
+                    self._expect_array = json.loads(self._last_string) == self.arrayKey
+                self._last_string = None
+            elif char in "{[":
+                if self._expect_array and char == "[" and self._depth == 1:
+                    self._in_array = True
+                elif self._in_array and self._depth == 2:
+                    self._element_start = self._pos
+                self._expect_array = False
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and self._element_start >= 0:
+                    elements.append(json.loads(buffer[self._element_start:self._pos + 1]))
+                    self._element_start = -1
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+                    self._array_done = True
+            elif not char.isspace():
+                self._expect_array = False
+                self._last_string = None
+            self._pos += 1
+        return elements
+
+    def isArrayComplete(self) -> bool:
+        return self._array_done
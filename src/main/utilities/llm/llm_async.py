@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from core_agentic import run_configs
+
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> concurrency limiting semaphore
+_semaphores_lock = threading.Lock()
+
+
+def llm_concurrency_limit() -> asyncio.Semaphore:
+    """
+    Returns the semaphore capping concurrent LLM requests (`run_configs.llm_max_concurrency`) on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(run_configs.llm_max_concurrency)
+            _semaphores[loop] = semaphore
+        return semaphore
+
+
+async def _run_call(call) -> Any:
+    if asyncio.iscoroutine(call):
+        return await call
+    async with llm_concurrency_limit():
+        return await asyncio.to_thread(call)
+
+
+async def agatherLLM(*calls) -> List[Any]:
+    """
+    Awaits the given coroutines (e.g. `helper.asetupLLM(...)`) and zero-argument callables concurrently.
+    Results are returned in the order the calls were passed.
+    """
+    return list(await asyncio.gather(*(_run_call(call) for call in calls)))
+
+
+def gatherLLM(*calls) -> List[Any]:
+    """
+    Runs independent LLM requests concurrently from synchronous code and returns their results in order.
+
+    Each call is either a coroutine (e.g. `helper.asetupLLM(...)`) or a zero-argument callable such as
+    `lambda: helper.askLLMAboutImage(screenshot)`. Callables run on worker threads, so they must not touch the
+    Playwright page; capture screenshots before fanning out. The event loop runs on its own thread so this
+    works while the Playwright sync API owns the caller's thread.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Tasks and worker threads of the event loop inherit the session of the thread running it
+        return executor.submit(run_configs.in_current_session(asyncio.run), agatherLLM(*calls)).result()
@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+from typing import Dict, Any
+
+import requests
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
+
+from core_agentic import run_configs
+
+# Environment variable -> (credentials section, key). Environment variables take precedence over credentials.json
+CREDENTIAL_ENV_VARS = {
+    "GEMINI_API_KEY": ("gemini", "key"),
+    "GPT_INTERNAL_USERNAME": ("gpt_internal", "username"),
+    "GPT_INTERNAL_PASSWORD": ("gpt_internal", "password"),
+    "AWS_BEDROCK_SERVICE_NAME": ("aws_bedrock", "service_name"),
+    "AWS_BEDROCK_REGION": ("aws_bedrock", "region_name"),
+    "AWS_ACCESS_KEY_ID": ("aws_bedrock", "aws_access_key_id"),
+    "AWS_SECRET_ACCESS_KEY": ("aws_bedrock", "aws_secret_access_key"),
+    "AWS_SESSION_TOKEN": ("aws_bedrock", "aws_session_token"),
+}
+
+
+class LLMClientRegistry:
+    """
+    Process wide registry of LLM provider clients.
+
+    Credentials are resolved once, HTTP providers share a keep-alive `requests.Session` per provider and
+    Bedrock uses a single boto3 client, so consecutive LLM calls of a test reuse the same TLS connections.
+    """
+
+    _lock = threading.RLock()
+    _credentials: Dict[str, Any] = None
+    _sessions: Dict[str, requests.Session] = {}
+    _bedrock_client = None
+    _stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def getCredentials(cls) -> Dict[str, Any]:
+        """
+        Returns the merged credentials (credentials.json overridden by environment variables).
+        Resolved on first use and cached for the lifetime of the process.
+        """
+        with cls._lock:
+            if cls._credentials is None:
+                cls._credentials = cls._load_credentials()
+            return cls._credentials
+
+    @classmethod
+    def _load_credentials(cls) -> Dict[str, Any]:
+        obj = {}
+        file_path = os.path.join(run_configs.get_project_root(), "credentials.json")
+
+        # Priority 1: Load from environment variables (most secure for open source)
+        # Priority 2: Fall back to credentials.json file (for backward compatibility)
+        if os.path.exists(file_path):
+            try:
+                with open(file_path) as f:
+                    obj = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"⚠️  Warning: Could not read credentials.json: {e}")
+                obj = {}
+
+        for env_var, (section, key) in CREDENTIAL_ENV_VARS.items():
+            if env_var in os.environ:
+                obj.setdefault(section, {})[key] = os.environ[env_var]
+        return obj
+
+    @classmethod
+    def _provider_stats(cls, provider: run_configs.LLM_Provider) -> Dict[str, int]:
+        return cls._stats.setdefault(provider.value, {"requests": 0, "clients_created": 0})
+
+    @classmethod
+    def getHttpSession(cls, provider: run_configs.LLM_Provider) -> requests.Session:
+        """
+        Returns the pooled keep-alive session of the given HTTP based provider, creating it on first use.
+        """
+        with cls._lock:
+            session = cls._sessions.get(provider.value)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=run_configs.llm_http_pool_size,
+                                      pool_maxsize=run_configs.llm_http_pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._sessions[provider.value] = session
+                cls._provider_stats(provider)["clients_created"] += 1
+            return session
+
+    @classmethod
+    def post(cls, provider: run_configs.LLM_Provider, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a POST request through the pooled session of the provider.
+        """
+        session = cls.getHttpSession(provider)
+        with cls._lock:
+            cls._provider_stats(provider)["requests"] += 1
+        return session.post(url=url, **kwargs)
+
+    @classmethod
+    def getBedrockClient(cls):
+        """
+        Returns the shared boto3 Bedrock runtime client, creating it on first use.
+        Credentials must already be validated by the caller.
+        """
+        with cls._lock:
+            if cls._bedrock_client is None:
+                import boto3
+                bedrock_credentials = cls.getCredentials()["aws_bedrock"]
+                config = Config(
+                    read_timeout=300,  # 5 minutes
+                    # Every Bedrock call goes through the retries and failover of invokeLLMProvider/LLMRouter,
+                    # botocore retrying as well would multiply the worst case latency
+                    retries={'total_max_attempts': 1},
+                    max_pool_connections=run_configs.llm_http_pool_size,
+                    tcp_keepalive=True
+                )
+                cls._bedrock_client = boto3.client(
+                    config=config,
+                    service_name=bedrock_credentials["service_name"],
+                    region_name=bedrock_credentials["region_name"],
+                    aws_access_key_id=bedrock_credentials["aws_access_key_id"],
+                    aws_secret_access_key=bedrock_credentials["aws_secret_access_key"],
+                    aws_session_token=bedrock_credentials.get("aws_session_token")  # Optional field
+                )
+                cls._provider_stats(run_configs.LLM_Provider.AWS_BEDROCK)["clients_created"] += 1
+            return cls._bedrock_client
+
+    @classmethod
+    def invokeBedrock(cls, model_id: str, body: str):
+        """
+        Invokes the Bedrock model through the shared client.
+        """
+        bedrock = cls.getBedrockClient()
+        with cls._lock:
+            cls._provider_stats(run_configs.LLM_Provider.AWS_BEDROCK)["requests"] += 1
+        return bedrock.invoke_model(modelId=model_id, body=body)
+
+    @classmethod
+    def invokeBedrockStream(cls, model_id: str, body: str):
+        """
+        Invokes the Bedrock model with a streamed response through the shared client.
+        """
+        bedrock = cls.getBedrockClient()
+        with cls._lock:
+            cls._provider_stats(run_configs.LLM_Provider.AWS_BEDROCK)["requests"] += 1
+        return bedrock.invoke_model_with_response_stream(modelId=model_id, body=body)
+
+    @classmethod
+    def _connections_opened(cls, provider_value: str) -> int:
+        pool_managers = []
+        if provider_value == run_configs.LLM_Provider.AWS_BEDROCK.value:
+            try:
+                pool_managers.append(cls._bedrock_client._endpoint.http_session._manager)
+            except AttributeError:
+                return 0
+        elif provider_value in cls._sessions:
+            for adapter in set(cls._sessions[provider_value].adapters.values()):
+                pool_managers.append(adapter.poolmanager)
+        total = 0
+        for manager in pool_managers:
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    total += getattr(pool, "num_connections", 0)
+        return total
+
+    @classmethod
+    def getConnectionStats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-provider request counts, clients created, TCP connections opened and the connection reuse rate.
+        """
+        with cls._lock:
+            stats = {}
+            for provider_value, counts in cls._stats.items():
+                connections = cls._connections_opened(provider_value)
+                reuse_rate = 0.0
+                if counts["requests"] > 0:
+                    reuse_rate = max(0.0, (counts["requests"] - connections) / counts["requests"])
+                stats[provider_value] = {**counts, "connections_opened": connections, "reuse_rate": reuse_rate}
+            return stats
+
+    @classmethod
+    def printConnectionStats(cls):
+        for provider_value, stats in cls.getConnectionStats().items():
+            print(f"LLM connections [{provider_value}]: requests={stats['requests']}, "
+                  f"clients created={stats['clients_created']}, connections opened={stats['connections_opened']}, "
+                  f"reuse rate={stats['reuse_rate'] * 100:.2f}%")
+
+    @classmethod
+    def reset(cls):
+        """
+        Closes all pooled sessions and forgets cached credentials and clients.
+        """
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions = {}
+            cls._bedrock_client = None
+            cls._credentials = None
+            cls._stats = {}
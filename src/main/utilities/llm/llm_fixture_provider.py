@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+
+from core_agentic import run_configs
+from src.main.utilities.llm.llm_response_cache import sha256_text
+
+_MONTH = r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+# Dates and times that change from run to run (e.g. "Today's date" in the visual validation prompt)
+VOLATILE_PROMPT_PARTS = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?\b"  # 2025-08-07, 2025-08-07T10:15:30
+    rf"|\b\d{{1,2}}(?:st|nd|rd|th)?[-/ ]{_MONTH}[-/ ,]*\d{{4}}\b"  # 07-August-2025, 7 Aug 2025
+    rf"|\b{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b"  # August 7, 2025
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b",  # 07/08/2025
+    re.IGNORECASE)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Prompt with its dates replaced by a placeholder, so a transcript recorded on one day replays on another.
+    """
+    return VOLATILE_PROMPT_PARTS.sub("<date>", prompt)
+
+
+class LLMFixtureTranscript:
+    """
+    Recorded LLM transcript backing the `LLM_Provider.LOCAL_FIXTURE` provider.
+
+    Each entry maps a prompt hash to the response, its original latency and token count, and lives in
+    `run_configs.llm_fixture_dir` as one JSON file. Entries are recorded from a live provider with
+    `run_configs.llm_fixture_record` and replayed with zero or the recorded latency, so the agent loop can be
+    benchmarked without network access.
+    """
+
+    _lock = threading.Lock()
+    replayed = 0
+    recorded = 0
+
+    @classmethod
+    def transcriptDir(cls) -> str:
+        return os.path.join(run_configs.get_project_root(), run_configs.llm_fixture_dir)
+
+    @classmethod
+    def promptKey(cls, systemPrompt: str, userPrompt: str, image: str = "") -> str:
+        """
+        Provider and model independent key of a prompt, with dates normalized (see `normalize_prompt`).
+        Screenshots are never byte identical across runs, so images are only part of the key when
+        `run_configs.llm_fixture_match_images` is set.
+        """
+        imageHash = sha256_text(image) if image and run_configs.llm_fixture_match_images else ""
+        return sha256_text(normalize_prompt(systemPrompt) + "\n\n" + normalize_prompt(userPrompt) + "\n\n" + imageHash)
+
+    @classmethod
+    def _entry_path(cls, key: str) -> str:
+        return os.path.join(cls.transcriptDir(), key + ".json")
+
+    @classmethod
+    def lookup(cls, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(cls._entry_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+
+    @classmethod
+    def record(cls, key: str, response: str, latency: float, tokens: int = 0):
+        path = cls._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"response": response, "latency": latency, "tokens": tokens}, f)
+        os.replace(tmp_path, path)
+        with cls._lock:
+            cls.recorded += 1
+
+    @classmethod
+    def replay(cls, key: str) -> str:
+        """
+        Returns the recorded entry as a JSON string, after sleeping for the recorded latency when configured.
+        Fails the test when the prompt was never recorded.
+        """
+        entry = cls.lookup(key)
+        if entry is None:
+            pytest.fail("No recorded LLM response for this prompt in " + cls.transcriptDir() +
+                        ". Record it with run_configs.llm_fixture_record = True on a live provider")
+        if run_configs.llm_fixture_latency == run_configs.LLM_FixtureLatency.RECORDED:
+            time.sleep(entry.get("latency", 0))
+        with cls._lock:
+            cls.replayed += 1
+        return json.dumps(entry)
+
+    @classmethod
+    def printStats(cls):
+        if cls.replayed or cls.recorded:
+            print(f"LLM fixture transcript: replayed={cls.replayed}, recorded={cls.recorded}")
@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from core_agentic import run_configs
+from src.main.utilities.llm.llm_client_registry import LLMClientRegistry
+from src.main.utilities.llm.llm_response_cache import sha256_text
+
+GEMINI_CACHED_CONTENTS_URL = "https://generativelanguage.googleapis.com/v1beta/cachedContents"
+
+
+def bedrock_cacheable_system(systemPrompt: str) -> list:
+    """
+    Returns the Bedrock `system` blocks with the static system prompt marked as a cacheable prefix.
+    """
+    return [{
+        "type": "text",
+        "text": systemPrompt,
+        "cache_control": {"type": "ephemeral"}
+    }]
+
+
+class GeminiContextCache:
+    """
+    Keeps one Gemini cached content per (model, system prompt) so the static rule blocks are uploaded once
+    and later requests only reference the cache by name. Prompts the API refuses to cache (e.g. below the
+    minimum token count) are remembered and sent inline, where Gemini's implicit prefix caching still applies.
+    """
+
+    _lock = threading.RLock()
+    _entries: Dict[str, Tuple[str, float]] = {}  # prompt hash -> (cached content name, expiry epoch)
+    _uncacheable: Set[str] = set()
+
+    @classmethod
+    def getCachedContent(cls, model: str, systemPrompt: str, apiKey: str) -> Optional[str]:
+        """
+        Returns the cached content name for the system prompt, creating the cache on first use.
+        Returns None when the prompt should be sent inline instead.
+        """
+        if len(systemPrompt) < run_configs.llm_prompt_cache_min_chars:
+            return None
+        key = sha256_text(model + "\n" + systemPrompt)
+        with cls._lock:
+            if key in cls._uncacheable:
+                return None
+            entry = cls._entries.get(key)
+            # Refresh a little before expiry so an in-flight request never references an expired cache
+            if entry is not None and entry[1] - time.time() > 30:
+                return entry[0]
+
+            ttl = run_configs.llm_prompt_cache_ttl_seconds
+            payload = {
+                "model": "models/" + model,
+                "systemInstruction": {"parts": [{"text": systemPrompt}]},
+                "ttl": f"{ttl}s"
+            }
+            try:
+                response = LLMClientRegistry.post(run_configs.LLM_Provider.GEMINI,
+                                                  url=GEMINI_CACHED_CONTENTS_URL + "?key=" + apiKey,
+                                                  data=json.dumps(payload),
+                                                  headers={"Content-Type": "application/json"},
+                                                  timeout=120)
+                body = response.json()
+            except Exception as e:
+                print(f"⚠️  Gemini context cache could not be created, sending prompt inline: {e}")
+                cls._uncacheable.add(key)
+                return None
+            if response.status_code != 200 or "name" not in body:
+                print(f"⚠️  Gemini context cache not created ({response.status_code}), sending prompt inline: "
+                      f"{body.get('error', {}).get('message', '')}")
+                cls._uncacheable.add(key)
+                return None
+            run_configs.llmCacheCreationTokens.append(int(body.get("usageMetadata", {}).get("totalTokenCount", 0)))
+            cls._entries[key] = (body["name"], time.time() + ttl)
+            return body["name"]
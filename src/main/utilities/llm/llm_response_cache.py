@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from core_agentic import run_configs
+
+CACHE_FORMAT_VERSION = 2
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content addressed on-disk cache of LLM responses.
+
+    Entries are keyed by provider, model, temperature, thinking budget, max tokens, prompt hash and image hash and stored as
+    one JSON file per key under `run_configs.llm_cache_dir`. Old entries are evicted by age and, once the cache
+    grows past `run_configs.llm_cache_max_bytes`, least recently used entries are removed first.
+    """
+
+    _lock = threading.RLock()
+    _writes_since_eviction = 0
+    _evicted_once = False
+    hits = 0
+    misses = 0
+    tokens_saved = 0
+
+    @classmethod
+    def isEnabled(cls) -> bool:
+        return run_configs.llm_cache_mode != run_configs.LLM_CacheMode.OFF
+
+    @classmethod
+    def isReplayOnly(cls) -> bool:
+        return run_configs.llm_cache_mode == run_configs.LLM_CacheMode.REPLAY_ONLY
+
+    @classmethod
+    def cacheDir(cls) -> str:
+        return os.path.join(run_configs.get_project_root(), run_configs.llm_cache_dir)
+
+    @classmethod
+    def buildKey(cls, provider, model, temperature, thinking, prompt: str, image: str = "", max_tokens=None) -> str:
+        key_fields = {
+            "version": CACHE_FORMAT_VERSION,
+            "provider": provider.value if hasattr(provider, 'value') else str(provider),
+            "model": model.value if hasattr(model, 'value') else str(model),
+            "temperature": temperature,
+            "thinking": thinking,  # False, True or the thinking budget
+            "max_tokens": max_tokens,
+            "prompt": sha256_text(prompt),
+            "image": sha256_text(image) if image else "",
+        }
+        return sha256_text(json.dumps(key_fields, sort_keys=True))
+
+    @classmethod
+    def _entry_path(cls, key: str) -> str:
+        return os.path.join(cls.cacheDir(), key[:2], key + ".json")
+
+    @classmethod
+    def get(cls, key: str) -> Optional[str]:
+        """
+        Returns the cached response for the key or None on a miss. Expired entries count as a miss.
+        """
+        cls._evict_if_due()
+        path = cls._entry_path(key)
+        entry = None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            entry = None
+        if entry is not None and time.time() - entry.get("created", 0) > run_configs.llm_cache_max_age_seconds:
+            cls._remove(path)
+            entry = None
+        with cls._lock:
+            if entry is None:
+                cls.misses += 1
+                return None
+            cls.hits += 1
+            cls.tokens_saved += int(entry.get("tokens", 0))
+        try:
+            os.utime(path)  # Refresh mtime so size based eviction drops least recently used entries first
+        except OSError:
+            pass
+        return entry["response"]
+
+    @classmethod
+    def put(cls, key: str, response: str, tokens: int = 0):
+        path = cls._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"response": response, "tokens": tokens, "created": time.time()}, f)
+        os.replace(tmp_path, path)
+        with cls._lock:
+            cls._writes_since_eviction += 1
+        cls._evict_if_due()
+
+    @classmethod
+    def _remove(cls, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @classmethod
+    def _evict_if_due(cls):
+        with cls._lock:
+            if cls._evicted_once and cls._writes_since_eviction < run_configs.llm_cache_eviction_interval:
+                return
+            cls._evicted_once = True
+            cls._writes_since_eviction = 0
+        cls.evict()
+
+    @classmethod
+    def evict(cls):
+        """
+        Removes entries older than the configured max age, then removes least recently used entries
+        until the cache fits in the configured max size.
+        """
+        root = cls.cacheDir()
+        if not os.path.isdir(root):
+            return
+        now = time.time()
+        entries = []
+        for dir_path, _, files in os.walk(root):
+            for file in files:
+                path = os.path.join(dir_path, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > run_configs.llm_cache_max_age_seconds:
+                    cls._remove(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= run_configs.llm_cache_max_bytes:
+                break
+            cls._remove(path)
+            total_size -= size
+
+    @classmethod
+    def printStats(cls):
+        if cls.isEnabled():
+            print(f"LLM response cache ({run_configs.llm_cache_mode.value}): hits={cls.hits}, misses={cls.misses}, "
+                  f"tokens saved={cls.tokens_saved}")
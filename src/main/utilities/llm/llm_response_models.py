@@ -0,0 +1,111 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+def load_json_block(json_block: str) -> Dict[str, Any]:
+    """
+    Parses the JSON block returned by `extract_json_block` once. Malformed responses yield an empty object,
+    so every field of the response model reads as None, as the path based lookups did.
+    """
+    try:
+        response_json = json.loads(json_block)
+    except Exception as e:
+        print(f"Error parsing JSON data: {e}")
+        print("JSON Data: \n", json_block)
+        return {}
+    return response_json if isinstance(response_json, dict) else {}
+
+
+@dataclass
+class OrchestratorDecision:
+    agent: Optional[str]
+    reasoning: Optional[str]
+
+    @classmethod
+    def fromJson(cls, json_block: str) -> "OrchestratorDecision":
+        response_json = load_json_block(json_block)
+        return cls(agent=response_json.get("Agent"), reasoning=response_json.get("Reasoning"))
+
+
+@dataclass
+class FunctionCall:
+    functionCall: str
+    subTask: Optional[str]
+
+
+@dataclass
+class FunctionPlan:
+    functionCalls: List[FunctionCall] = field(default_factory=list)
+    reasoning: Optional[str] = None
+    pendingTasks: Optional[str] = None
+
+    @property
+    def functionList(self) -> List[str]:
+        return [call.functionCall for call in self.functionCalls]
+
+    @classmethod
+    def fromJson(cls, json_block: str) -> "FunctionPlan":
+        return cls.fromDict(load_json_block(json_block))
+
+    @classmethod
+    def fromDict(cls, response_json: Dict[str, Any]) -> "FunctionPlan":
+        functionCalls = []
+        calls = response_json.get("FunctionCalls")
+        # Stops at the first entry without a functionCall, like the original index by index lookup
+        for call in calls if isinstance(calls, list) else []:
+            if not isinstance(call, dict) or call.get("functionCall") is None:
+                break
+            functionCalls.append(FunctionCall(functionCall=call["functionCall"], subTask=call.get("subTask")))
+        return cls(functionCalls=functionCalls,
+                   reasoning=response_json.get("Reasoning"),
+                   pendingTasks=response_json.get("PendingTasks"))
+
+
+@dataclass
+class OrchestratedFunctionPlan:
+    """
+    Response of the combined orchestrator and planner call: the selected agent and the function plan for it.
+    """
+    agent: Optional[str]
+    agentReasoning: Optional[str]
+    plan: FunctionPlan
+
+    @classmethod
+    def fromJson(cls, json_block: str) -> "OrchestratedFunctionPlan":
+        response_json = load_json_block(json_block)
+        return cls(agent=response_json.get("Agent"),
+                   agentReasoning=response_json.get("AgentReasoning"),
+                   plan=FunctionPlan.fromDict(response_json))
+
+
+@dataclass
+class FailureAnalysis:
+    agent: Optional[str]
+    reasoning: Optional[str]
+    task: Optional[str]
+    failureReason: Optional[str]
+    decisionFactor: Optional[str]
+
+    @classmethod
+    def fromJson(cls, json_block: str) -> "FailureAnalysis":
+        response_json = load_json_block(json_block)
+        return cls(agent=response_json.get("Agent"),
+                   reasoning=response_json.get("Reasoning"),
+                   task=response_json.get("task"),
+                   failureReason=response_json.get("failureReason"),
+                   decisionFactor=response_json.get("decisionFactor"))
+
+
+@dataclass
+class LearnerVerdict:
+    output: Optional[str]
+    id: Optional[str]
+    reasoning: Optional[str]
+
+    @classmethod
+    def fromJson(cls, json_block: str) -> "LearnerVerdict":
+        response_json = load_json_block(json_block)
+        return cls(output=response_json.get("output"),
+                   id=response_json.get("ID"),
+                   reasoning=response_json.get("reasoning"))
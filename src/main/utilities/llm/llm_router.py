@@ -0,0 +1,172 @@
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from core_agentic import run_configs
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the given (0 based) retry attempt.
+    """
+    ceiling = min(run_configs.llm_retry_max_delay_seconds, run_configs.llm_retry_base_delay_seconds * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+class LLMRouter:
+    """
+    Latency aware router over the configured LLM providers.
+
+    Rolling latency and error samples are kept per provider. A request goes to the healthiest provider first and,
+    when it has not answered within that provider's p95 latency, a hedged duplicate is sent to the next provider.
+    Whichever answers first wins; the slower response is discarded.
+    """
+
+    _lock = threading.RLock()
+    _samples: Dict[str, deque] = {}  # provider -> deque of (latency seconds, succeeded)
+    _hedges = 0
+    _hedge_wins = 0  # Answered by a hedged duplicate sent while the primary was still in flight
+    _failovers = 0  # Answered by a provider tried after the previous ones failed
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-router")
+
+    @classmethod
+    def record(cls, provider: run_configs.LLM_Provider, latency: float, succeeded: bool):
+        with cls._lock:
+            samples = cls._samples.get(provider.value)
+            if samples is None:
+                samples = deque(maxlen=run_configs.llm_router_window)
+                cls._samples[provider.value] = samples
+            samples.append((latency, succeeded))
+
+    @classmethod
+    def percentile(cls, provider: run_configs.LLM_Provider, q: float) -> Optional[float]:
+        """
+        Returns the q-th percentile (0-100) of successful request latencies, None without samples.
+        """
+        with cls._lock:
+            latencies = sorted(latency for latency, succeeded in cls._samples.get(provider.value, ()) if succeeded)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(q / 100 * (len(latencies) - 1))))]
+
+    @classmethod
+    def errorRate(cls, provider: run_configs.LLM_Provider) -> float:
+        with cls._lock:
+            samples = cls._samples.get(provider.value, ())
+            if not samples:
+                return 0.0
+            return sum(1 for _, succeeded in samples if not succeeded) / len(samples)
+
+    @classmethod
+    def hedgeDelay(cls, provider: run_configs.LLM_Provider) -> float:
+        """
+        Seconds to wait for the provider before hedging: its p95 latency once enough samples exist.
+        """
+        with cls._lock:
+            count = len(cls._samples.get(provider.value, ()))
+        p95 = cls.percentile(provider, 95)
+        if count < run_configs.llm_router_min_samples or p95 is None:
+            return run_configs.llm_hedge_default_delay_seconds
+        return p95
+
+    @classmethod
+    def orderProviders(cls, providers: List[run_configs.LLM_Provider]) -> List[run_configs.LLM_Provider]:
+        """
+        Orders providers by error rate, then p50 latency. The configured order breaks ties, so the requested
+        provider stays first until it misbehaves.
+        """
+        with cls._lock:
+            warmedUp = all(len(cls._samples.get(provider.value, ())) >= run_configs.llm_router_min_samples
+                           for provider in providers)
+
+        def score(provider):
+            # Latency only reorders providers once all of them have enough samples
+            p50 = cls.percentile(provider, 50) if warmedUp else None
+            return round(cls.errorRate(provider), 1), p50 if p50 is not None else 0.0, providers.index(provider)
+        return sorted(providers, key=score)
+
+    @classmethod
+    def route(cls, call: Callable[[run_configs.LLM_Provider], Any], providers: List[run_configs.LLM_Provider]) -> Any:
+        """
+        Runs `call(provider)` on the best provider, hedging to the next one past the p95 latency or on failure.
+        `call` returns None (or raises) when the provider did not produce a response.
+        """
+        providers = cls.orderProviders(providers)
+        if len(providers) == 1 or not run_configs.llm_hedging:
+            return cls._first_response(call, providers)
+
+        call = run_configs.in_current_session(call)
+        current = providers[0]
+        pending = {cls._executor.submit(call, current): current}
+        queue = providers[1:]
+        result = None
+        hedged = False
+        hedgedProviders = set()
+        while pending:
+            timeout = None if hedged or not queue else cls.hedgeDelay(current)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is slower than its p95, send a duplicate to the next provider
+                hedged = True
+                with cls._lock:
+                    cls._hedges += 1
+                provider = queue.pop(0)
+                hedgedProviders.add(provider)
+                print(f"⏱️  {current.value} is slower than its p95, hedging the request to {provider.value}")
+                pending[cls._executor.submit(call, provider)] = provider
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"⚠️  LLM request to {provider.value} failed: {e}")
+                    result = None
+                if result is not None:
+                    if provider in hedgedProviders:
+                        with cls._lock:
+                            cls._hedge_wins += 1
+                    elif provider != providers[0]:
+                        with cls._lock:
+                            cls._failovers += 1
+                    return result
+            if not pending and queue:
+                # Every provider in flight failed, fail over to the next one
+                current = queue.pop(0)
+                pending[cls._executor.submit(call, current)] = current
+        return result
+
+    @classmethod
+    def _first_response(cls, call, providers):
+        result = None
+        for provider in providers:
+            try:
+                result = call(provider)
+            except Exception as e:
+                if provider == providers[-1]:
+                    raise
+                print(f"⚠️  LLM request to {provider.value} failed: {e}")
+                result = None
+            if result is not None:
+                if provider != providers[0]:
+                    with cls._lock:
+                        cls._failovers += 1
+                return result
+        return result
+
+    @classmethod
+    def printStats(cls):
+        with cls._lock:
+            providers = list(cls._samples.keys())
+            hedges, hedge_wins, failovers = cls._hedges, cls._hedge_wins, cls._failovers
+        for provider_value in providers:
+            provider = run_configs.LLM_Provider(provider_value)
+            p50 = cls.percentile(provider, 50)
+            p95 = cls.percentile(provider, 95)
+            print(f"LLM router [{provider_value}]: p50={p50 or 0:.2f}s, p95={p95 or 0:.2f}s, "
+                  f"error rate={cls.errorRate(provider) * 100:.2f}%")
+        if hedges or hedge_wins or failovers:
+            print(f"LLM router: hedged requests={hedges}, answered by a hedged request={hedge_wins}, "
+                  f"answered after failing over={failovers}")
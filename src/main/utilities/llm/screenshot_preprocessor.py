@@ -0,0 +1,103 @@
+import base64
+import io
+from typing import List, Optional, Tuple
+
+from core_agentic import run_configs
+
+BoundingBox = Tuple[float, float, float, float]  # left, top, right, bottom in viewport units
+
+_BASE64_MIME_PREFIXES = {
+    "iVBORw0KGgo": "image/png",
+    "/9j/": "image/jpeg",
+    "UklGR": "image/webp",
+}
+_pillow_missing = False
+
+
+def detect_image_mime(base64Image: str) -> str:
+    """
+    Detects the MIME type of a base64 encoded image from its header, defaulting to PNG.
+    """
+    for prefix, mime in _BASE64_MIME_PREFIXES.items():
+        if base64Image.startswith(prefix):
+            return mime
+    return "image/png"
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """
+    Rough vision token estimate (~750 pixels per token). Providers tile differently, so this is only used to
+    report relative savings.
+    """
+    return max(1, int(width * height / 750))
+
+
+def union_bounding_box(boxes: List[BoundingBox], width: int, height: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Union of the boxes (image pixels) clamped to the image, None when no box overlaps the image.
+    """
+    left = max(0, int(min(box[0] for box in boxes))) if boxes else 0
+    top = max(0, int(min(box[1] for box in boxes))) if boxes else 0
+    right = min(width, int(max(box[2] for box in boxes)) + 1) if boxes else 0
+    bottom = min(height, int(max(box[3] for box in boxes)) + 1) if boxes else 0
+    if right <= left or bottom <= top:
+        return None
+    return left, top, right, bottom
+
+
+def box_contains(outer: BoundingBox, inner: BoundingBox, tolerance: float = 1) -> bool:
+    return (inner[0] >= outer[0] - tolerance and inner[1] >= outer[1] - tolerance
+            and inner[2] <= outer[2] + tolerance and inner[3] <= outer[3] + tolerance)
+
+
+def preprocess_screenshot(base64Image: str, cropBoxes: Optional[List[BoundingBox]] = None,
+                          viewportWidth: Optional[float] = None) -> str:
+    """
+    Prepares a screenshot for a vision LLM call: crops to the union of `cropBoxes` (section scoped assertions,
+    in viewport units of `viewportWidth` wide, scaled to the screenshot's pixel density),
+    downscales to `run_configs.screenshot_max_long_edge` and re-encodes to `run_configs.screenshot_format`.
+    Bytes and estimated tokens saved are recorded per call. Returns the image unchanged when Pillow is missing
+    or preprocessing is disabled.
+    """
+    global _pillow_missing
+    if not run_configs.screenshot_preprocessing or not base64Image or _pillow_missing:
+        return base64Image
+    try:
+        from PIL import Image
+    except ImportError:
+        print("⚠️  Pillow is not installed, sending screenshots without preprocessing")
+        _pillow_missing = True
+        return base64Image
+
+    raw = base64.b64decode(base64Image)
+    image = Image.open(io.BytesIO(raw))
+    originalSize = image.size
+    if cropBoxes:
+        scale = image.width / viewportWidth if viewportWidth else 1
+        box = union_bounding_box([tuple(edge * scale for edge in box) for box in cropBoxes], image.width, image.height)
+        if box is not None:
+            image = image.crop(box)
+    longEdge = max(image.size)
+    if run_configs.screenshot_max_long_edge and longEdge > run_configs.screenshot_max_long_edge:
+        scale = run_configs.screenshot_max_long_edge / longEdge
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                             Image.LANCZOS)
+
+    imageFormat = run_configs.screenshot_format
+    buffer = io.BytesIO()
+    if imageFormat == run_configs.ScreenshotFormat.PNG:
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        # JPEG has no alpha channel
+        image.convert("RGB").save(buffer, format=imageFormat.value, quality=run_configs.screenshot_quality)
+    processed = buffer.getvalue()
+    if imageFormat == run_configs.ScreenshotFormat.PNG and len(processed) >= len(raw) and image.size == originalSize:
+        processed = raw  # Nothing gained by re-encoding
+
+    bytesSaved = len(raw) - len(processed)
+    tokensSaved = estimate_image_tokens(*originalSize) - estimate_image_tokens(*image.size)
+    run_configs.screenshotBytesSaved.append(bytesSaved)
+    run_configs.screenshotTokensSaved.append(tokensSaved)
+    print(f"🖼️  Screenshot {originalSize[0]}x{originalSize[1]} -> {image.width}x{image.height} "
+          f"{imageFormat.value}: {len(raw)} -> {len(processed)} bytes, ~{tokensSaved} vision tokens saved")
+    return base64.b64encode(processed).decode("utf-8")
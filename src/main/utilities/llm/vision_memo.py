@@ -0,0 +1,101 @@
+import base64
+import io
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core_agentic import run_configs
+from src.main.utilities.llm.llm_response_cache import sha256_text
+
+
+def dhash(base64Image: str, hashSize: int = 16) -> Optional[int]:
+    """
+    Difference hash of a base64 encoded image: the image is reduced to (hashSize + 1) x hashSize grayscale
+    pixels and every bit records whether a pixel is brighter than its right neighbour. Returns None when
+    Pillow is not installed or the image cannot be decoded.
+    """
+    try:
+        from PIL import Image
+        image = Image.open(io.BytesIO(base64.b64decode(base64Image)))
+        pixels = list(image.convert("L").resize((hashSize + 1, hashSize), Image.BILINEAR).getdata())
+    except Exception:
+        return None
+    value = 0
+    for row in range(hashSize):
+        for col in range(hashSize):
+            left = pixels[row * (hashSize + 1) + col]
+            right = pixels[row * (hashSize + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class VisionMemo:
+    """
+    In-memory memo of vision LLM answers keyed by prompt and a perceptual hash of the screenshot.
+
+    Only call sites listed in `run_configs.vision_memo_call_sites` are memoized.
+    The same question asked about a screen whose hash is within `run_configs.vision_memo_hamming_threshold` bits
+    of a remembered one is answered locally. Entries are bounded by `run_configs.vision_memo_max_entries`
+    and evicted least recently used first.
+    """
+
+    _lock = threading.Lock()
+    _entries: "OrderedDict[Tuple[str, int], str]" = OrderedDict()  # (prompt hash, image hash) -> response
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def _key(cls, prompt: str, image: str, callSite) -> Optional[Tuple[str, int]]:
+        if not run_configs.vision_memo_enabled or not image or callSite not in run_configs.vision_memo_call_sites:
+            return None
+        imageHash = dhash(image, run_configs.vision_memo_hash_size)
+        if imageHash is None:
+            return None
+        return sha256_text(prompt), imageHash
+
+    @classmethod
+    def get(cls, prompt: str, image: str, callSite: run_configs.LLM_CallSite) -> Tuple[Optional[Tuple[str, int]], Optional[str]]:
+        """
+        Returns (memo key, remembered response). The key is None when the memo does not apply to the call
+        (no image, call site not in `run_configs.vision_memo_call_sites`); the response is None on a miss.
+        """
+        key = cls._key(prompt, image, callSite)
+        if key is None:
+            return None, None
+        promptHash, imageHash = key
+        with cls._lock:
+            best = None
+            for entryKey in cls._entries:
+                if entryKey[0] != promptHash:
+                    continue
+                distance = hamming_distance(entryKey[1], imageHash)
+                if distance <= run_configs.vision_memo_hamming_threshold and (best is None or distance < best[0]):
+                    best = (distance, entryKey)
+            if best is None:
+                cls.misses += 1
+                return key, None
+            cls.hits += 1
+            cls._entries.move_to_end(best[1])
+            return key, cls._entries[best[1]]
+
+    @classmethod
+    def put(cls, key: Tuple[str, int], response: str):
+        with cls._lock:
+            cls._entries[key] = response
+            cls._entries.move_to_end(key)
+            while len(cls._entries) > run_configs.vision_memo_max_entries:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def printStats(cls):
+        if cls.hits or cls.misses:
+            print(f"Vision memo: hits={cls.hits}, misses={cls.misses}, entries={len(cls._entries)}")